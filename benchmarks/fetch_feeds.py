@@ -0,0 +1,102 @@
+"""Benchmark sequential vs concurrent feed fetching against a local stub server.
+
+Usage:
+    python -m benchmarks.fetch_feeds [--feeds 15] [--delay 0.5] [--deadline 5]
+
+The stub server serves the test RSS fixture with a per-path behaviour:
+fast feeds answer immediately, slow feeds sleep ``--delay`` seconds, failing
+feeds return HTTP 500 and hanging feeds sleep past the fetch deadline.
+"""
+
+import argparse
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.news import rss_parser
+from src.news.rss_parser import fetch_all_feeds, fetch_feed
+from src.news.sources import NewsSource
+
+SAMPLE_RSS = (Path(__file__).parent.parent / "tests" / "fixtures" / "sample_rss.xml").read_bytes()
+
+
+def _make_handler(delay: float, hang: float) -> type[BaseHTTPRequestHandler]:
+    class StubFeedHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            kind = self.path.strip("/").split("-")[0]
+            if kind == "slow":
+                time.sleep(delay)
+            elif kind == "hang":
+                time.sleep(hang)
+            elif kind == "fail":
+                self.send_error(500)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(SAMPLE_RSS)))
+            self.end_headers()
+            self.wfile.write(SAMPLE_RSS)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return StubFeedHandler
+
+
+def _build_sources(base_url: str, n_feeds: int, with_hanging: bool) -> list[NewsSource]:
+    # Roughly the production mix: mostly healthy feeds, a few slow, one failing, one hanging
+    kinds = ["fast", "slow", "fast", "slow", "fail"]
+    sources = [
+        NewsSource(f"Feed {i}", f"{base_url}/{kinds[i % len(kinds)]}-{i}", "news", 0.8)
+        for i in range(n_feeds - 1 if with_hanging else n_feeds)
+    ]
+    if with_hanging:
+        sources.append(NewsSource("Hanging feed", f"{base_url}/hang-{n_feeds}", "news", 0.8))
+    return sources
+
+
+def _timed(label: str, fn) -> None:
+    start = time.perf_counter()
+    items = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed:7.2f}s  {len(items):4d} items")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feeds", type=int, default=15, help="Number of stub feeds")
+    parser.add_argument("--delay", type=float, default=0.5, help="Latency of slow feeds (s)")
+    parser.add_argument("--deadline", type=float, default=3.0, help="Deadline for the concurrent run (s)")
+    parser.add_argument("--concurrency", type=int, default=rss_parser.MAX_CONCURRENT_FETCHES)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    # Hanging feeds outlive the deadline but stay under the per-request timeout
+    # so the sequential baseline pays their full latency.
+    hang = args.deadline + 1.0
+    rss_parser.HTTP_TIMEOUT = hang + 1.0
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(args.delay, hang))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        for with_hanging in (False, True):
+            sources = _build_sources(base_url, args.feeds, with_hanging)
+            print(f"\n{len(sources)} feeds ({'one hanging' if with_hanging else 'no hanging feed'})")
+            _timed("sequential", lambda: [item for s in sources for item in fetch_feed(s)])
+            _timed(
+                f"concurrent (n={args.concurrency})",
+                lambda: fetch_all_feeds(sources, max_concurrency=args.concurrency, deadline=args.deadline),
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark the full generate_tweets path against the deterministic fake LLM backend.
+
+Usage:
+    python -m benchmarks.generation [--items 200] [--thread-share 0.2] [--latency 0.2] [--jitter 0.1]
+                                    [--malformed-rate 0.05] [--timeout-rate 0.02] [--timeout 1.0] [--seed 1]
+
+Synthetic NewsItems (a share of them ArXiv papers, which become threads) go
+through planning, concurrent calls, parsing and per-item retries exactly as in
+a real run; only the model is replaced by FakeBackend. Reports per-call
+p50/p95 latency, parse retries, timeouts, and draft throughput.
+"""
+
+import argparse
+import logging
+import statistics
+import time
+
+from src.generation import gemini_client
+from src.generation.generator import GenerationStats, generate_tweets
+from src.generation.llm_backend import FakeBackend
+from src.models import LlmCall, NewsItem
+
+
+def synthetic_items(n: int, thread_share: float) -> list[NewsItem]:
+    threads = round(n * thread_share)
+    return [
+        NewsItem(
+            title=f"Synthetic {'paper' if i < threads else 'story'} {i} on language model evaluation",
+            url=f"https://example.com/{i}",
+            summary="A synthetic summary describing the main result, the setup and why it matters. " * 4,
+            published="",
+            source="ArXiv CS.AI+CS.LG" if i < threads else "TechCrunch AI",
+            score=10.0 - i / n,
+        )
+        for i in range(n)
+    ]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--thread-share", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake call")
+    parser.add_argument("--jitter", type=float, default=0.1, help="extra random seconds per call")
+    parser.add_argument("--malformed-rate", type=float, default=0.05)
+    parser.add_argument("--timeout-rate", type=float, default=0.02)
+    parser.add_argument("--timeout", type=float, default=1.0, help="seconds a timed-out call hangs")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)  # injected failures are expected; keep the report readable
+
+    backend = FakeBackend(
+        latency=args.latency,
+        jitter=args.jitter,
+        malformed_rate=args.malformed_rate,
+        timeout_rate=args.timeout_rate,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+    items = synthetic_items(args.items, args.thread_share)
+    calls: list[LlmCall] = []
+    stats = GenerationStats()
+
+    gemini_client.set_backend(backend)
+    gemini_client.set_response_cache(None)
+    gemini_client.set_call_hook(calls.append)
+    try:
+        start = time.perf_counter()
+        drafts = generate_tweets(items, stats=stats)
+        elapsed = time.perf_counter() - start
+    finally:
+        gemini_client.set_call_hook(None)
+        gemini_client.set_backend(None)
+
+    latencies = [c.latency_ms for c in calls]
+    timeouts = sum(1 for c in calls if c.error)
+    print(f"{len(items)} items ({round(len(items) * args.thread_share)} threads), {len(calls)} LLM calls in {elapsed:.2f}s")
+    print(f"call latency   p50 {_percentile(latencies, 50):7.1f} ms   p95 {_percentile(latencies, 95):7.1f} ms")
+    print(f"parse retries  {stats.parse_failures} of {stats.parse_attempts} responses   timeouts {timeouts}")
+    print(f"drafts         {len(drafts)} of {len(items)}   throughput {len(drafts) / elapsed:.1f} drafts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Measure input-token and latency savings of caching the static system prompts.
+
+Usage:
+    python -m benchmarks.prompt_prefix [--runs 20] [--items 3] [--threads 2]
+
+Runs generate_tweets against a local stub of the google-genai client twice:
+once with the system prompts sent inline on every request, once with them
+registered as cached content (PromptPrefixCache). The stub bills ~4 chars per
+token and simulates prefill latency proportional to the uncached input tokens,
+so the numbers show the shape of the saving, not real Gemini timings.
+
+Like Gemini, the stub refuses to cache content below PROMPT_CACHE_MIN_TOKENS.
+Today's system prompts are all shorter than that, so the cached mode never
+registers anything and both runs match: production never takes the cached
+path either (see src/generation/prefix_cache.py). The two runs only differ
+once a prompt grows past the minimum.
+"""
+
+import argparse
+import json
+import re
+import statistics
+import time
+from types import SimpleNamespace
+
+from google.genai import errors
+
+from src.config import PROMPT_CACHE_MIN_TOKENS
+from src.generation import gemini_client
+from src.generation.generator import generate_tweets
+from src.generation.prefix_cache import PromptPrefixCache
+from src.models import LlmCall, NewsItem
+
+BASE_LATENCY_MS = 20.0
+PREFILL_MS_PER_TOKEN = 0.05
+CACHED_MS_PER_TOKEN = 0.005
+
+
+def _tokens(text: str | None) -> int:
+    return len(text or "") // 4
+
+
+class StubClient:
+    """Just enough of ``genai.Client`` for generate_text: models.generate_content and caches.create."""
+
+    def __init__(self) -> None:
+        self._caches: dict[str, str] = {}
+        self.models = SimpleNamespace(generate_content=self._generate_content)
+        self.caches = SimpleNamespace(create=self._create_cache)
+
+    def _create_cache(self, model: str, config) -> SimpleNamespace:
+        tokens = _tokens(config.system_instruction)
+        if tokens < PROMPT_CACHE_MIN_TOKENS:
+            message = f"Cached content is too small: {tokens} tokens, minimum {PROMPT_CACHE_MIN_TOKENS}"
+            raise errors.ClientError(400, {"error": {"code": 400, "message": message, "status": "INVALID_ARGUMENT"}})
+        name = f"cachedContents/{len(self._caches)}"
+        self._caches[name] = config.system_instruction
+        return SimpleNamespace(name=name)
+
+    def _generate_content(self, model: str, contents: str, config) -> SimpleNamespace:
+        cached = _tokens(self._caches[config.cached_content]) if config.cached_content else 0
+        uncached = _tokens(contents) + _tokens(config.system_instruction)
+        time.sleep((BASE_LATENCY_MS + uncached * PREFILL_MS_PER_TOKEN + cached * CACHED_MS_PER_TOKEN) / 1000)
+
+        urls = re.findall(r"URL: (\S+)", contents)
+        titles = re.findall(r"\] (.+?):", contents)
+        if contents.startswith("NEWS ITEM:"):
+            payload = {"news_url": urls[0], "news_title": titles[0], "thread_tweets": ["First.", "Second."]}
+        else:
+            payload = [{"news_url": u, "news_title": t, "tweet_text": f"On {t}."} for u, t in zip(urls, titles)]
+        text = json.dumps(payload)
+        usage = SimpleNamespace(
+            prompt_token_count=uncached + cached, cached_content_token_count=cached or None, candidates_token_count=_tokens(text)
+        )
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+def _items(run: int, singles: int, threads: int) -> list[NewsItem]:
+    def item(kind: str, i: int, source: str) -> NewsItem:
+        return NewsItem(
+            title=f"{kind} story {run}-{i}",
+            url=f"https://example.com/{kind}/{run}/{i}",
+            summary="A synthetic summary of a news item about language models. " * 4,
+            published="",
+            source=source,
+        )
+
+    return [item("news", i, "TechCrunch AI") for i in range(singles)] + [
+        item("paper", i, "ArXiv CS.AI+CS.LG") for i in range(threads)
+    ]
+
+
+def run_mode(prefix_cache: PromptPrefixCache | None, runs: int, singles: int, threads: int) -> list[LlmCall]:
+    calls: list[LlmCall] = []
+    gemini_client.set_client(StubClient())
+    gemini_client.set_response_cache(None)
+    gemini_client.set_prefix_cache(prefix_cache)
+    gemini_client.set_call_hook(calls.append)
+    try:
+        for run in range(runs):
+            generate_tweets(_items(run, singles, threads))
+    finally:
+        gemini_client.set_call_hook(None)
+        gemini_client.set_client(None)
+    return calls
+
+
+def _report(label: str, calls: list[LlmCall]) -> tuple[int, float]:
+    billed = sum((c.prompt_tokens or 0) - (c.cached_prompt_tokens or 0) for c in calls)
+    cached = sum(c.cached_prompt_tokens or 0 for c in calls)
+    latency = statistics.mean(c.latency_ms for c in calls)
+    print(f"{label:<28} {len(calls):5d} calls  {billed:8d} uncached input tokens  {cached:8d} cached  {latency:7.1f} ms/call")
+    return billed, latency
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--items", type=int, default=3, help="single-tweet items per run")
+    parser.add_argument("--threads", type=int, default=2, help="thread (ArXiv) items per run")
+    args = parser.parse_args()
+
+    inline_tokens, inline_ms = _report("system prompt inline", run_mode(None, args.runs, args.items, args.threads))
+    cached_tokens, cached_ms = _report(
+        "system prompt cached", run_mode(PromptPrefixCache(3600), args.runs, args.items, args.threads)
+    )
+    print(
+        f"input tokens -{100 * (1 - cached_tokens / inline_tokens):.0f}%  "
+        f"latency -{100 * (1 - cached_ms / inline_ms):.0f}%"
+    )
+
+
+if __name__ == "__main__":
+    main()
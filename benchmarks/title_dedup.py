@@ -0,0 +1,121 @@
+"""Benchmark MinHash/LSH title dedup against the pairwise SequenceMatcher baseline.
+
+Usage:
+    python -m benchmarks.title_dedup [--titles 2000] [--dup-rate 0.2] [--seed 1]
+
+Synthetic titles are drawn from an ML-flavoured vocabulary; a fraction of them
+are near-duplicates of earlier titles with one or two edits (extra or dropped
+word, swapped word, typo, case change), which yields plenty of pairs near the
+similarity threshold. Precision and recall are measured on the set of titles each
+method drops, taking the pairwise baseline as ground truth. The baseline is
+quadratic and takes several minutes at the default size.
+"""
+
+import argparse
+import random
+import time
+from difflib import SequenceMatcher
+
+from src.config import DEDUP_SIMILARITY_THRESHOLD
+from src.news.near_duplicates import TitleIndex
+
+VOCAB = (
+    "model language large agent agents reasoning benchmark open source release launch diffusion transformer "
+    "training inference scaling data efficient fast sparse mixture experts vision multimodal robot policy "
+    "reinforcement learning reward alignment safety evaluation dataset tokens context window memory retrieval "
+    "graph neural network attention quantization distillation compression pruning latency hardware gpu chip "
+    "openai google meta anthropic mistral deepmind microsoft nvidia startup raises funding billion million "
+    "announces introduces unveils new paper study shows why how what researchers team lab framework toolkit "
+    "code generation math proof theorem planning search world simulation video audio speech music image"
+).split()
+
+
+def _random_title(rng: random.Random) -> str:
+    words = rng.sample(VOCAB, rng.randint(6, 12))
+    return " ".join(words).capitalize()
+
+
+def _edit(title: str, rng: random.Random) -> str:
+    words = title.split()
+    kind = rng.choice(["append", "drop", "swap", "typo", "case"])
+    if kind == "append":
+        words.append(rng.choice(["today", "now", "report", "update", "explained"]))
+    elif kind == "drop" and len(words) > 3:
+        words.pop(rng.randrange(len(words)))
+    elif kind == "swap":
+        words[rng.randrange(len(words))] = rng.choice(VOCAB)
+    elif kind == "typo":
+        i = rng.randrange(len(words))
+        w = words[i]
+        if len(w) > 3:
+            j = rng.randrange(len(w) - 1)
+            words[i] = w[:j] + w[j + 1] + w[j] + w[j + 2 :]
+    else:
+        return title.upper()
+    return " ".join(words)
+
+
+def _perturb(title: str, rng: random.Random) -> str:
+    for _ in range(rng.randint(1, 2)):
+        title = _edit(title, rng)
+    return title
+
+
+def generate_titles(n: int, dup_rate: float, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    titles: list[str] = []
+    for _ in range(n):
+        if titles and rng.random() < dup_rate:
+            titles.append(_perturb(rng.choice(titles), rng))
+        else:
+            titles.append(_random_title(rng))
+    return titles
+
+
+def baseline_dropped(titles: list[str], threshold: float) -> set[int]:
+    """The original quadratic dedup loop from ranker.deduplicate."""
+    kept: list[str] = []
+    dropped: set[int] = set()
+    for i, title in enumerate(titles):
+        if any(SequenceMatcher(None, title.lower(), k.lower()).ratio() > threshold for k in kept):
+            dropped.add(i)
+        else:
+            kept.append(title)
+    return dropped
+
+
+def lsh_dropped(titles: list[str], threshold: float) -> set[int]:
+    index = TitleIndex(threshold=threshold)
+    return {i for i, title in enumerate(titles) if not index.add_if_new(title)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=2000)
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    titles = generate_titles(args.titles, args.dup_rate, args.seed)
+    threshold = DEDUP_SIMILARITY_THRESHOLD
+
+    start = time.perf_counter()
+    expected = baseline_dropped(titles, threshold)
+    baseline_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = lsh_dropped(titles, threshold)
+    lsh_s = time.perf_counter() - start
+
+    true_pos = len(expected & actual)
+    precision = true_pos / len(actual) if actual else 1.0
+    recall = true_pos / len(expected) if expected else 1.0
+
+    print(f"{len(titles)} titles, threshold {threshold}")
+    print(f"pairwise SequenceMatcher  {baseline_s:8.2f}s  dropped {len(expected)}")
+    print(f"MinHash/LSH index         {lsh_s:8.2f}s  dropped {len(actual)}")
+    print(f"speedup {baseline_s / lsh_s:.1f}x  precision {precision:.3f}  recall {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -54,4 +54,4 @@ fi
 ok "State file ready"
 
 echo ""
-python -m src.workflows.publish
+python -m src.workflows.publish "$@"
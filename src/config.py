@@ -11,45 +11,97 @@ TWITTER_ACCESS_TOKEN_SECRET: str = os.environ.get("TWITTER_ACCESS_TOKEN_SECRET",
 
 # Gemini
 GEMINI_MODEL: str = "gemini-2.5-flash"
+LLM_CALL_TIMEOUT: float = 90.0  # seconds per request
+MAX_CONCURRENT_LLM_CALLS: int = 4
+# JSON mode with a response schema; False falls back to free-text JSON parsing
+GEMINI_STRUCTURED_OUTPUT: bool = True
+# Register the static system prompts as Gemini cached content (refreshed when the text changes)
+GEMINI_PROMPT_CACHE: bool = True
+# Gemini 2.5 Flash only caches content of at least this many tokens; shorter
+# system prompts are always sent inline (today that is all of them)
+PROMPT_CACHE_MIN_TOKENS: int = 1024
+PROMPT_CACHE_TTL_MINUTES: int = 60
+
+# On-disk cache of Gemini responses (data/llm_cache/); LLM_CACHE_BYPASS=1 disables it
+LLM_CACHE_BYPASS: bool = os.environ.get("LLM_CACHE_BYPASS", "") == "1"
+LLM_CACHE_TTL_HOURS: int = 72
+LLM_CACHE_MAX_MB: int = 50
 
 # Tweet generation
+# Spread evenly over the source categories (arxiv / news / blog), so with three
+# categories 3 means one item each and 6 means up to two each
 MAX_DRAFTS_PER_RUN: int = 3
+# Runs with at least this many drafts send them to Telegram packed into digest
+# messages (several drafts per message) instead of one message each; only
+# reachable when MAX_DRAFTS_PER_RUN is at least this high
+TELEGRAM_DIGEST_MIN_DRAFTS: int = 4
 MAX_TWEET_LENGTH: int = 270
+# Input tokens per generation request (system prompt + news block); larger
+# single-tweet runs are split into several prompts
+PROMPT_TOKEN_BUDGET: int = 2500
+# Tweets per batch response, variants included, which keeps each JSON response
+# well within the output limit. A batch prompt holds this many tweets divided
+# by TWEET_VARIANTS items.
+MAX_TWEETS_PER_RESPONSE: int = 10
+# Tweet variants requested per single-tweet item. The best one (by local
+# ranking) becomes the draft; the rest are kept as alternatives to offer
+# straight away when a draft is rejected in Telegram.
+TWEET_VARIANTS: int = 3
+# Published tweets a new variant is compared against to avoid repeating ourselves
+RECENT_TWEETS_FOR_SIMILARITY: int = 50
 
 # News filtering
 RECENCY_THRESHOLD_HOURS: int = 48
 DEDUP_SIMILARITY_THRESHOLD: float = 0.8
 
 # State management
-MAX_SEEN_URLS: int = 1000
+MAX_SEEN_URLS: int = 20000
+MAX_SEEN_TITLES: int = 2000
 MAX_PUBLISHED_HISTORY_DAYS: int = 90
+# "json" (data/state.json) or "sqlite" (data/state.db, see src/storage/migrate.py)
+STATE_BACKEND: str = os.environ.get("STATE_BACKEND") or "json"
 
-# Keywords that boost a news item's score
-BOOST_KEYWORDS: list[str] = [
-    "gpt",
-    "claude",
-    "claude code",
-    "opus",
-    "sonnet",
-    "codex",
-    "GLM",
-    "MiniMax",
-    "opencode",
-    "copilot",
-    "gemini",
-    "llama",
-    "mistral",
-    "open source",
-    "benchmark",
-    "sota",
+# Keywords that boost a news item's score, with their multiplier. Matched
+# case-insensitively at the start of a word ("agent" matches "agents" but
+# "rag" does not match "storage"); the highest multiplier among matches wins.
+BOOST_KEYWORDS: dict[str, float] = {
+    "gpt": 1.5,
+    "chatgpt": 1.5,
+    "claude": 1.5,
+    "claude code": 1.5,
+    "opus": 1.5,
+    "sonnet": 1.5,
+    "codex": 1.5,
+    "GLM": 1.5,
+    "MiniMax": 1.5,
+    "opencode": 1.5,
+    "copilot": 1.5,
+    "gemini": 1.5,
+    "llama": 1.5,
+    "mistral": 1.5,
+    "open source": 1.5,
+    "benchmark": 1.5,
+    "sota": 1.5,
+    "release": 1.5,
+    "launch": 1.5,
+    "announcement": 1.5,
+    "breakthrough": 1.5,
+    "transformer": 1.5,
+    "diffusion": 1.5,
+    "agent": 1.5,
+    "rag": 1.5,
+    "fine-tuning": 1.5,
+    "reasoning": 1.5,
+}
+
+# Keywords that mark an item as a release, regardless of its source category
+RELEASE_KEYWORDS: set[str] = {
     "release",
     "launch",
-    "announcement",
-    "breakthrough",
-    "transformer",
-    "diffusion",
-    "agent",
-    "rag",
-    "fine-tuning",
-    "reasoning",
-]
+    "announce",
+    "announcing",
+    "introduces",
+    "unveiled",
+    "open-source",
+    "open source",
+}
@@ -1,14 +1,216 @@
+import json
 import logging
+import threading
+import time
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
 
+import httpx
 from google import genai
+from google.genai import errors, types
+from pydantic import TypeAdapter
 
-from src.config import GEMINI_API_KEY, GEMINI_MODEL
+from src.config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    GEMINI_PROMPT_CACHE,
+    LLM_CACHE_BYPASS,
+    LLM_CACHE_MAX_MB,
+    LLM_CACHE_TTL_HOURS,
+    LLM_CALL_TIMEOUT,
+    MAX_CONCURRENT_LLM_CALLS,
+    PROMPT_CACHE_TTL_MINUTES,
+)
+from src.generation.llm_backend import LlmBackend, LlmResponse
+from src.generation.prefix_cache import PromptPrefixCache
+from src.generation.response_cache import ResponseCache
+from src.models import LlmCall
 
 logger = logging.getLogger(__name__)
 
+# Generation can legitimately take tens of seconds (LLM_CALL_TIMEOUT); connecting should not.
+CONNECT_TIMEOUT = 10.0
 
-def generate_text(prompt: str) -> str:
-    client = genai.Client(api_key=GEMINI_API_KEY)
-    response = client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-    logger.info("Gemini response received (%d chars)", len(response.text))
-    return response.text
+# Statuses generate_content answers with when the cached content no longer exists
+CACHE_GONE_CODES = frozenset({403, 404})
+
+CallHook = Callable[[LlmCall], None]
+
+_client: genai.Client | None = None
+_client_lock = threading.Lock()
+_call_hook: CallHook | None = None
+
+CACHE_DIR = Path("data/llm_cache")
+
+_cache: ResponseCache | None = (
+    None if LLM_CACHE_BYPASS else ResponseCache(CACHE_DIR, LLM_CACHE_TTL_HOURS * 3600, LLM_CACHE_MAX_MB * 1024 * 1024)
+)
+_prefix_cache: PromptPrefixCache | None = PromptPrefixCache(PROMPT_CACHE_TTL_MINUTES * 60) if GEMINI_PROMPT_CACHE else None
+_backend: LlmBackend | None = None
+
+
+def get_client() -> genai.Client:
+    """Return the process-wide Gemini client, creating it on first use.
+
+    The client wraps one pooled ``httpx.Client``, so every call after the first
+    reuses the open keep-alive connection instead of a new TLS handshake.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                transport = httpx.Client(
+                    timeout=httpx.Timeout(LLM_CALL_TIMEOUT, connect=CONNECT_TIMEOUT),
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONCURRENT_LLM_CALLS, max_keepalive_connections=MAX_CONCURRENT_LLM_CALLS
+                    ),
+                )
+                _client = genai.Client(
+                    api_key=GEMINI_API_KEY,
+                    http_options=types.HttpOptions(timeout=int(LLM_CALL_TIMEOUT * 1000), httpx_client=transport),
+                )
+    return _client
+
+
+def set_client(client: genai.Client | None) -> None:
+    """Use ``client`` for every request (e.g. a local stub); None restores the lazy default."""
+    global _client
+    _client = client
+
+
+def set_backend(backend: LlmBackend | None) -> None:
+    """Route every request through ``backend`` (e.g. ``FakeBackend``); None restores Gemini."""
+    global _backend
+    _backend = backend
+
+
+def get_backend() -> LlmBackend:
+    return _backend or _GEMINI
+
+
+def set_call_hook(hook: CallHook | None) -> None:
+    """Install a callback that receives an ``LlmCall`` record after every request (None removes it)."""
+    global _call_hook
+    _call_hook = hook
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """Replace the response cache; None bypasses it (every prompt goes to Gemini)."""
+    global _cache
+    _cache = cache
+
+
+def set_prefix_cache(cache: PromptPrefixCache | None) -> None:
+    """Replace the prompt prefix cache; None always sends system prompts inline."""
+    global _prefix_cache
+    _prefix_cache = cache
+
+
+def discard_cached(prompt: str, response_schema: Any = None, system_instruction: str | None = None) -> None:
+    """Forget the cached response for ``prompt``, e.g. because it failed to parse."""
+    if _cache:
+        _cache.discard(get_backend().model, prompt, _request_context(response_schema, system_instruction))
+
+
+def generate_text(prompt: str, response_schema: Any = None, system_instruction: str | None = None) -> str:
+    """Send ``prompt`` to Gemini (or the backend from ``set_backend``) and return the response text.
+
+    With ``response_schema`` (a pydantic model or ``list[Model]``) Gemini runs in
+    JSON mode and its output is constrained to that schema. A static
+    ``system_instruction`` is registered once as cached content (see
+    ``PromptPrefixCache``), so each request only carries the dynamic ``prompt``.
+    """
+    backend = get_backend()
+    start = time.perf_counter()
+    call = LlmCall(model=backend.model, prompt_chars=len(prompt))
+    context = _request_context(response_schema, system_instruction)
+    try:
+        cached = _cache.get(backend.model, prompt, context) if _cache else None
+        if cached is not None:
+            text = cached
+            call.cached = True
+        else:
+            response = backend.generate(prompt, response_schema, system_instruction)
+            text = response.text
+            call.prompt_tokens = response.prompt_tokens
+            call.cached_prompt_tokens = response.cached_prompt_tokens
+            call.response_tokens = response.response_tokens
+            if _cache and text:
+                _cache.put(backend.model, prompt, text, context)
+        call.response_chars = len(text)
+    except Exception as e:
+        call.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        call.latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        if _call_hook:
+            _call_hook(call)
+
+    logger.info(
+        "%s response %s (%d chars, %.0f ms)",
+        backend.model, "served from cache" if call.cached else "received", len(text), call.latency_ms,
+    )
+    return text
+
+
+class GeminiBackend:
+    """The real model: the shared client, JSON mode and cached system prompts."""
+
+    model = GEMINI_MODEL
+
+    def generate(self, prompt: str, response_schema: Any = None, system_instruction: str | None = None) -> LlmResponse:
+        response = _generate_content(prompt, response_schema, system_instruction)
+        usage = response.usage_metadata
+        return LlmResponse(
+            text=response.text or "",
+            prompt_tokens=usage.prompt_token_count if usage else None,
+            cached_prompt_tokens=usage.cached_content_token_count if usage else None,
+            response_tokens=usage.candidates_token_count if usage else None,
+        )
+
+
+_GEMINI = GeminiBackend()
+
+
+def _generate_content(
+    prompt: str, response_schema: Any, system_instruction: str | None
+) -> types.GenerateContentResponse:
+    client = get_client()
+    config = types.GenerateContentConfig()
+    if response_schema is not None:
+        config.response_mime_type = "application/json"
+        config.response_schema = response_schema
+
+    cached_content = None
+    if system_instruction and _prefix_cache:
+        cached_content = _prefix_cache.resolve(client, GEMINI_MODEL, system_instruction)
+    if cached_content:
+        try:
+            return client.models.generate_content(
+                model=GEMINI_MODEL, contents=prompt, config=config.model_copy(update={"cached_content": cached_content})
+            )
+        except errors.ClientError as e:
+            # Only a missing cache (deleted or expired early) means the prefix
+            # should go inline; anything else, e.g. 429, is the caller's problem
+            if e.code not in CACHE_GONE_CODES:
+                raise
+            logger.warning("Cached prompt prefix %s rejected (%s), sending it inline", cached_content, e)
+            _prefix_cache.invalidate(GEMINI_MODEL, system_instruction)
+
+    if system_instruction:
+        config.system_instruction = system_instruction
+    return client.models.generate_content(model=GEMINI_MODEL, contents=prompt, config=config)
+
+
+@lru_cache(maxsize=None)
+def _request_context(response_schema: Any, system_instruction: str | None = None) -> str:
+    # Part of the cache key: the same prompt under a different schema or system
+    # prompt is a different request
+    parts = []
+    if response_schema is not None:
+        parts.append(json.dumps(TypeAdapter(response_schema).json_schema(), sort_keys=True))
+    if system_instruction:
+        parts.append(system_instruction)
+    return "\0".join(parts)
@@ -1,11 +1,28 @@
-import json
 import logging
 import re
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Any, TypeVar
 
-from src.generation.gemini_client import generate_text
-from src.generation.prompt_builder import build_prompt, build_thread_prompt
-from src.models import ContentCategory, NewsItem, TweetDraft, classify_content
+from pydantic import TypeAdapter, ValidationError
+
+from src.config import GEMINI_STRUCTURED_OUTPUT, MAX_CONCURRENT_LLM_CALLS
+from src.generation.gemini_client import discard_cached, generate_text
+from src.generation.prompt_builder import (
+    SYSTEM_PROMPT,
+    THREAD_SYSTEM_PROMPT,
+    PromptBatch,
+    build_thread_item_block,
+    plan_batches,
+    plan_thread_summary,
+)
+from src.generation.validator import TextCheck, validate_draft
+from src.generation.variants import VariantRanker
+from src.models import ContentCategory, GeneratedThread, GeneratedTweet, NewsItem, TweetDraft, classify_content
+from src.news.seen_urls import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
@@ -13,104 +30,262 @@ MAX_RETRIES = 2
 
 THREAD_CATEGORIES = {ContentCategory.RESEARCH}
 
+T = TypeVar("T")
+
+SINGLE_SCHEMA = list[GeneratedTweet]
+THREAD_SCHEMA = GeneratedThread
+# Batch responses are decoded as a list first, then validated element by element
+_ELEMENTS_ADAPTER = TypeAdapter(list[Any])
+_THREAD_ADAPTER = TypeAdapter(THREAD_SCHEMA)
+
+
+@dataclass
+class GenerationStats:
+    """Parse and validation outcome of every Gemini response, across concurrent generation calls."""
+
+    parse_attempts: int = 0
+    parse_failures: int = 0
+    drafts_repaired: int = 0  # fixed locally by the validator
+    drafts_rejected: int = 0  # sent back to Gemini
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self.parse_attempts += 1
+            if not ok:
+                self.parse_failures += 1
+
+    def record_check(self, check: TextCheck) -> None:
+        with self._lock:
+            if not check.ok:
+                self.drafts_rejected += 1
+            elif check.repairs:
+                self.drafts_repaired += 1
+
+
+def generate_tweets(
+    news_items: list[NewsItem], stats: GenerationStats | None = None, recent_tweets: Iterable[str] = ()
+) -> list[TweetDraft]:
+    """Draft one tweet (or thread) per item.
 
-def generate_tweets(news_items: list[NewsItem]) -> list[TweetDraft]:
+    Single tweets come with ranked alternatives; ``recent_tweets`` (recently
+    published texts) steer the ranking away from repeating ourselves.
+    """
     if not news_items:
         logger.info("No news items to generate tweets for")
         return []
 
-    single_items = [
-        i for i in news_items
-        if classify_content(i.source, i.title) not in THREAD_CATEGORIES
-    ]
-    thread_items = [
-        i for i in news_items
-        if classify_content(i.source, i.title) in THREAD_CATEGORIES
-    ]
+    single_items: list[NewsItem] = []
+    thread_items: list[NewsItem] = []
+    for item in news_items:
+        if classify_content(item.source, item.title) in THREAD_CATEGORIES:
+            thread_items.append(item)
+        else:
+            single_items.append(item)
 
-    drafts: list[TweetDraft] = []
-    if single_items:
-        drafts.extend(_generate_single_tweets(single_items))
-    for item in thread_items:
-        draft = _generate_thread(item)
-        if draft:
-            drafts.append(draft)
-    return drafts
+    # Single-tweet items are packed into prompts under the token budget. Those
+    # batches and every thread prompt are independent requests: run them side
+    # by side and reassemble in the original order.
+    batches = plan_batches(single_items)
+    if len(batches) > 1:
+        logger.info("Split %d single-tweet items into %d prompts", len(single_items), len(batches))
 
+    jobs: list[Callable[[], list[TweetDraft] | TweetDraft | None]] = []
+    stats = stats or GenerationStats()
+    ranker = VariantRanker(recent_tweets)
+    jobs.extend(lambda batch=batch: _generate_single_tweets(batch, stats, ranker) for batch in batches)
+    jobs.extend(lambda item=item: _generate_thread(item, stats) for item in thread_items)
 
-def _generate_single_tweets(news_items: list[NewsItem]) -> list[TweetDraft]:
-    prompt = build_prompt(news_items)
+    singles: dict[str, TweetDraft] = {}
+    threads: list[TweetDraft] = []
+    for result in run_concurrently(jobs):
+        if isinstance(result, list):
+            singles.update((d.news_url, d) for d in result)
+        elif result is not None:
+            threads.append(result)
+    return [singles[item.url] for item in single_items if item.url in singles] + threads
+
+
+def run_concurrently(jobs: list[Callable[[], T]], max_workers: int = MAX_CONCURRENT_LLM_CALLS) -> list[T | None]:
+    """Run ``jobs`` on a bounded thread pool; return their results in job order.
+
+    A job that raises is logged and contributes None, without affecting the
+    others. Each LLM request is bounded by the client's per-call timeout
+    (``LLM_CALL_TIMEOUT``), so every job eventually finishes.
+    """
+    if not jobs:
+        return []
+
+    results: list[T | None] = [None] * len(jobs)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)), thread_name_prefix="llm") as pool:
+        futures = [pool.submit(job) for job in jobs]
+        for i, future in enumerate(futures):
+            try:
+                results[i] = future.result()
+            except Exception:
+                logger.exception("Generation call %d of %d failed", i + 1, len(jobs))
+    return results
+
+
+def _generate_single_tweets(batch: PromptBatch, stats: GenerationStats, ranker: VariantRanker) -> list[TweetDraft]:
+    """Generate one tweet per item in ``batch``, accepting valid drafts element by element.
+
+    Each draft's variants are ranked and the best becomes its text. Items whose
+    draft is missing, invalid, or has no variant passing the validator are
+    re-requested on their own, so a retry prompt only carries the failures, not
+    the whole batch. Drafts the validator can repair locally are accepted as is.
+    """
+    news_items = batch.items
+    schema = SINGLE_SCHEMA if GEMINI_STRUCTURED_OUTPUT else None
+    accepted: dict[str, TweetDraft] = {}
+    rejected: dict[str, TweetDraft] = {}
+    remaining = news_items
 
     for attempt in range(MAX_RETRIES):
+        prompt = batch.block(remaining)
+        if attempt > 0:
+            prompt = (
+                f"{prompt}\n\n"
+                "IMPORTANT: Return ONLY valid JSON. No markdown fences or explanation."
+            )
+            if rejected:
+                prompt += " Follow the STRUCTURAL RULES and the NEVER USE list exactly."
         try:
-            raw = generate_text(prompt)
-            drafts = _parse_single_response(raw)
-            logger.info("Generated %d single tweet drafts", len(drafts))
-            return drafts
-        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raw = generate_text(prompt, response_schema=schema, system_instruction=SYSTEM_PROMPT)
+            drafts = _parse_single_response(raw, remaining)
+        except ValidationError as e:
+            stats.record(ok=False)
             logger.warning(
                 "Failed to parse Gemini response (attempt %d): %s", attempt + 1, e
             )
-            if attempt == 0:
-                prompt = (
-                    f"{prompt}\n\n"
-                    "IMPORTANT: Return ONLY valid JSON. No markdown fences or explanation."
-                )
+            discard_cached(prompt, schema, SYSTEM_PROMPT)
+            continue
 
-    logger.error("Failed to generate single tweets after %d attempts", MAX_RETRIES)
-    return []
+        stats.record(ok=len(drafts) == len(remaining))
+        for draft in drafts:
+            if _check_draft(draft, stats, ranker):
+                accepted[draft.news_url] = draft
+                rejected.pop(draft.news_url, None)
+            else:
+                rejected[draft.news_url] = draft
+        if any(d.news_url in rejected for d in drafts):
+            discard_cached(prompt, schema, SYSTEM_PROMPT)
+        remaining = [item for item in remaining if item.url not in accepted]
+        if not remaining:
+            break
+        logger.warning(
+            "Attempt %d: %d of %d items missing or invalid, re-requesting only those",
+            attempt + 1, len(remaining), len(news_items),
+        )
+
+    # A draft that still breaks the rules beats no draft: it goes to review as is
+    fallbacks = [item for item in remaining if item.url in rejected]
+    if fallbacks:
+        logger.warning(
+            "Keeping %d drafts that failed validation after %d attempts: %s",
+            len(fallbacks), MAX_RETRIES, [item.title[:50] for item in fallbacks],
+        )
+        accepted.update((item.url, rejected[item.url]) for item in fallbacks)
+        remaining = [item for item in remaining if item.url not in accepted]
+    if remaining:
+        logger.error(
+            "No valid draft after %d attempts for %d items: %s",
+            MAX_RETRIES, len(remaining), [item.title[:50] for item in remaining],
+        )
+    logger.info("Generated %d single tweet drafts", len(accepted))
+    # Input order, regardless of which attempt produced each draft
+    return [accepted[item.url] for item in news_items if item.url in accepted]
 
 
-def _generate_thread(item: NewsItem) -> TweetDraft | None:
-    prompt = build_thread_prompt(item)
+def _generate_thread(item: NewsItem, stats: GenerationStats) -> TweetDraft | None:
+    prompt = build_thread_item_block(item, plan_thread_summary(item))
+    schema = THREAD_SCHEMA if GEMINI_STRUCTURED_OUTPUT else None
 
+    fallback: TweetDraft | None = None
     for attempt in range(MAX_RETRIES):
         try:
-            raw = generate_text(prompt)
-            draft = _parse_thread_response(raw)
+            raw = generate_text(prompt, response_schema=schema, system_instruction=THREAD_SYSTEM_PROMPT)
+            draft = _parse_thread_response(raw, item)
+            stats.record(ok=True)
+            if not _check_draft(draft, stats) and attempt < MAX_RETRIES - 1:
+                fallback = draft
+                discard_cached(prompt, schema, THREAD_SYSTEM_PROMPT)
+                prompt = (
+                    f"{prompt}\n\n"
+                    "IMPORTANT: Follow the STRUCTURAL RULES and the NEVER USE list exactly."
+                )
+                continue
             logger.info(
                 "Generated thread draft (%d tweets): %s",
                 len(draft.thread_tweets),
                 item.title[:50],
             )
             return draft
-        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        except ValueError as e:  # includes pydantic's ValidationError
+            stats.record(ok=False)
             logger.warning(
                 "Failed to parse thread response (attempt %d): %s", attempt + 1, e
             )
+            discard_cached(prompt, schema, THREAD_SYSTEM_PROMPT)
             if attempt == 0:
                 prompt = (
                     f"{prompt}\n\n"
                     "IMPORTANT: Return ONLY valid JSON. No markdown fences or explanation."
                 )
 
+    if fallback is not None:
+        logger.warning("Keeping thread draft that failed validation: %s", item.title[:50])
+        return fallback
     logger.error("Failed to generate thread for: %s", item.title[:50])
     return None
 
 
-def _parse_single_response(raw: str) -> list[TweetDraft]:
-    cleaned = _strip_fences(raw)
-    items = json.loads(cleaned)
+def _check_draft(draft: TweetDraft, stats: GenerationStats, ranker: VariantRanker | None = None) -> bool:
+    """Repair ``draft`` in place (choosing its best variant); False when it is broken enough to re-request."""
+    check = ranker.choose(draft) if ranker else validate_draft(draft)
+    stats.record_check(check)
+    if check.repairs:
+        logger.info("Repaired draft (%s): %s", ", ".join(check.repairs), draft.news_title[:50])
+    if not check.ok:
+        logger.warning("Draft failed validation (%s): %s", "; ".join(check.problems), draft.news_title[:50])
+    return check.ok
+
+
+def _parse_single_response(raw: str, news_items: list[NewsItem]) -> list[TweetDraft]:
+    """Return the valid drafts in a batch response, one per input item at most.
+
+    Raises ValidationError only when the response is not a JSON array. Elements
+    that fail the schema, or whose ``news_url`` matches no input item, are
+    logged and skipped so the caller can re-request just those items.
+    """
+    elements = _ELEMENTS_ADAPTER.validate_json(_strip_fences(raw))
+    items_by_url = {canonicalize_url(item.url): item for item in news_items}
     now = datetime.now(timezone.utc).isoformat()
 
-    drafts: list[TweetDraft] = []
-    for item in items:
-        drafts.append(
-            TweetDraft(
-                news_url=item["news_url"],
-                news_title=item["news_title"],
-                tweet_text=item["tweet_text"],
-                created_at=now,
-            )
-        )
-    return drafts
+    drafts: dict[str, TweetDraft] = {}
+    for i, element in enumerate(elements):
+        try:
+            tweet = GeneratedTweet.model_validate(element)
+        except ValidationError as e:
+            logger.warning("Dropping invalid draft #%d: %s", i, e.errors()[0]["msg"])
+            continue
+        item = items_by_url.get(canonicalize_url(tweet.news_url))
+        if item is None:
+            logger.warning("Dropping draft #%d for unknown news_url: %s", i, tweet.news_url)
+            continue
+        if item.url in drafts:
+            continue
+        # Keep the input item's exact URL so later lookups by item.url match
+        drafts[item.url] = TweetDraft(**tweet.model_dump(exclude={"news_url"}), news_url=item.url, created_at=now)
+    return list(drafts.values())
 
 
-def _parse_thread_response(raw: str) -> TweetDraft:
-    cleaned = _strip_fences(raw)
-    data = json.loads(cleaned)
+def _parse_thread_response(raw: str, item: NewsItem) -> TweetDraft:
+    data = _THREAD_ADAPTER.validate_json(_strip_fences(raw))
+    if canonicalize_url(data.news_url) != canonicalize_url(item.url):
+        raise ValueError(f"Thread news_url {data.news_url!r} does not match the input item")
 
-    thread_tweets: list[str] = data["thread_tweets"]
+    thread_tweets: list[str] = data.thread_tweets
     if len(thread_tweets) < 2:
         raise ValueError(
             f"Thread must have at least 2 tweets, got {len(thread_tweets)}"
@@ -118,8 +293,8 @@ def _parse_thread_response(raw: str) -> TweetDraft:
 
     now = datetime.now(timezone.utc).isoformat()
     return TweetDraft(
-        news_url=data["news_url"],
-        news_title=data["news_title"],
+        news_url=item.url,
+        news_title=data.news_title,
         tweet_text=thread_tweets[0],
         thread_tweets=thread_tweets,
         created_at=now,
@@ -127,6 +302,7 @@ def _parse_thread_response(raw: str) -> TweetDraft:
 
 
 def _strip_fences(raw: str) -> str:
+    # JSON-mode responses never have fences; free-text ones sometimes do
     cleaned = raw.strip()
     cleaned = re.sub(r"^```(?:json)?\s*", "", cleaned)
     cleaned = re.sub(r"\s*```$", "", cleaned)
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+
+@dataclass
+class LlmResponse:
+    text: str
+    prompt_tokens: int | None = None
+    cached_prompt_tokens: int | None = None
+    response_tokens: int | None = None
+
+
+class LlmBackend(Protocol):
+    """What ``gemini_client.generate_text`` needs from a model: one request in, text out.
+
+    Caching of responses, the call hook and timing live in ``generate_text``,
+    so every backend gets them for free.
+    """
+
+    model: str
+
+    def generate(self, prompt: str, response_schema: Any = None, system_instruction: str | None = None) -> LlmResponse:
+        """Run one generation request; raise on transport errors and timeouts."""
+
+
+class FakeBackend:
+    """Deterministic local backend that answers generator prompts without a network.
+
+    It reads the items out of the news block and returns well-formed drafts for
+    them (a thread for ``NEWS ITEM:`` prompts, a JSON array otherwise). Latency
+    and injected failures are derived from a hash of (seed, prompt, attempt),
+    so a run behaves the same however its concurrent calls are scheduled:
+
+    - ``latency`` seconds per call, plus up to ``jitter`` seconds
+    - ``malformed_rate``: fraction of calls that return truncated JSON
+    - ``timeout_rate``: fraction of calls that wait ``timeout`` seconds and raise TimeoutError
+    """
+
+    model = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        malformed_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout: float = 1.0,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.malformed_rate = malformed_rate
+        self.timeout_rate = timeout_rate
+        self.timeout = timeout
+        self.seed = seed
+        self._attempts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str, response_schema: Any = None, system_instruction: str | None = None) -> LlmResponse:
+        rng = self._rng(prompt)
+        if rng.random() < self.timeout_rate:
+            time.sleep(self.timeout)
+            raise TimeoutError(f"fake backend timed out after {self.timeout}s")
+        time.sleep(self.latency + rng.random() * self.jitter)
+
+        text = json.dumps(_fake_payload(prompt))
+        if rng.random() < self.malformed_rate:
+            text = text[: len(text) // 2]
+        return LlmResponse(
+            text=text,
+            prompt_tokens=(len(prompt) + len(system_instruction or "")) // 4,
+            response_tokens=len(text) // 4,
+        )
+
+    def _rng(self, prompt: str) -> random.Random:
+        with self._lock:
+            attempt = self._attempts.get(prompt, 0)
+            self._attempts[prompt] = attempt + 1
+        digest = hashlib.sha256(f"{self.seed}\0{attempt}\0{prompt}".encode()).digest()
+        return random.Random(digest)
+
+
+_ITEM_PATTERN = re.compile(r"\[[^\]]*\] (?P<title>.+?): .*?\n\s*URL: (?P<url>\S+)")
+
+
+def _fake_payload(prompt: str) -> Any:
+    items = [(m["title"], m["url"]) for m in _ITEM_PATTERN.finditer(prompt)]
+    if prompt.startswith("NEWS ITEM:") and items:
+        title, url = items[0]
+        return {
+            "news_url": url,
+            "news_title": title,
+            "thread_tweets": [f"{title}, in short.", "What they found.", "Why it matters."],
+        }
+    return [
+        {
+            "news_url": url,
+            "news_title": title,
+            "tweet_text": f"Worth a read: {title}.",
+            "alternatives": [f"{title}. The details are in the writeup.", f"New: {title}."],
+        }
+        for title, url in items
+    ]
@@ -0,0 +1,87 @@
+"""Gemini cached content for the static system prompts.
+
+Dormant with today's prompts: SYSTEM_PROMPT (~600 tokens) and
+THREAD_SYSTEM_PROMPT (~380) are both below PROMPT_CACHE_MIN_TOKENS, the
+smallest prompt Gemini 2.5 Flash will cache, so ``resolve`` returns None for
+them and they are sent inline. It starts registering caches on its own once
+a system prompt grows past the minimum. ``benchmarks/prompt_prefix.py``
+measures that future saving, not current behaviour.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+
+from google import genai
+from google.genai import types
+
+from src.config import PROMPT_CACHE_MIN_TOKENS
+from src.generation.prompt_builder import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Re-register this long before the server-side TTL runs out
+REFRESH_MARGIN = 60.0
+
+
+def prompt_hash(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+
+class PromptPrefixCache:
+    """Registers static system prompts once as Gemini cached content.
+
+    Entries are keyed by a hash of model + prompt text, so editing a prompt in
+    ``prompt_builder`` registers a fresh cache on the next call and the stale
+    one simply expires server-side. Prompts estimated below ``min_tokens`` (the
+    model's minimum cacheable size) are never registered, and a prompt Gemini
+    refuses to cache anyway is remembered as ``None`` for the same TTL; both
+    are sent as a plain ``system_instruction`` instead.
+    """
+
+    def __init__(self, ttl_seconds: float, min_tokens: int = PROMPT_CACHE_MIN_TOKENS) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self._entries: dict[str, tuple[str | None, float]] = {}
+        self._lock = threading.Lock()
+        # One lock per prompt while it is being registered: concurrent callers
+        # of the same prompt wait for that request, other prompts are not blocked
+        self._registering: dict[str, threading.Lock] = {}
+
+    def resolve(self, client: genai.Client, model: str, system_instruction: str) -> str | None:
+        """Return the cached-content name for ``system_instruction``, registering it if needed."""
+        if estimate_tokens(system_instruction) < self.min_tokens:
+            return None
+
+        key = prompt_hash(model, system_instruction)
+        with self._lock:
+            registering = self._registering.setdefault(key, threading.Lock())
+        with registering:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+
+            try:
+                cached = client.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=system_instruction,
+                        ttl=f"{int(self.ttl_seconds)}s",
+                        display_name=f"prompt-{key[:12]}",
+                    ),
+                )
+                name = cached.name
+                logger.info("Registered prompt prefix %s as %s", key[:12], name)
+            except Exception as e:
+                logger.info("Prompt prefix %s not cacheable, using system_instruction: %s", key[:12], e)
+                name = None
+
+            with self._lock:
+                self._entries[key] = (name, time.monotonic() + self.ttl_seconds - REFRESH_MARGIN)
+            return name
+
+    def invalidate(self, model: str, system_instruction: str) -> None:
+        with self._lock:
+            self._entries.pop(prompt_hash(model, system_instruction), None)
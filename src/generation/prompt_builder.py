@@ -1,8 +1,33 @@
+from dataclasses import dataclass, field
+
+from src.config import MAX_TWEETS_PER_RESPONSE, PROMPT_TOKEN_BUDGET, TWEET_VARIANTS
 from src.models import NewsItem
 
+TWEET_LENGTH = 280
 # Twitter shortens URLs to 23 chars. We append the URL ourselves, so Gemini
 # should generate text-only tweets with room for the appended link.
-MAX_BODY_LENGTH = 280 - 23 - 1  # 256 chars for the tweet body
+MAX_BODY_LENGTH = TWEET_LENGTH - 23 - 1  # 256 chars for the tweet body
+
+# The "NEVER USE" lists. Both system prompts are built from these and the
+# validator rejects drafts containing them, so the two cannot drift apart.
+BANNED_PREFIXES = ("Hot take:", "Did you know", "Reminder that", "Worth noting")
+BANNED_ADJECTIVES = ("game-changer", "revolutionary", "fascinating", "exciting", "groundbreaking")
+BANNED_CLICHES = ("this could change everything", "is this the future of")
+THREAD_MARKERS = ("🧵", "Thread incoming")
+BANNED_MARKERS = (*THREAD_MARKERS, "!!")
+
+SINGLE_BANNED_PHRASES = (*BANNED_PREFIXES, *BANNED_ADJECTIVES, *BANNED_CLICHES, *BANNED_MARKERS)
+# Threads have their own list: a second finding may well be "worth noting"
+THREAD_BANNED_PHRASES = (*BANNED_ADJECTIVES, *BANNED_CLICHES, *THREAD_MARKERS)
+
+
+# Every item in a batch comes back as TWEET_VARIANTS tweets
+MAX_ITEMS_PER_PROMPT = max(1, MAX_TWEETS_PER_RESPONSE // TWEET_VARIANTS)
+
+
+def _quoted(phrases: tuple[str, ...]) -> str:
+    return ", ".join(f'"{p}"' for p in phrases)
+
 
 SYSTEM_PROMPT = f"""
 You write tweets for an AI Expert and Lead Data Scientist account. The voice is
@@ -23,10 +48,10 @@ STRUCTURAL RULES:
 - DO NOT include any URLs in the tweet text. A link is appended automatically.
 
 NEVER USE:
-- Prefixes: "Hot take:", "Did you know", "Reminder that", "Worth noting"
-- Adjectives: "game-changer", "revolutionary", "fascinating", "exciting", "groundbreaking"
-- Phrases: "this could change everything", "is this the future of", ending with "Thoughts?"
-- Format: "🧵", "Thread incoming", starting with an emoji, 3+ hashtags, multiple "!!"
+- Prefixes: {_quoted(BANNED_PREFIXES)}
+- Adjectives: {_quoted(BANNED_ADJECTIVES)}
+- Phrases: {_quoted(BANNED_CLICHES)}, ending with "Thoughts?"
+- Format: {_quoted(BANNED_MARKERS)}, starting with an emoji, 3+ hashtags
 
 EXAMPLES OF GOOD TWEETS:
 
@@ -43,9 +68,11 @@ EXAMPLES OF GOOD TWEETS:
 OUTPUT FORMAT:
 Return ONLY a valid JSON array. No markdown, no code fences, no explanation.
 Each element must have these exact keys:
-[{{"news_url": "...", "news_title": "...", "tweet_text": "..."}}]
+[{{"news_url": "...", "news_title": "...", "tweet_text": "...", "alternatives": ["...", ...]}}]
 
-Generate exactly one tweet per news item."""
+Generate exactly one element per news item: your best tweet in "tweet_text" and
+{TWEET_VARIANTS - 1} more in "alternatives". Each alternative takes a different angle
+on the story, not a rephrasing of the same sentence, and follows every rule above."""
 
 THREAD_SYSTEM_PROMPT = f"""
 You write Twitter threads for an AI Expert and Lead Data Scientist account. The voice is
@@ -67,31 +94,115 @@ THREAD STRUCTURE (4–5 tweets):
 STRUCTURAL RULES:
 - Each tweet: under {MAX_BODY_LENGTH} characters — hard limit
 - DO NOT include URLs in any tweet text. A link is appended automatically to the last tweet.
-- DO NOT number tweets ("1/", "2/") and DO NOT use thread markers ("🧵")
+- DO NOT number tweets ("1/", "2/") and DO NOT use thread markers ({_quoted(THREAD_MARKERS)})
 - DO NOT start any tweet with an emoji
 - Hashtags: 0–1 per tweet, most need none
 
 NEVER USE:
-- "game-changer", "revolutionary", "fascinating", "exciting", "groundbreaking"
-- "this could change everything", "is this the future of", ending with "Thoughts?"
+- {_quoted(BANNED_ADJECTIVES)}
+- {_quoted(BANNED_CLICHES)}, ending with "Thoughts?"
 
 OUTPUT FORMAT:
 Return ONLY a valid JSON object. No markdown, no code fences, no explanation.
 Schema: {{"news_url": "...", "news_title": "...", "thread_tweets": ["tweet1", "tweet2", ...]}}"""
 
 
+# Summary characters per item: the default (and maximum) in a batch prompt and
+# a thread prompt, and the floor the planner trims low-priority items down to.
+SUMMARY_CHARS = 200
+THREAD_SUMMARY_CHARS = 400
+MIN_SUMMARY_CHARS = 60
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: ~4 characters per token for English prose (rounded up)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
 def build_prompt(news_items: list[NewsItem]) -> str:
-    items_text = "\n".join(
-        f"- [{item.source}] {item.title}: {item.summary[:200]}\n  URL: {item.url}"
-        for item in news_items
-    )
-    return f"{SYSTEM_PROMPT}\n\nNEWS ITEMS:\n{items_text}"
+    return f"{SYSTEM_PROMPT}\n\n{build_items_block(news_items)}"
 
 
 def build_thread_prompt(item: NewsItem) -> str:
+    return f"{THREAD_SYSTEM_PROMPT}\n\n{build_thread_item_block(item)}"
+
+
+# The dynamic part of each prompt: sent on its own when the system prompt is
+# passed separately as a (cached) system instruction.
+
+
+def build_items_block(news_items: list[NewsItem], summary_chars: dict[str, int] | None = None) -> str:
+    """News block for a batch prompt; ``summary_chars`` overrides the summary length per item URL."""
+    limits = summary_chars or {}
+    items_text = "\n".join(_item_line(item, limits.get(item.url, SUMMARY_CHARS)) for item in news_items)
+    return f"NEWS ITEMS:\n{items_text}"
+
+
+def build_thread_item_block(item: NewsItem, summary_chars: int = THREAD_SUMMARY_CHARS) -> str:
     return (
-        f"{THREAD_SYSTEM_PROMPT}\n\n"
         f"NEWS ITEM:\n"
-        f"[{item.source}] {item.title}: {item.summary[:400]}\n"
+        f"[{item.source}] {item.title}: {item.summary[:summary_chars]}\n"
         f"URL: {item.url}"
     )
+
+
+def _item_line(item: NewsItem, summary_chars: int) -> str:
+    return f"- [{item.source}] {item.title}: {item.summary[:summary_chars]}\n  URL: {item.url}"
+
+
+@dataclass
+class PromptBatch:
+    items: list[NewsItem] = field(default_factory=list)
+    summary_chars: dict[str, int] = field(default_factory=dict)  # by item URL
+
+    def block(self, items: list[NewsItem] | None = None) -> str:
+        """The news block for this batch, or for a subset of it (e.g. items being retried)."""
+        return build_items_block(self.items if items is None else items, self.summary_chars)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(self.block())
+
+
+def plan_batches(
+    news_items: list[NewsItem], token_budget: int = PROMPT_TOKEN_BUDGET, max_items: int = MAX_ITEMS_PER_PROMPT
+) -> list[PromptBatch]:
+    """Pack items into batch prompts that each fit ``token_budget`` input tokens.
+
+    Items are taken in priority order (highest score first) and added to the
+    current batch while it still fits with every summary at MIN_SUMMARY_CHARS
+    and holds fewer than ``max_items`` (which bounds the JSON response length).
+    Each batch's spare budget is then spent on summaries in priority order, so
+    the lowest-priority items are the ones trimmed. An item too large for the
+    budget on its own still gets a batch of its own.
+    """
+    available = token_budget - estimate_tokens(SYSTEM_PROMPT) - estimate_tokens("NEWS ITEMS:\n")
+    batches: list[PromptBatch] = []
+    batch, used = PromptBatch(), 0
+
+    for item in sorted(news_items, key=lambda i: i.score, reverse=True):
+        cost = estimate_tokens(_item_line(item, MIN_SUMMARY_CHARS)) + 1  # + joining newline
+        if batch.items and (used + cost > available or len(batch.items) >= max_items):
+            batches.append(batch)
+            batch, used = PromptBatch(), 0
+        batch.items.append(item)
+        used += cost
+    if batch.items:
+        batches.append(batch)
+
+    for batch in batches:
+        spare_chars = max(0, available - sum(estimate_tokens(_item_line(i, MIN_SUMMARY_CHARS)) + 1 for i in batch.items))
+        spare_chars *= CHARS_PER_TOKEN
+        for item in batch.items:  # priority order
+            extra = min(SUMMARY_CHARS - MIN_SUMMARY_CHARS, spare_chars)
+            batch.summary_chars[item.url] = MIN_SUMMARY_CHARS + extra
+            spare_chars -= extra
+    return batches
+
+
+def plan_thread_summary(item: NewsItem, token_budget: int = PROMPT_TOKEN_BUDGET) -> int:
+    """Longest summary (up to THREAD_SUMMARY_CHARS) that keeps a thread prompt within ``token_budget``."""
+    fixed = estimate_tokens(THREAD_SYSTEM_PROMPT) + estimate_tokens(build_thread_item_block(item, 0))
+    return max(MIN_SUMMARY_CHARS, min(THREAD_SUMMARY_CHARS, (token_budget - fixed) * CHARS_PER_TOKEN))
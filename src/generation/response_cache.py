@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, prompt: str, context: str = "") -> str:
+    """Hash of everything that shapes the response: model, request options (``context``) and prompt."""
+    return hashlib.sha256(f"{model}\0{context}\0{prompt}".encode()).hexdigest()
+
+
+class ResponseCache:
+    """On-disk cache of LLM responses, one JSON file per (model, prompt) hash.
+
+    Entries older than ``ttl_seconds`` are treated as misses and removed. After
+    each write, the least recently used entries (by file mtime, refreshed on
+    every hit) are evicted until the directory fits in ``max_bytes``.
+    """
+
+    def __init__(self, directory: Path, ttl_seconds: float, max_bytes: int) -> None:
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+    def get(self, model: str, prompt: str, context: str = "") -> str | None:
+        path = self._path(model, prompt, context)
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:  # evicted or discarded by another run since the read
+            return None
+        return entry.get("response")
+
+    def put(self, model: str, prompt: str, response: str, context: str = "") -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = {"model": model, "created_at": time.time(), "response": response}
+        # Write to a temp file and rename, so concurrent readers never see half an entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._path(model, prompt, context))
+        self.evict()
+
+    def discard(self, model: str, prompt: str, context: str = "") -> None:
+        self._path(model, prompt, context).unlink(missing_ok=True)
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones beyond ``max_bytes``."""
+        now = time.time()
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        removed = 0
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            # mtime is never older than the entry itself, so this only drops expired files
+            if total <= self.max_bytes and now - mtime <= self.ttl_seconds:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        if removed:
+            logger.info("LLM response cache: evicted %d entries", removed)
+        return removed
+
+    def _path(self, model: str, prompt: str, context: str) -> Path:
+        return self.directory / f"{cache_key(model, prompt, context)}.json"
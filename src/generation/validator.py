@@ -0,0 +1,189 @@
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from src.generation.prompt_builder import MAX_BODY_LENGTH, SINGLE_BANNED_PHRASES, THREAD_BANNED_PHRASES, TWEET_LENGTH
+from src.models import TweetDraft
+
+# Twitter counts every URL as a t.co link of this length
+URL_WEIGHT = 23
+EMOJI_WEIGHT = 2
+
+# Code points Twitter weighs as 1 (Latin, Greek, Cyrillic, general punctuation...);
+# everything else, CJK included, weighs 2. Mirrors twitter-text's v3 config.
+_LIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+# One emoji presentation sequence: base pictograph or flag, optional variation
+# selector / skin tone, and any ZWJ-joined continuations
+_EMOJI = re.compile(
+    r"(?:[\U0001F1E6-\U0001F1FF]{2}|[\U0001F000-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF])"
+    r"[\uFE0F\U0001F3FB-\U0001F3FF]?"
+    r"(?:\u200D[\U0001F000-\U0001FAFF\u2600-\u27BF][\uFE0F\U0001F3FB-\U0001F3FF]?)*"
+)
+
+_TRAILING_HASHTAGS = re.compile(r"(?:\s*#\w+)+\s*$")
+_HASHTAG = re.compile(r"#\w+")
+_LEADING_EMOJI = re.compile(rf"^(?:{_EMOJI.pattern}\s*)+")
+_TRAILING_THOUGHTS = re.compile(r"\s*Thoughts\?\s*$", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"[.!?…](?=\s|$)")
+
+# Trimming at a sentence boundary must keep at least this much of the limit,
+# otherwise the draft is sent back for regeneration
+MIN_TRIMMED_FRACTION = 0.5
+
+
+@lru_cache(maxsize=None)
+def _banned_pattern(phrases: tuple[str, ...]) -> re.Pattern[str]:
+    """Case-insensitive matcher for ``phrases``, each a whole-word match where it starts or ends in a word character.
+
+    A hyphen also matches a space, so "game-changer" catches "game changer".
+    """
+    alternatives = []
+    for phrase in phrases:
+        pattern = re.escape(phrase).replace(r"\-", "[- ]")
+        if re.match(r"\w", phrase):
+            pattern = rf"\b{pattern}"
+        if re.search(r"\w$", phrase):
+            pattern = rf"{pattern}\b"
+        alternatives.append(pattern)
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
+
+def weighted_length(text: str) -> int:
+    """Length as Twitter counts it: URLs weigh 23, emoji 2, CJK and other wide scripts 2."""
+    length = 0
+    for part in _split_urls(text):
+        if part.startswith(("http://", "https://", "www.")):
+            length += URL_WEIGHT
+            continue
+        rest = _EMOJI.sub("\0", part)
+        length += EMOJI_WEIGHT * rest.count("\0")
+        length += sum(_char_weight(c) for c in rest if c != "\0")
+    return length
+
+
+def _split_urls(text: str) -> list[str]:
+    parts: list[str] = []
+    last = 0
+    for m in _URL.finditer(text):
+        parts.extend((text[last : m.start()], m.group(0)))
+        last = m.end()
+    parts.append(text[last:])
+    return parts
+
+
+def _char_weight(char: str) -> int:
+    code = ord(char)
+    return 1 if any(lo <= code <= hi for lo, hi in _LIGHT_RANGES) else 2
+
+
+@dataclass
+class TextCheck:
+    text: str
+    repairs: list[str] = field(default_factory=list)
+    problems: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def check_text(
+    text: str, max_length: int = MAX_BODY_LENGTH, banned_phrases: tuple[str, ...] = SINGLE_BANNED_PHRASES
+) -> TextCheck:
+    """Repair what can be fixed locally; report what needs a new generation.
+
+    Local repairs: whitespace, URLs in the body (a link is appended at publish
+    time), leading emoji, a trailing "Thoughts?", trailing hashtags beyond the
+    first, and over-length text that can be cut at a sentence boundary.
+    Problems: ``banned_phrases`` (the prompt's NEVER USE list), 3+ hashtags that are not trailing, and text that
+    is still too long or empty after repair.
+    """
+    check = TextCheck(text)
+
+    def repair(name: str, new: str) -> None:
+        if new != check.text:
+            check.text = new
+            check.repairs.append(name)
+
+    repair("whitespace", re.sub(r"[ \t]+", " ", re.sub(r"\n{3,}", "\n\n", check.text)).strip())
+    repair("url", re.sub(r"\s{2,}", " ", _URL.sub("", check.text)).strip())
+    repair("leading emoji", _LEADING_EMOJI.sub("", check.text))
+    repair("thoughts", _TRAILING_THOUGHTS.sub("", check.text))
+    repair("hashtags", _trim_trailing_hashtags(check.text))
+    if weighted_length(check.text) > max_length:
+        repair("length", _trim_to_sentence(check.text, max_length))
+
+    if not check.text:
+        check.problems.append("empty")
+    if weighted_length(check.text) > max_length:
+        check.problems.append(f"too long ({weighted_length(check.text)} > {max_length})")
+    if len(_HASHTAG.findall(check.text)) >= 3:
+        check.problems.append("3+ hashtags")
+    banned = sorted({m.group(0).lower() for m in _banned_pattern(banned_phrases).finditer(check.text)})
+    if banned:
+        check.problems.append(f"banned phrases: {', '.join(banned)}")
+    return check
+
+
+def _trim_trailing_hashtags(text: str) -> str:
+    match = _TRAILING_HASHTAGS.search(text)
+    if not match:
+        return text
+    body = text[: match.start()].rstrip()
+    allowed = 0 if _HASHTAG.search(body) else 1
+    if not body:  # nothing but hashtags: leave it for the empty/3+ checks
+        return text
+    kept = _HASHTAG.findall(match.group(0))[:allowed]
+    return " ".join([body, *kept])
+
+
+def _trim_to_sentence(text: str, max_length: int) -> str:
+    """Longest prefix ending at a sentence boundary that fits; unchanged if too little would remain."""
+    best = ""
+    for m in _SENTENCE_END.finditer(text):
+        candidate = text[: m.end()]
+        if weighted_length(candidate) > max_length:
+            break
+        best = candidate
+    if weighted_length(best) < max_length * MIN_TRIMMED_FRACTION:
+        return text
+    return best
+
+
+def validate_draft(draft: TweetDraft, max_length: int = MAX_BODY_LENGTH) -> TextCheck:
+    """Repair ``draft`` in place; the returned check lists the repairs made and the problems left.
+
+    Threads are checked tweet by tweet against the thread's banned phrases;
+    ``tweet_text`` mirrors the first one. Only the last tweet carries the
+    appended link, so only it is held to ``max_length``; the others get the
+    full tweet length.
+    """
+    if not draft.thread_tweets:
+        check = check_text(draft.tweet_text, max_length)
+        draft.tweet_text = check.text
+        return check
+
+    last = len(draft.thread_tweets) - 1
+    checks = [
+        check_text(tweet, max_length if i == last else TWEET_LENGTH, THREAD_BANNED_PHRASES)
+        for i, tweet in enumerate(draft.thread_tweets)
+    ]
+    draft.thread_tweets = [c.text for c in checks]
+    draft.tweet_text = draft.thread_tweets[0]
+    return TextCheck(
+        draft.tweet_text,
+        repairs=sorted({r for c in checks for r in c.repairs}),
+        problems=[f"tweet {i + 1}: {p}" for i, c in enumerate(checks) for p in c.problems],
+    )
+
+
+def truncate(text: str, max_length: int) -> str:
+    """Cut ``text`` to ``max_length`` weighted characters, ending with "…" when anything was dropped."""
+    if weighted_length(text) <= max_length:
+        return text
+    cut = len(text)
+    while cut and weighted_length(text[:cut]) > max_length - 1:
+        cut -= 1
+    return text[:cut].rstrip() + "…"
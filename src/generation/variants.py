@@ -0,0 +1,63 @@
+import re
+from collections.abc import Iterable
+
+from src.generation.prompt_builder import MAX_BODY_LENGTH
+from src.generation.validator import TextCheck, check_text, weighted_length
+from src.models import TweetDraft
+
+# Tweets land best well under the hard limit: length fit peaks here (as a
+# fraction of the limit) and falls off linearly on both sides
+TARGET_LENGTH_FRACTION = 0.65
+# Every remaining problem outweighs any length or novelty difference
+PROBLEM_PENALTY = 10.0
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> frozenset[str]:
+    return frozenset(w.lower() for w in _WORD.findall(text))
+
+
+class VariantRanker:
+    """Order tweet variants by cheap local heuristics, best first.
+
+    A variant scores for fitting the target length, loses heavily for every
+    problem the validator finds, and loses for word overlap (Jaccard) with the
+    most similar recently published tweet.
+    """
+
+    def __init__(self, recent_tweets: Iterable[str] = (), max_length: int = MAX_BODY_LENGTH) -> None:
+        self.max_length = max_length
+        self._recent = [words for words in map(_words, recent_tweets) if words]
+
+    def score(self, check: TextCheck) -> float:
+        target = self.max_length * TARGET_LENGTH_FRACTION
+        length_fit = 1.0 - abs(weighted_length(check.text) - target) / self.max_length
+        return length_fit - PROBLEM_PENALTY * len(check.problems) - self.similarity(check.text)
+
+    def similarity(self, text: str) -> float:
+        """Highest Jaccard word overlap between ``text`` and a recent tweet (0 when there are none)."""
+        words = _words(text)
+        if not words:
+            return 0.0
+        return max((len(words & other) / len(words | other) for other in self._recent), default=0.0)
+
+    def rank(self, texts: Iterable[str]) -> list[TextCheck]:
+        """Repair each distinct variant and return their checks, best first (stable on ties)."""
+        checks: dict[str, TextCheck] = {}
+        for text in texts:
+            check = check_text(text, self.max_length)
+            if check.text:
+                checks.setdefault(check.text, check)
+        return sorted(checks.values(), key=self.score, reverse=True)
+
+    def choose(self, draft: TweetDraft) -> TextCheck:
+        """Make the best variant the draft's text and keep the other clean ones as alternatives.
+
+        Returns the check of the chosen variant.
+        """
+        ranked = self.rank([draft.tweet_text, *draft.alternatives]) or [check_text(draft.tweet_text, self.max_length)]
+        best, *rest = ranked
+        draft.tweet_text = best.text
+        draft.alternatives = [c.text for c in rest if c.ok]
+        return best
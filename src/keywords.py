@@ -0,0 +1,48 @@
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+
+from src.config import BOOST_KEYWORDS, RELEASE_KEYWORDS
+
+
+class KeywordMatcher:
+    """Find every keyword in a text with one precompiled regex pass.
+
+    Keywords match case-insensitively at the start of a word. Alternatives are
+    tried longest first, so when "claude code" matches, the shorter keywords it
+    starts with ("claude") are reported too.
+    """
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        normalized = sorted({kw.lower() for kw in keywords}, key=len, reverse=True)
+        self._pattern = re.compile(r"\b(?:" + "|".join(re.escape(kw) for kw in normalized) + ")", re.IGNORECASE)
+        self._implied = {kw: frozenset(other for other in normalized if kw.startswith(other)) for kw in normalized}
+
+    def match(self, text: str) -> frozenset[str]:
+        found: set[str] = set()
+        for m in self._pattern.finditer(text):
+            found |= self._implied[m.group(0).lower()]
+        return frozenset(found)
+
+
+_BOOSTS = {kw.lower(): boost for kw, boost in BOOST_KEYWORDS.items()}
+_RELEASE = frozenset(kw.lower() for kw in RELEASE_KEYWORDS)
+_MATCHER = KeywordMatcher([*_BOOSTS, *_RELEASE])
+
+
+@lru_cache(maxsize=4096)
+def match_keywords(title: str) -> frozenset[str]:
+    """Return every boost and release keyword found in ``title`` (lowercased).
+
+    Cached per title, so scoring and classification of the same item share
+    a single regex pass.
+    """
+    return _MATCHER.match(title)
+
+
+def keyword_boost(matches: frozenset[str]) -> float:
+    return max((_BOOSTS[kw] for kw in matches if kw in _BOOSTS), default=1.0)
+
+
+def is_release(matches: frozenset[str]) -> bool:
+    return not _RELEASE.isdisjoint(matches)
@@ -1,7 +1,10 @@
+import hashlib
 from datetime import datetime
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field, create_model
+
+from src.keywords import is_release, match_keywords
 
 
 class NewsItem(BaseModel):
@@ -27,17 +30,6 @@ class ContentCategory(str, Enum):
     BLOG = "blog"
 
 
-RELEASE_KEYWORDS = {
-    "release",
-    "launch",
-    "announce",
-    "announcing",
-    "introduces",
-    "unveiled",
-    "open-source",
-    "open source",
-}
-
 SOURCE_CATEGORY_MAP: dict[str, ContentCategory] = {
     "ArXiv CS.AI+CS.LG": ContentCategory.RESEARCH,
     "TechCrunch AI": ContentCategory.NEWS,
@@ -65,8 +57,7 @@ CATEGORY_EMOJI: dict[ContentCategory, str] = {
 
 
 def classify_content(source: str, title: str) -> ContentCategory:
-    title_lower = title.lower()
-    if any(kw in title_lower for kw in RELEASE_KEYWORDS):
+    if is_release(match_keywords(title)):
         return ContentCategory.RELEASE
     return SOURCE_CATEGORY_MAP.get(source, ContentCategory.NEWS)
 
@@ -76,14 +67,21 @@ class TweetDraft(BaseModel):
     news_title: str
     tweet_text: str = ""
     thread_tweets: list[str] = []
+    alternatives: list[str] = []  # runner-up tweet texts, best first
     source_score: float = 0.0
     category: ContentCategory = ContentCategory.NEWS
     status: TweetStatus = TweetStatus.PENDING
     telegram_message_id: int | None = None
+    telegram_handle: int | None = None  # 1-based position in a digest message; None for a message of its own
     created_at: str = ""
     published_at: str | None = None
     tweet_id: str | None = None
 
+    @property
+    def key(self) -> str:
+        """Short stable id for Telegram callback data (which is capped at 64 bytes)."""
+        return hashlib.blake2b(f"{self.news_url}\0{self.created_at}".encode(), digest_size=5).hexdigest()
+
     @property
     def is_thread(self) -> bool:
         return len(self.thread_tweets) > 1
@@ -98,6 +96,26 @@ class TweetDraft(BaseModel):
         self.status = TweetStatus.PUBLISHED
         self.tweet_id = tweet_id
         self.published_at = datetime.now().isoformat()
+        self.alternatives = []
+
+    def next_alternative(self) -> bool:
+        """Swap in the best remaining alternative; False when there is none left."""
+        if not self.alternatives:
+            return False
+        self.tweet_text = self.alternatives.pop(0)
+        return True
+
+
+def _draft_output_model(name: str, *fields: str, optional: tuple[str, ...] = ()) -> type[BaseModel]:
+    # The part of a TweetDraft that Gemini writes; fields are required unless listed in ``optional``
+    required = {f: (TweetDraft.model_fields[f].annotation, ...) for f in fields}
+    defaults = {f: (TweetDraft.model_fields[f].annotation, TweetDraft.model_fields[f].default) for f in optional}
+    return create_model(name, **required, **defaults)
+
+
+# Response schemas for structured generation (JSON mode)
+GeneratedTweet = _draft_output_model("GeneratedTweet", "news_url", "news_title", "tweet_text", optional=("alternatives",))
+GeneratedThread = _draft_output_model("GeneratedThread", "news_url", "news_title", "thread_tweets")
 
 
 class ScoredCandidate(BaseModel):
@@ -108,16 +126,53 @@ class ScoredCandidate(BaseModel):
     selected: bool = False
 
 
+class LlmCall(BaseModel):
+    model: str
+    latency_ms: float = 0.0
+    prompt_chars: int = 0
+    response_chars: int = 0
+    prompt_tokens: int | None = None
+    cached_prompt_tokens: int | None = None  # part of prompt_tokens served from a cached prefix
+    response_tokens: int | None = None
+    cached: bool = False
+    error: str | None = None
+
+
 class RunLog(BaseModel):
     timestamp: str
     total_fetched: int
     after_dedup: int
     candidates: list[ScoredCandidate]
     drafts_generated: int = 0
+    feed_cache_hits: dict[str, int] = {}
+    feed_cache_misses: dict[str, int] = {}
+    llm_calls: list[LlmCall] = []
+    parse_attempts: int = 0
+    parse_failures: int = 0
+    drafts_repaired: int = 0
+    drafts_rejected: int = 0
+
+    @computed_field
+    @property
+    def parse_failure_rate(self) -> float:
+        return round(self.parse_failures / self.parse_attempts, 3) if self.parse_attempts else 0.0
+
+
+class FeedCacheEntry(BaseModel):
+    etag: str = ""
+    last_modified: str = ""
+    # High-water mark: newest entry processed so far (ISO timestamp + entry GUID)
+    last_published: str = ""
+    last_guid: str = ""
+
+
+class FeedCache(BaseModel):
+    sources: dict[str, FeedCacheEntry] = {}
 
 
 class AppState(BaseModel):
     seen_urls: list[str] = []
+    seen_titles: list[str] = []
     pending_drafts: list[TweetDraft] = []
     published_tweets: list[TweetDraft] = []
     last_telegram_update_id: int = 0
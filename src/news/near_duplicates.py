@@ -0,0 +1,98 @@
+import hashlib
+import random
+from collections import defaultdict
+from collections.abc import Iterable
+from difflib import SequenceMatcher
+
+from src.config import DEDUP_SIMILARITY_THRESHOLD
+
+# MinHash/LSH parameters. Signatures of NUM_BANDS × ROWS_PER_BAND hashes over
+# character 3-gram shingles; two titles become candidates when any band matches.
+# Titles SequenceMatcher scores above 0.8 share roughly half or more of their
+# shingles, and 20 bands of 3 rows catch a pair at Jaccard 0.5 with ~93%
+# probability (~99.7% at 0.6) while unrelated titles (Jaccard < 0.1) almost
+# never collide. The exact ratio check then decides.
+SHINGLE_SIZE = 3
+NUM_BANDS = 20
+ROWS_PER_BAND = 3
+
+# Each "permutation" XORs the 64-bit shingle hashes with a random mask: far
+# cheaper than modular arithmetic in pure Python and good enough for LSH.
+_rng = random.Random(0x7EE7)  # fixed seed: signatures are stable across runs
+_MASKS = [_rng.getrandbits(64) for _ in range(NUM_BANDS * ROWS_PER_BAND)]
+
+
+def _hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+
+
+def _shingles(text: str) -> set[int]:
+    if len(text) <= SHINGLE_SIZE:
+        return {_hash(text)}
+    return {_hash(text[i : i + SHINGLE_SIZE]) for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _band_keys(text: str) -> list[tuple[int, ...]]:
+    hashes = _shingles(text)
+    signature = [min([h ^ mask for h in hashes]) for mask in _MASKS]
+    return [
+        (band, *signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND])
+        for band in range(NUM_BANDS)
+    ]
+
+
+class TitleIndex:
+    """Near-duplicate title detector backed by MinHash locality-sensitive hashing.
+
+    LSH only proposes candidates; a title is a duplicate when a candidate's
+    ``SequenceMatcher`` ratio exceeds ``threshold``, the same test the ranker
+    has always applied, so matches keep ``DEDUP_SIMILARITY_THRESHOLD`` semantics.
+    """
+
+    def __init__(self, titles: Iterable[str] = (), threshold: float = DEDUP_SIMILARITY_THRESHOLD) -> None:
+        self.threshold = threshold
+        self._titles: list[str] = []
+        self._buckets: defaultdict[tuple[int, ...], list[int]] = defaultdict(list)
+        for title in titles:
+            self.add(title)
+
+    def add(self, title: str) -> None:
+        text = title.lower()
+        self._insert(text, _band_keys(text))
+
+    def is_duplicate(self, title: str) -> bool:
+        return self._find(title.lower(), _band_keys(title.lower()))
+
+    def add_if_new(self, title: str) -> bool:
+        """Add ``title`` unless it duplicates an indexed one; return True if added."""
+        text = title.lower()
+        keys = _band_keys(text)
+        if self._find(text, keys):
+            return False
+        self._insert(text, keys)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def _insert(self, text: str, keys: list[tuple[int, ...]]) -> None:
+        position = len(self._titles)
+        self._titles.append(text)
+        for key in keys:
+            self._buckets[key].append(position)
+
+    def _find(self, text: str, keys: list[tuple[int, ...]]) -> bool:
+        checked: set[int] = set()
+        for key in keys:
+            for position in self._buckets.get(key, ()):
+                if position in checked:
+                    continue
+                checked.add(position)
+                matcher = SequenceMatcher(None, text, self._titles[position])
+                if (
+                    matcher.real_quick_ratio() > self.threshold
+                    and matcher.quick_ratio() > self.threshold
+                    and matcher.ratio() > self.threshold
+                ):
+                    return True
+        return False
@@ -1,10 +1,16 @@
+import heapq
 import logging
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from difflib import SequenceMatcher
 from email.utils import parsedate_to_datetime
+from itertools import islice
 
-from src.config import BOOST_KEYWORDS, DEDUP_SIMILARITY_THRESHOLD, RECENCY_THRESHOLD_HOURS
+from src.config import RECENCY_THRESHOLD_HOURS
+from src.keywords import keyword_boost, match_keywords
 from src.models import NewsItem
+from src.news.near_duplicates import TitleIndex
+from src.news.seen_urls import SeenUrlIndex
 from src.news.sources import NewsSource
 
 logger = logging.getLogger(__name__)
@@ -13,15 +19,43 @@ logger = logging.getLogger(__name__)
 # Theoretical maximum: best source weight (0.9) × max recency (1.0) × keyword boost (1.5)
 _MAX_RAW_SCORE = 0.9 * 1.0 * 1.5  # = 1.35
 
+DEFAULT_SOURCE_WEIGHT = 0.5
+
+# Number of top-scored candidates kept for the run log
+RUN_LOG_CANDIDATES = 50
+
+# Items are scored in chunks of this size when ranking a stream
+SCORE_BATCH_SIZE = 256
+
 
 def score_item(item: NewsItem, source_weight: float) -> float:
-    recency = _recency_score(item.published)
-    keyword = _keyword_boost(item.title)
-    raw = source_weight * recency * keyword
-    return round(raw / _MAX_RAW_SCORE * 10, 2)
+    return score_items([item], {item.source: source_weight})[0]
+
+
+def score_items(
+    items: Sequence[NewsItem], source_weights: Mapping[str, float], now: datetime | None = None
+) -> list[float]:
+    """Score a batch of items against a single ``now``; returns scores aligned with ``items``.
+
+    Each distinct ``published`` string is parsed once (whole ArXiv batches
+    share one timestamp), and the weight, recency and keyword factors are
+    computed column by column.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    recency_by_date: dict[str, float] = {}
+    for item in items:
+        if item.published not in recency_by_date:
+            recency_by_date[item.published] = _recency_score(item.published, now)
 
+    weights = [source_weights.get(item.source, DEFAULT_SOURCE_WEIGHT) for item in items]
+    recency = [recency_by_date[item.published] for item in items]
+    boosts = [_keyword_boost(item.title) for item in items]
 
-def _recency_score(published: str) -> float:
+    return [round(w * r * k / _MAX_RAW_SCORE * 10, 2) for w, r, k in zip(weights, recency, boosts)]
+
+
+def _recency_score(published: str, now: datetime | None = None) -> float:
     if not published:
         return 0.3  # Unknown date gets a low but non-zero score
 
@@ -32,7 +66,7 @@ def _recency_score(published: str) -> float:
     except (ValueError, TypeError):
         return 0.3
 
-    age_hours = (datetime.now(timezone.utc) - pub_dt).total_seconds() / 3600
+    age_hours = ((now or datetime.now(timezone.utc)) - pub_dt).total_seconds() / 3600
 
     if age_hours < 12:
         return 1.0
@@ -44,65 +78,145 @@ def _recency_score(published: str) -> float:
 
 
 def _keyword_boost(title: str) -> float:
-    title_lower = title.lower()
-    for keyword in BOOST_KEYWORDS:
-        if keyword in title_lower:
-            return 1.5
-    return 1.0
+    return keyword_boost(match_keywords(title))
 
 
-def deduplicate(items: list[NewsItem], seen_urls: list[str]) -> list[NewsItem]:
-    unique: list[NewsItem] = []
-    seen_titles: list[str] = []
-
-    for item in items:
-        if item.url in seen_urls:
-            continue
-
-        is_duplicate = False
-        for title in seen_titles:
-            if SequenceMatcher(None, item.title.lower(), title.lower()).ratio() > DEDUP_SIMILARITY_THRESHOLD:
-                is_duplicate = True
-                break
+def deduplicate(
+    items: Iterable[NewsItem], seen_urls: Iterable[str], seen_titles: Iterable[str] = ()
+) -> list[NewsItem]:
+    """Drop items whose URL was already seen or whose title near-duplicates an earlier one.
 
-        if not is_duplicate:
-            unique.append(item)
-            seen_titles.append(item.title)
+    Titles are checked against ``seen_titles`` (previous runs) and against the
+    items already kept from this batch.
+    """
+    return list(iter_unique(items, seen_urls, seen_titles))
 
-    return unique
 
+def iter_unique(
+    items: Iterable[NewsItem], seen_urls: Iterable[str], seen_titles: Iterable[str] = ()
+) -> Iterator[NewsItem]:
+    """Streaming form of ``deduplicate``: yields items as they pass the checks."""
+    seen = seen_urls if isinstance(seen_urls, SeenUrlIndex) else SeenUrlIndex(seen_urls)
+    titles = TitleIndex(seen_titles)
 
-def rank_and_filter(
-    items: list[NewsItem],
+    for item in items:
+        if item.url in seen:
+            continue
+        if titles.add_if_new(item.title):
+            yield item
+
+
+@dataclass
+class Ranking:
+    selected: list[NewsItem]
+    candidates: list[NewsItem]  # best ``log_size`` items, highest score first
+    considered: int  # items that survived filtering and dedup
+    total: int = 0  # items consumed from the input
+
+
+class TopKSelector:
+    """Streaming top-k selection with per-category diversity.
+
+    Items are pushed one at a time. A bounded min-heap per category keeps its
+    ``per_category`` best items and a global heap keeps the ``log_size`` best
+    overall, so memory stays O(categories × per_category + log_size) and each
+    push costs O(log k). Ties go to the item pushed first.
+    """
+
+    def __init__(self, max_items: int, per_category: int = 1, log_size: int = RUN_LOG_CANDIDATES) -> None:
+        self.max_items = max_items
+        self.per_category = per_category
+        self.log_size = log_size
+        self.considered = 0
+        self._by_category: dict[str, list[tuple[float, int, NewsItem]]] = {}
+        self._top: list[tuple[float, int, NewsItem]] = []
+
+    def push(self, item: NewsItem, category: str) -> None:
+        # Negated sequence number: among equal scores the earlier item is "larger"
+        entry = (item.score, -self.considered, item)
+        self.considered += 1
+        _push_bounded(self._by_category.setdefault(category, []), entry, self.per_category)
+        _push_bounded(self._top, entry, self.log_size)
+
+    def result(self) -> Ranking:
+        best = sorted((e for heap in self._by_category.values() for e in heap), key=_entry_key, reverse=True)
+        return Ranking(
+            selected=[item for _, _, item in best[: self.max_items]],
+            candidates=[item for _, _, item in sorted(self._top, key=_entry_key, reverse=True)],
+            considered=self.considered,
+        )
+
+
+def _entry_key(entry: tuple[float, int, NewsItem]) -> tuple[float, int]:
+    return entry[0], entry[1]
+
+
+def _push_bounded(heap: list[tuple[float, int, NewsItem]], entry: tuple[float, int, NewsItem], size: int) -> None:
+    if size <= 0:
+        return
+    if len(heap) < size:
+        heapq.heappush(heap, entry)
+    elif _entry_key(entry) > _entry_key(heap[0]):
+        heapq.heapreplace(heap, entry)
+
+
+def rank_items(
+    items: Iterable[NewsItem],
     sources: list[NewsSource],
-    seen_urls: list[str],
+    seen_urls: Iterable[str],
     max_items: int = 5,
-) -> list[NewsItem]:
+    seen_titles: Iterable[str] = (),
+    log_size: int = RUN_LOG_CANDIDATES,
+    per_category: int | None = None,
+) -> Ranking:
+    """Score, filter and deduplicate ``items`` and select the best ``max_items``, at most ``per_category`` per source category.
+
+    ``per_category`` defaults to ``max_items`` spread evenly over the source
+    categories (rounded up), so every category gets a share of the run but
+    ``max_items`` above the category count can still be filled.
+
+    ``items`` may be a generator (see ``rss_parser.iter_feed_items``): it is
+    consumed in chunks of SCORE_BATCH_SIZE and only the selector's heaps are
+    kept, so memory is bounded by the selection size, not the feed volume.
+    """
     source_weights = {s.name: s.weight for s in sources}
     source_categories = {s.name: s.category for s in sources}
-
-    for item in items:
-        weight = source_weights.get(item.source, 0.5)
-        item.score = score_item(item, weight)
-
-    filtered = [item for item in items if item.score > 0.0]
-    deduped = deduplicate(filtered, seen_urls)
-    ranked = sorted(deduped, key=lambda x: x.score, reverse=True)
-
-    # Select the top-scored item per source category (arxiv / news / blog)
-    # to ensure content diversity in each generation run.
-    selected: list[NewsItem] = []
-    seen_categories: set[str] = set()
-    for item in ranked:
-        category = source_categories.get(item.source, "news")
-        if category not in seen_categories:
-            selected.append(item)
-            seen_categories.add(category)
-        if len(selected) >= max_items:
-            break
+    now = datetime.now(timezone.utc)
+    total = 0
+
+    def scored() -> Iterator[NewsItem]:
+        nonlocal total
+        iterator = iter(items)
+        while batch := list(islice(iterator, SCORE_BATCH_SIZE)):
+            total += len(batch)
+            for item, score in zip(batch, score_items(batch, source_weights, now)):
+                item.score = score
+                if score > 0.0:
+                    yield item
+
+    # Cap each source category (arxiv / news / blog) to ensure content
+    # diversity in each generation run.
+    if per_category is None:
+        categories = len(set(source_categories.values())) or 1
+        per_category = -(-max_items // categories)
+    selector = TopKSelector(max_items, per_category=per_category, log_size=log_size)
+    for item in iter_unique(scored(), seen_urls, seen_titles):
+        selector.push(item, source_categories.get(item.source, "news"))
+    ranking = selector.result()
+    ranking.total = total
 
     logger.info(
         "Ranked %d items from %d total (after dedup from %d)",
-        len(selected), len(ranked), len(items),
+        len(ranking.selected), ranking.considered, total,
     )
-    return selected
+    return ranking
+
+
+def rank_and_filter(
+    items: list[NewsItem],
+    sources: list[NewsSource],
+    seen_urls: Iterable[str],
+    max_items: int = 5,
+    seen_titles: Iterable[str] = (),
+) -> list[NewsItem]:
+    return rank_items(items, sources, seen_urls, max_items, seen_titles).selected
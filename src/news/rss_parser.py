@@ -1,9 +1,13 @@
+import asyncio
 import logging
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 
 import feedparser
 import httpx
 
-from src.models import NewsItem
+from src.models import FeedCache, FeedCacheEntry, NewsItem
 from src.news.sources import NewsSource
 
 logger = logging.getLogger(__name__)
@@ -11,44 +15,238 @@ logger = logging.getLogger(__name__)
 HTTP_TIMEOUT = 10.0
 HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; RSSReader/1.0)"}
 
+# Concurrent fetching: at most MAX_CONCURRENT_FETCHES requests in flight, and
+# the whole run is abandoned after FETCH_DEADLINE seconds (slow feeds are dropped).
+MAX_CONCURRENT_FETCHES = 8
+FETCH_DEADLINE = 30.0
 
-def fetch_feed(source: NewsSource) -> list[NewsItem]:
+
+@dataclass
+class FetchStats:
+    """Per-source conditional GET counters (304 = hit, 200 = miss)."""
+
+    cache_hits: dict[str, int] = field(default_factory=dict)
+    cache_misses: dict[str, int] = field(default_factory=dict)
+
+    def record(self, source_name: str, hit: bool) -> None:
+        counters = self.cache_hits if hit else self.cache_misses
+        counters[source_name] = counters.get(source_name, 0) + 1
+
+
+def fetch_feed(
+    source: NewsSource, cache: FeedCache | None = None, stats: FetchStats | None = None
+) -> list[NewsItem]:
     try:
         response = httpx.get(
-            source.url, timeout=HTTP_TIMEOUT, follow_redirects=True, headers=HEADERS
+            source.url,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            headers=HEADERS | _conditional_headers(source, cache),
         )
-        response.raise_for_status()
+        if response.status_code != 304:
+            response.raise_for_status()
     except httpx.HTTPError as e:
         logger.warning("Failed to fetch %s: %s", source.name, e)
         return []
 
-    feed = feedparser.parse(response.text)
+    body = _accept_response(source, response, cache, stats)
+    if body is None:
+        return []
+    return list(_iter_feed(source, body, _watermark(source, cache)))
+
+
+def fetch_all_feeds(
+    sources: list[NewsSource],
+    cache: FeedCache | None = None,
+    stats: FetchStats | None = None,
+    max_concurrency: int = MAX_CONCURRENT_FETCHES,
+    deadline: float = FETCH_DEADLINE,
+) -> list[NewsItem]:
+    """Fetch all sources concurrently and return their items in source order.
+
+    When a ``cache`` is given, requests carry the stored ETag / Last-Modified
+    validators and feeds answering 304 Not Modified contribute no items.
+    """
+    return list(iter_feed_items(sources, cache, stats, max_concurrency, deadline))
+
+
+def iter_feed_items(
+    sources: list[NewsSource],
+    cache: FeedCache | None = None,
+    stats: FetchStats | None = None,
+    max_concurrency: int = MAX_CONCURRENT_FETCHES,
+    deadline: float = FETCH_DEADLINE,
+) -> Iterator[NewsItem]:
+    """Streaming form of ``fetch_all_feeds``.
+
+    Feed bodies are downloaded concurrently, then parsed one source at a time
+    (in source order) and yielded entry by entry, so no list of every item is
+    ever built. Each raw body is released as soon as it has been parsed.
+    Watermarks in ``cache`` advance once a feed's entries are fully consumed.
+    """
+    if not sources:
+        return
+
+    bodies = asyncio.run(_fetch_all_async(sources, cache, stats, max_concurrency, deadline))
+    for i, source in enumerate(sources):
+        body, bodies[i] = bodies[i], None
+        if body is not None:
+            yield from _iter_feed(source, body, _watermark(source, cache))
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(timeout=HTTP_TIMEOUT, follow_redirects=True, headers=HEADERS)
+
+
+async def _fetch_all_async(
+    sources: list[NewsSource],
+    cache: FeedCache | None,
+    stats: FetchStats | None,
+    max_concurrency: int,
+    deadline: float,
+) -> list[str | None]:
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async with _build_async_client() as client:
+        tasks = [
+            asyncio.create_task(_fetch_feed_async(client, source, semaphore, cache, stats))
+            for source in sources
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            timed_out = [s.name for s, t in zip(sources, tasks) if t in pending]
+            logger.warning("Fetch deadline (%.0fs) exceeded, skipping: %s", deadline, ", ".join(timed_out))
+
+    return [task.result() if task in done else None for task in tasks]
+
+
+async def _fetch_feed_async(
+    client: httpx.AsyncClient,
+    source: NewsSource,
+    semaphore: asyncio.Semaphore,
+    cache: FeedCache | None,
+    stats: FetchStats | None,
+) -> str | None:
+    async with semaphore:
+        try:
+            response = await client.get(source.url, headers=_conditional_headers(source, cache))
+            if response.status_code != 304:
+                response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning("Failed to fetch %s: %s", source.name, e)
+            return None
+
+    return _accept_response(source, response, cache, stats)
+
+
+def _conditional_headers(source: NewsSource, cache: FeedCache | None) -> dict[str, str]:
+    entry = cache.sources.get(source.name) if cache else None
+    if entry is None:
+        return {}
+
+    headers: dict[str, str] = {}
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def _accept_response(
+    source: NewsSource, response: httpx.Response, cache: FeedCache | None, stats: FetchStats | None
+) -> str | None:
+    """Record cache stats and validators; return the body, or None if the feed is unchanged."""
+    not_modified = response.status_code == 304
+    if stats is not None:
+        stats.record(source.name, hit=not_modified)
+
+    if not_modified:
+        # Nothing changed since the last run: skip parsing entirely
+        logger.info("Feed not modified: %s", source.name)
+        return None
+
+    if cache is not None:
+        previous = cache.sources.get(source.name, FeedCacheEntry())
+        cache.sources[source.name] = previous.model_copy(
+            update={
+                "etag": response.headers.get("ETag", ""),
+                "last_modified": response.headers.get("Last-Modified", ""),
+            }
+        )
+
+    return response.text
+
+
+def _watermark(source: NewsSource, cache: FeedCache | None) -> FeedCacheEntry | None:
+    return cache.sources.get(source.name) if cache is not None else None
+
+
+def _iter_feed(source: NewsSource, text: str, watermark: FeedCacheEntry | None = None) -> Iterator[NewsItem]:
+    """Yield feed entries as NewsItems, skipping entries at or below the watermark.
+
+    Entries are compared by (published time, GUID) against
+    ``watermark.last_published`` / ``watermark.last_guid``, whatever order the
+    feed lists them in; the GUID only breaks ties at the same timestamp.
+    Undated entries are skipped only when their GUID is the watermark's.
+    Skipped entries are never materialised. The watermark is advanced in place
+    to the newest entry seen.
+    """
+    feed = feedparser.parse(text)
     if feed.bozo and not feed.entries:
         logger.warning("Malformed feed from %s: %s", source.name, feed.bozo_exception)
-        return []
+        return
+
+    since = datetime.fromisoformat(watermark.last_published) if watermark and watermark.last_published else None
+    since_guid = watermark.last_guid if watermark else ""
+    newest: tuple[datetime, str] | None = None
+    first_guid = ""
+    skipped = 0
+    count = 0
 
-    items: list[NewsItem] = []
     for entry in feed.entries:
+        guid = entry.get("id") or entry.get("link", "")
+        first_guid = first_guid or guid
+
+        published_at = _entry_published(entry)
+        if published_at is None:
+            below = bool(since_guid) and guid == since_guid
+        else:
+            newest = max(newest, (published_at, guid)) if newest else (published_at, guid)
+            below = since is not None and (published_at, guid) <= (since, since_guid)
+        if below:
+            skipped += 1
+            continue
+
         title = entry.get("title", "").strip()
         url = entry.get("link", "").strip()
         if not title or not url:
             continue
-        items.append(
-            NewsItem(
-                title=title,
-                url=url,
-                summary=entry.get("summary", "")[:500],
-                published=entry.get("published", ""),
-                source=source.name,
-            )
+        count += 1
+        yield NewsItem(
+            title=title,
+            url=url,
+            summary=entry.get("summary", "")[:500],
+            published=entry.get("published", ""),
+            source=source.name,
         )
 
-    logger.info("Fetched %d items from %s", len(items), source.name)
-    return items
+    if watermark is not None:
+        if newest is not None and (since is None or newest[0] >= since):
+            watermark.last_published = newest[0].isoformat()
+            watermark.last_guid = newest[1]
+        elif newest is None and first_guid:
+            # Undated feed: remember the first entry's GUID so at least it is not repeated
+            watermark.last_guid = first_guid
+
+    logger.info("Fetched %d items from %s (%d below watermark)", count, source.name, skipped)
 
 
-def fetch_all_feeds(sources: list[NewsSource]) -> list[NewsItem]:
-    all_items: list[NewsItem] = []
-    for source in sources:
-        all_items.extend(fetch_feed(source))
-    return all_items
+def _entry_published(entry: feedparser.FeedParserDict) -> datetime | None:
+    parsed = entry.get("published_parsed")
+    if not parsed:
+        return None
+    return datetime(*parsed[:6], tzinfo=timezone.utc)
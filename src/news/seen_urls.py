@@ -0,0 +1,58 @@
+import re
+from collections.abc import Iterable, Iterator
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# arxiv.org/abs/2602.18473v2 and arxiv.org/abs/2602.18473 are the same paper
+_ARXIV_VERSION_RE = re.compile(r"^(/(?:abs|pdf)/\d{4}\.\d{4,5})v\d+$")
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalise a URL so trivially different links to the same article compare equal.
+
+    Lowercases scheme and host, drops ``utm_*`` tracking parameters and
+    trailing slashes, and strips ArXiv version suffixes.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+
+    path = parts.path.rstrip("/")
+    if host.endswith("arxiv.org"):
+        path = _ARXIV_VERSION_RE.sub(r"\1", path)
+
+    query = parts.query
+    if "utm_" in query.lower():
+        query = urlencode([(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if not k.lower().startswith("utm_")])
+    return urlunsplit((parts.scheme.lower(), host, path, query, parts.fragment))
+
+
+class SeenUrlIndex:
+    """Insertion-ordered set of canonical URLs with constant-time membership.
+
+    Backed by a dict, so iteration yields URLs oldest first and the index
+    can be trimmed FIFO with ``newest``.
+    """
+
+    def __init__(self, urls: Iterable[str] = ()) -> None:
+        self._urls: dict[str, None] = {}
+        self.update(urls)
+
+    def add(self, url: str) -> None:
+        self._urls.setdefault(canonicalize_url(url))
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def newest(self, n: int) -> list[str]:
+        """Return the ``n`` most recently added URLs, oldest first."""
+        urls = list(self._urls)
+        return urls[-n:] if n > 0 else []
+
+    def __contains__(self, url: object) -> bool:
+        return isinstance(url, str) and canonicalize_url(url) in self._urls
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._urls)
+
+    def __len__(self) -> int:
+        return len(self._urls)
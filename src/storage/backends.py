@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Protocol
+
+from src.models import AppState, TweetDraft
+
+logger = logging.getLogger(__name__)
+
+
+class StateBackend(Protocol):
+    def load(self) -> AppState:
+        """Return the persisted state, or a fresh AppState if there is none."""
+
+    def save(self, state: AppState) -> None:
+        """Persist ``state`` (already pruned by the caller)."""
+
+
+class JsonStateBackend:
+    """Whole-document JSON file: simple, diffable, committed back to the repo."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def load(self) -> AppState:
+        if not self.path.exists():
+            logger.info("No state file found, starting fresh")
+            return AppState()
+        raw = json.loads(self.path.read_text())
+        return AppState.model_validate(raw)
+
+    def save(self, state: AppState) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write aside and rename, so a concurrent reader (the publish daemon,
+        # a generate run) never sees a half-written file
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        tmp.write_text(state.model_dump_json(indent=2))
+        os.replace(tmp, self.path)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_urls (
+    url TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS seen_urls_seq ON seen_urls (seq);
+
+CREATE TABLE IF NOT EXISTS seen_titles (
+    title TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS seen_titles_seq ON seen_titles (seq);
+
+CREATE TABLE IF NOT EXISTS drafts (
+    news_url TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    list TEXT NOT NULL,
+    status TEXT NOT NULL,
+    telegram_message_id INTEGER,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (news_url, created_at)
+);
+CREATE INDEX IF NOT EXISTS drafts_list ON drafts (list, seq);
+CREATE INDEX IF NOT EXISTS drafts_telegram_message_id ON drafts (telegram_message_id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# AppState list fields stored as ordered single-column tables: field -> (table, column)
+_ORDERED_SETS = {"seen_urls": ("seen_urls", "url"), "seen_titles": ("seen_titles", "title")}
+# AppState draft lists stored in the drafts table: field -> value of the ``list`` column
+_DRAFT_LISTS = {"pending_drafts": "pending", "published_tweets": "published"}
+
+
+class SqliteStateBackend:
+    """SQLite database with indexed tables for seen URLs/titles and drafts.
+
+    ``save`` diffs the in-memory ``AppState`` against the stored rows and only
+    inserts, updates or deletes the rows that changed, inside one transaction.
+    Any other AppState field is kept as a JSON value in the ``meta`` table.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def load(self) -> AppState:
+        if not self.path.exists():
+            logger.info("No state database found, starting fresh")
+            return AppState()
+
+        with closing(self._connect()) as conn:
+            data: dict[str, object] = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM meta")}
+            for field, (table, column) in _ORDERED_SETS.items():
+                data[field] = [row[0] for row in conn.execute(f"SELECT {column} FROM {table} ORDER BY seq")]
+            for field, list_name in _DRAFT_LISTS.items():
+                rows = conn.execute("SELECT payload FROM drafts WHERE list = ? ORDER BY seq", (list_name,))
+                data[field] = [json.loads(row[0]) for row in rows]
+        return AppState.model_validate(data)
+
+    def save(self, state: AppState) -> None:
+        with closing(self._connect()) as conn, conn:
+            changed = 0
+            for field, (table, column) in _ORDERED_SETS.items():
+                changed += _sync_ordered_set(conn, table, column, getattr(state, field))
+            changed += _sync_drafts(conn, state)
+            changed += _sync_meta(conn, state)
+        logger.info("State database updated: %d rows changed", changed)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.executescript(_SCHEMA)
+        return conn
+
+
+def _sync_ordered_set(conn: sqlite3.Connection, table: str, column: str, values: list[str]) -> int:
+    existing = {row[0] for row in conn.execute(f"SELECT {column} FROM {table}")}
+    wanted = dict.fromkeys(values)
+
+    removed = [(value,) for value in existing if value not in wanted]
+    conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", removed)
+
+    (next_seq,) = conn.execute(f"SELECT COALESCE(MAX(seq), 0) + 1 FROM {table}").fetchone()
+    added = [(value, next_seq + i) for i, value in enumerate(v for v in wanted if v not in existing)]
+    conn.executemany(f"INSERT INTO {table} ({column}, seq) VALUES (?, ?)", added)
+    return len(removed) + len(added)
+
+
+def _sync_drafts(conn: sqlite3.Connection, state: AppState) -> int:
+    existing = {
+        (news_url, created_at): (list_name, payload)
+        for news_url, created_at, list_name, payload in conn.execute("SELECT news_url, created_at, list, payload FROM drafts")
+    }
+    (next_seq,) = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM drafts").fetchone()
+
+    changed = 0
+    wanted: set[tuple[str, str]] = set()
+    for field, list_name in _DRAFT_LISTS.items():
+        draft: TweetDraft
+        for draft in getattr(state, field):
+            key = (draft.news_url, draft.created_at)
+            wanted.add(key)
+            payload = draft.model_dump_json()
+            if key not in existing:
+                conn.execute(
+                    "INSERT INTO drafts (news_url, created_at, list, status, telegram_message_id, seq, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*key, list_name, draft.status.value, draft.telegram_message_id, next_seq, payload),
+                )
+                next_seq += 1
+                changed += 1
+            elif existing[key][0] != list_name:
+                # Moved between lists (e.g. pending → published): append to the new list
+                conn.execute(
+                    "UPDATE drafts SET list = ?, status = ?, telegram_message_id = ?, seq = ?, payload = ? "
+                    "WHERE news_url = ? AND created_at = ?",
+                    (list_name, draft.status.value, draft.telegram_message_id, next_seq, payload, *key),
+                )
+                next_seq += 1
+                changed += 1
+            elif existing[key][1] != payload:
+                conn.execute(
+                    "UPDATE drafts SET status = ?, telegram_message_id = ?, payload = ? WHERE news_url = ? AND created_at = ?",
+                    (draft.status.value, draft.telegram_message_id, payload, *key),
+                )
+                changed += 1
+
+    removed = [key for key in existing if key not in wanted]
+    conn.executemany("DELETE FROM drafts WHERE news_url = ? AND created_at = ?", removed)
+    return changed + len(removed)
+
+
+def _sync_meta(conn: sqlite3.Connection, state: AppState) -> int:
+    existing = dict(conn.execute("SELECT key, value FROM meta"))
+    skip = {*_ORDERED_SETS, *_DRAFT_LISTS}
+
+    changed = 0
+    for key, value in state.model_dump(mode="json", exclude=skip).items():
+        encoded = json.dumps(value)
+        if existing.get(key) != encoded:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, encoded))
+            changed += 1
+    return changed
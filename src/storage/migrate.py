@@ -0,0 +1,48 @@
+"""One-shot migration of data/state.json into the SQLite state backend.
+
+Usage:
+    python -m src.storage.migrate [--json data/state.json] [--db data/state.db] [--force]
+
+Then set ``STATE_BACKEND=sqlite`` so the workflows read and write the database.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from src.models import AppState
+from src.storage.backends import JsonStateBackend, SqliteStateBackend
+from src.storage.state import STATE_DB_FILE, STATE_FILE
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_json_to_sqlite(json_path: Path, db_path: Path, force: bool = False) -> AppState:
+    if not json_path.exists():
+        raise FileNotFoundError(f"No JSON state file at {json_path}")
+    if db_path.exists() and not force:
+        raise FileExistsError(f"{db_path} already exists (use force to overwrite)")
+    if db_path.exists():
+        db_path.unlink()
+
+    state = JsonStateBackend(json_path).load()
+    SqliteStateBackend(db_path).save(state)
+    logger.info(
+        "Migrated %s → %s: %d seen URLs, %d pending, %d published",
+        json_path, db_path, len(state.seen_urls), len(state.pending_drafts), len(state.published_tweets),
+    )
+    return state
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", type=Path, default=STATE_FILE)
+    parser.add_argument("--db", type=Path, default=STATE_DB_FILE)
+    parser.add_argument("--force", action="store_true", help="Overwrite an existing database")
+    args = parser.parse_args()
+    migrate_json_to_sqlite(args.json, args.db, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,56 @@
-import json
+import fcntl
 import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from src.config import MAX_PUBLISHED_HISTORY_DAYS, MAX_SEEN_URLS
-from src.models import AppState, RunLog
+from src.config import MAX_PUBLISHED_HISTORY_DAYS, MAX_SEEN_TITLES, MAX_SEEN_URLS, STATE_BACKEND
+from src.models import AppState, FeedCache, RunLog
+from src.news.seen_urls import SeenUrlIndex
+from src.storage.backends import JsonStateBackend, SqliteStateBackend, StateBackend
 
 logger = logging.getLogger(__name__)
 
 STATE_FILE = Path("data/state.json")
+STATE_DB_FILE = Path("data/state.db")
+FEED_CACHE_FILE = Path("data/feed_cache.json")
+
+
+def get_state_backend(kind: str | None = None) -> StateBackend:
+    kind = kind or STATE_BACKEND
+    if kind == "json":
+        return JsonStateBackend(STATE_FILE)
+    if kind == "sqlite":
+        return SqliteStateBackend(STATE_DB_FILE)
+    raise ValueError(f"Unknown state backend: {kind!r} (expected 'json' or 'sqlite')")
 
 
 def load_state() -> AppState:
-    if not STATE_FILE.exists():
-        logger.info("No state file found, starting fresh")
-        return AppState()
-    raw = json.loads(STATE_FILE.read_text())
-    return AppState.model_validate(raw)
+    return get_state_backend().load()
+
+
+@contextmanager
+def state_lock() -> Iterator[None]:
+    """Hold an exclusive lock on the state across a load → modify → save cycle.
+
+    The publish daemon and a generate run can share a checkout; without the
+    lock either one saves over what the other changed since it loaded. Blocks
+    until the other process is done, so keep the locked section short.
+    """
+    lock_file = STATE_FILE.with_suffix(".lock")
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    with lock_file.open("a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
 
 
 def save_state(state: AppState) -> None:
-    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
     _prune_state(state)
-    STATE_FILE.write_text(state.model_dump_json(indent=2))
+    get_state_backend().save(state)
     logger.info(
         "State saved: %d seen URLs, %d pending, %d published",
         len(state.seen_urls),
@@ -32,13 +60,27 @@ def save_state(state: AppState) -> None:
 
 
 def _prune_state(state: AppState) -> None:
-    if len(state.seen_urls) > MAX_SEEN_URLS:
-        state.seen_urls = state.seen_urls[-MAX_SEEN_URLS:]
+    # Canonicalise and collapse duplicates, then evict the oldest URLs first
+    state.seen_urls = SeenUrlIndex(state.seen_urls).newest(MAX_SEEN_URLS)
+    if len(state.seen_titles) > MAX_SEEN_TITLES:
+        state.seen_titles = state.seen_titles[-MAX_SEEN_TITLES:]
 
     cutoff = (datetime.now(timezone.utc) - timedelta(days=MAX_PUBLISHED_HISTORY_DAYS)).isoformat()
     state.published_tweets = [t for t in state.published_tweets if (t.published_at or "") >= cutoff]
 
 
+def load_feed_cache() -> FeedCache:
+    if not FEED_CACHE_FILE.exists():
+        return FeedCache()
+    return FeedCache.model_validate_json(FEED_CACHE_FILE.read_text())
+
+
+def save_feed_cache(cache: FeedCache) -> None:
+    FEED_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    FEED_CACHE_FILE.write_text(cache.model_dump_json(indent=2))
+    logger.info("Feed cache saved: %d sources", len(cache.sources))
+
+
 RUNS_DIR = Path("data/runs")
 
 
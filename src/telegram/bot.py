@@ -1,5 +1,11 @@
 import logging
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Any, TypeVar
 
 import httpx
 
@@ -8,11 +14,36 @@ from src.models import CATEGORY_EMOJI, TweetDraft
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 TELEGRAM_API = "https://api.telegram.org/bot{token}"
 HTTP_TIMEOUT = 15.0
 
+# Telegram asks for at most ~1 message per second in one chat but tolerates
+# short bursts; beyond that it answers 429 with a retry_after
+MESSAGES_PER_SECOND = 1.0
+MESSAGE_BURST = 3
+MAX_CONCURRENT_SENDS = 4
+MAX_RATE_LIMIT_RETRIES = 3
+
+# getUpdates page size (Telegram's maximum); a full page means more are queued
+UPDATES_PAGE_SIZE = 100
+# Seconds the first page of a one-off drain long-polls, to catch a reply sent just now
+DRAIN_POLL_TIMEOUT = 5
+
 APPROVE_TOKENS = {"✅", "approve", "yes", "ok", "si", "sí"}
 REJECT_TOKENS = {"❌", "reject", "no", "skip"}
+# A reply: a decision word, optionally followed by digest handles ("✅ 1 3", "no 2,4")
+_REPLY = re.compile(r"(?P<word>.+?)\s*(?P<handles>\d+(?:[\s,]+\d+)*)?")
+
+# Telegram's message length limit, and drafts per digest (two buttons each,
+# out of the 100 an inline keyboard may hold)
+MESSAGE_LIMIT = 4096
+DIGEST_MAX_DRAFTS = 50
+
+# Inline button callback data: "<action>:<draft key>"
+APPROVE_ACTION = "a"
+REJECT_ACTION = "r"
 
 
 @dataclass
@@ -20,14 +51,25 @@ class TelegramDecision:
     reply_to_message_id: int
     approved: bool
     update_id: int
+    # Set for inline-button decisions: the draft's key and the query to answer
+    draft_key: str | None = None
+    callback_query_id: str | None = None
+    # Set for replies to a digest ("✅ 2"): the entry's position in the message
+    handle: int | None = None
+
+
+@dataclass
+class ApprovalCheck:
+    decisions: list[TelegramDecision]
+    last_update_id: int  # highest update seen, decision or not: the next offset is this + 1
 
 
-def send_draft(draft: TweetDraft, token: str = "", chat_id: str = "") -> int:
-    token = token or TELEGRAM_BOT_TOKEN
-    chat_id = chat_id or TELEGRAM_CHAT_ID
+def format_draft(draft: TweetDraft) -> str:
+    """HTML text of the review message for ``draft``."""
+    return f"{_draft_summary(draft)}\n\n<i>Reply ✅ to approve or ❌ to reject</i>"
 
-    logger.info("Sending draft to Telegram")
 
+def _draft_summary(draft: TweetDraft) -> str:
     cat_emoji = CATEGORY_EMOJI.get(draft.category, "📰")
     cat_label = draft.category.value.upper()
     score_display = f"{draft.source_score:.2f}"
@@ -38,99 +80,275 @@ def send_draft(draft: TweetDraft, token: str = "", chat_id: str = "") -> int:
             f"{cat_emoji} <b>{cat_label}</b> | Score: {score_display}"
             f" | 🧵 Thread ({n} tweets)"
         )
-        tweets_preview = "\n\n".join(
+        body = "\n\n".join(
             f"[{i + 1}/{n}] {_escape_html(tweet)}"
             for i, tweet in enumerate(draft.thread_tweets)
         )
-        text = (
-            f"{header}\n\n"
-            f"{tweets_preview}\n\n"
-            f"📰 {_escape_html(draft.news_title)}\n"
-            f"🔗 {draft.news_url}\n\n"
-            "<i>Reply ✅ to approve or ❌ to reject</i>"
-        )
     else:
-        text = (
-            f"{cat_emoji} <b>{cat_label}</b> | Score: {score_display}\n\n"
-            f"{_escape_html(draft.tweet_text)}\n\n"
-            f"📰 {_escape_html(draft.news_title)}\n"
-            f"🔗 {draft.news_url}\n\n"
-            "<i>Reply ✅ to approve or ❌ to reject</i>"
-        )
-
-    url = f"{TELEGRAM_API.format(token=token)}/sendMessage"
-    response = httpx.post(
-        url,
-        json={"chat_id": chat_id, "text": text, "parse_mode": "HTML"},
-        timeout=HTTP_TIMEOUT,
+        header = f"{cat_emoji} <b>{cat_label}</b> | Score: {score_display}"
+        body = _escape_html(draft.tweet_text)
+    return (
+        f"{header}\n\n"
+        f"{body}\n\n"
+        f"📰 {_escape_html(draft.news_title)}\n"
+        f"🔗 {draft.news_url}"
     )
-    response.raise_for_status()
 
-    message_id: int = response.json()["result"]["message_id"]
-    logger.info(
-        "Sent draft to Telegram (message_id=%d): %s", message_id, draft.news_title[:50]
+
+def format_digest(drafts: list[TweetDraft]) -> str:
+    """HTML text of one digest message; each draft is numbered by its handle (1-based position)."""
+    header = (
+        f"📬 <b>{len(drafts)} drafts</b>\n"
+        "<i>Tap ✅/❌ under each number, or reply e.g. ✅ 1 3 or ❌ 2</i>"
     )
-    return message_id
+    entries = [f"<b>#{i}</b> {_draft_summary(draft)}" for i, draft in enumerate(drafts, start=1)]
+    return "\n\n———\n\n".join([header, *entries])
 
 
-def check_approvals(
-    last_update_id: int, token: str = "", chat_id: str = ""
-) -> list[TelegramDecision]:
-    token = token or TELEGRAM_BOT_TOKEN
-    chat_id = chat_id or TELEGRAM_CHAT_ID
+def pack_digests(drafts: list[TweetDraft], limit: int = MESSAGE_LIMIT, max_drafts: int = DIGEST_MAX_DRAFTS) -> list[list[TweetDraft]]:
+    """Split ``drafts`` (in order) into digests whose text stays within ``limit`` characters."""
+    digests: list[list[TweetDraft]] = []
+    digest: list[TweetDraft] = []
+    for draft in drafts:
+        if digest and (len(digest) >= max_drafts or _telegram_length(format_digest([*digest, draft])) > limit):
+            digests.append(digest)
+            digest = []
+        digest.append(draft)
+    if digest:
+        digests.append(digest)
+    return digests
 
-    url = f"{TELEGRAM_API.format(token=token)}/getUpdates"
-    response = httpx.get(
-        url,
-        params={"offset": last_update_id + 1, "timeout": 5},
-        timeout=HTTP_TIMEOUT + 5,
-    )
-    response.raise_for_status()
 
-    updates = response.json().get("result", [])
+def _telegram_length(text: str) -> int:
+    # Telegram measures messages in UTF-16 code units (emoji count 2). Counting
+    # the HTML tags too over-estimates, which is the safe side.
+    return len(text.encode("utf-16-le")) // 2
+
+
+def draft_keyboard(draft: TweetDraft) -> dict[str, Any]:
+    """Inline ✅/❌ buttons whose callback data carries the draft's key."""
+    return {
+        "inline_keyboard": [
+            [
+                {"text": "✅ Approve", "callback_data": f"{APPROVE_ACTION}:{draft.key}"},
+                {"text": "❌ Reject", "callback_data": f"{REJECT_ACTION}:{draft.key}"},
+            ]
+        ]
+    }
+
+
+def digest_keyboard(drafts: list[TweetDraft]) -> dict[str, Any]:
+    """One row of ✅/❌ buttons per digest entry, labelled with its handle."""
+    return {
+        "inline_keyboard": [
+            [
+                {"text": f"✅ {i}", "callback_data": f"{APPROVE_ACTION}:{draft.key}"},
+                {"text": f"❌ {i}", "callback_data": f"{REJECT_ACTION}:{draft.key}"},
+            ]
+            for i, draft in enumerate(drafts, start=1)
+        ]
+    }
+
+
+class TelegramClient:
+    """Bot API client over one keep-alive connection pool.
+
+    Sends are paced per chat by a token bucket (``MESSAGES_PER_SECOND`` with
+    bursts of ``MESSAGE_BURST``), and a 429 response is retried after the
+    ``retry_after`` seconds Telegram asks for.
+    """
+
+    def __init__(
+        self,
+        token: str = "",
+        chat_id: str = "",
+        http: httpx.Client | None = None,
+        messages_per_second: float = MESSAGES_PER_SECOND,
+        burst: int = MESSAGE_BURST,
+        api_url: str = TELEGRAM_API,
+    ) -> None:
+        self.token = token or TELEGRAM_BOT_TOKEN
+        self.chat_id = chat_id or TELEGRAM_CHAT_ID
+        self.api_url = api_url
+        self._http = http or httpx.Client(timeout=HTTP_TIMEOUT)
+        self._interval = 1.0 / messages_per_second
+        self._burst = burst
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "TelegramClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._http.close()
+
+    def call(self, method: str, params: dict[str, Any] | None = None, timeout: float | None = None) -> Any:
+        """POST a Bot API method and return its ``result``, waiting out 429s.
+
+        ``timeout`` overrides the client's HTTP timeout (long polls need more).
+        """
+        url = f"{self.api_url.format(token=self.token)}/{method}"
+        request_timeout = httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            response = self._http.post(url, json=params or {}, timeout=request_timeout)
+            if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                break
+            retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+            logger.warning("Telegram rate limit on %s, retrying in %ss", method, retry_after)
+            time.sleep(retry_after)
+        response.raise_for_status()
+        return response.json()["result"]
+
+    def send_message(self, text: str, reply_markup: dict[str, Any] | None = None) -> int:
+        self._acquire()
+        params: dict[str, Any] = {"chat_id": self.chat_id, "text": text, "parse_mode": "HTML"}
+        if reply_markup:
+            params["reply_markup"] = reply_markup
+        result = self.call("sendMessage", params)
+        return result["message_id"]
+
+    def answer_callback(self, callback_query_id: str, text: str = "") -> None:
+        """Acknowledge a button press (stops the client's spinner); ``text`` shows as a toast."""
+        self.call("answerCallbackQuery", {"callback_query_id": callback_query_id, "text": text})
+
+    def send_draft(self, draft: TweetDraft) -> int:
+        message_id = self.send_message(format_draft(draft), reply_markup=draft_keyboard(draft))
+        logger.info("Sent draft to Telegram (message_id=%d): %s", message_id, draft.news_title[:50])
+        return message_id
+
+    def send_drafts(self, drafts: list[TweetDraft]) -> dict[int, TweetDraft]:
+        """Send ``drafts`` concurrently; return message_id → draft, in draft order.
+
+        A draft that fails to send is logged and left out of the result.
+        """
+        return self._send_all(drafts, self.send_draft, lambda draft: draft.news_title)
+
+    def send_digest(self, drafts: list[TweetDraft]) -> int:
+        message_id = self.send_message(format_digest(drafts), reply_markup=digest_keyboard(drafts))
+        logger.info("Sent digest of %d drafts to Telegram (message_id=%d)", len(drafts), message_id)
+        return message_id
+
+    def send_digests(self, drafts: list[TweetDraft]) -> dict[int, list[TweetDraft]]:
+        """Pack ``drafts`` into as few messages as fit and send them concurrently.
+
+        Returns message_id → the drafts in that digest, in handle order. A digest
+        that fails to send is logged and left out of the result.
+        """
+        return self._send_all(pack_digests(drafts), self.send_digest, lambda digest: f"digest of {len(digest)} drafts")
+
+    def _send_all(self, messages: list[T], send: Callable[[T], int], describe: Callable[[T], str]) -> dict[int, T]:
+        if not messages:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_SENDS, len(messages)), thread_name_prefix="telegram") as pool:
+            futures = [pool.submit(send, message) for message in messages]
+        sent: dict[int, T] = {}
+        for message, future in zip(messages, futures):
+            try:
+                sent[future.result()] = message
+            except Exception:
+                logger.exception("Failed to send to Telegram: %s", describe(message))
+        return sent
+
+    def get_updates(self, offset: int, timeout: int = 0, limit: int = UPDATES_PAGE_SIZE) -> list[dict[str, Any]]:
+        """Up to ``limit`` updates from ``offset`` on, long-polling up to ``timeout`` seconds while there are none."""
+        params = {"offset": offset, "limit": limit, "timeout": timeout}
+        return self.call("getUpdates", params, timeout=timeout + HTTP_TIMEOUT)
+
+    def check_approvals(self, last_update_id: int, poll_timeout: int = DRAIN_POLL_TIMEOUT) -> ApprovalCheck:
+        """Drain every update after ``last_update_id``, page by page, and pick out the decisions.
+
+        Only the first request long-polls (briefly); follow-up pages are
+        fetched while the previous one came back full.
+        """
+        updates: list[dict[str, Any]] = []
+        offset = last_update_id + 1
+        while True:
+            page = self.get_updates(offset, timeout=poll_timeout)
+            updates.extend(page)
+            if len(page) < UPDATES_PAGE_SIZE:
+                break
+            offset, poll_timeout = page[-1]["update_id"] + 1, 0
+
+        decisions = parse_decisions(updates, self.chat_id)
+        last_seen = max((u["update_id"] for u in updates), default=last_update_id)
+        logger.info("Found %d decisions from %d updates", len(decisions), len(updates))
+        return ApprovalCheck(decisions=decisions, last_update_id=max(last_seen, last_update_id))
+
+    def _acquire(self) -> None:
+        """Take one send token for the chat, sleeping until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._refilled) / self._interval)
+            self._refilled = now
+            self._tokens -= 1
+            wait = -self._tokens * self._interval if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+def parse_decisions(updates: list[dict[str, Any]], chat_id: str) -> list[TelegramDecision]:
+    """✅/❌ button presses and replies on draft messages in ``chat_id``; every other update is ignored."""
     decisions: list[TelegramDecision] = []
 
     for update in updates:
+        if "callback_query" in update:
+            decision = _parse_callback(update, chat_id)
+            if decision:
+                decisions.append(decision)
+            continue
+
         msg = update.get("message", {})
         if str(msg.get("chat", {}).get("id")) != str(chat_id):
             continue
 
         reply = msg.get("reply_to_message")
-        text = msg.get("text", "").strip().lower()
+        match = _REPLY.fullmatch(msg.get("text", "").strip().lower())
 
-        if not reply or not text:
+        if not reply or not match:
             continue
 
-        if text in APPROVE_TOKENS:
+        word = match["word"]
+        if word in APPROVE_TOKENS:
             approved = True
-        elif text in REJECT_TOKENS:
+        elif word in REJECT_TOKENS:
             approved = False
         else:
             continue
 
-        decisions.append(
+        # "✅" answers a single-draft message; "✅ 1 3" picks entries of a digest
+        handles = [int(h) for h in re.findall(r"\d+", match["handles"] or "")] or [None]
+        decisions.extend(
             TelegramDecision(
                 reply_to_message_id=reply["message_id"],
                 approved=approved,
                 update_id=update["update_id"],
+                handle=handle,
             )
+            for handle in handles
         )
 
-    logger.info("Found %d decisions from %d updates", len(decisions), len(updates))
     return decisions
 
 
-def send_notification(text: str, token: str = "", chat_id: str = "") -> None:
-    token = token or TELEGRAM_BOT_TOKEN
-    chat_id = chat_id or TELEGRAM_CHAT_ID
-
-    url = f"{TELEGRAM_API.format(token=token)}/sendMessage"
-    response = httpx.post(
-        url,
-        json={"chat_id": chat_id, "text": text, "parse_mode": "HTML"},
-        timeout=HTTP_TIMEOUT,
+def _parse_callback(update: dict[str, Any], chat_id: str) -> TelegramDecision | None:
+    query = update["callback_query"]
+    msg = query.get("message", {})
+    if str(msg.get("chat", {}).get("id")) != str(chat_id):
+        return None
+    action, _, key = query.get("data", "").partition(":")
+    if action not in (APPROVE_ACTION, REJECT_ACTION) or not key:
+        return None
+    return TelegramDecision(
+        reply_to_message_id=msg.get("message_id", 0),
+        approved=action == APPROVE_ACTION,
+        update_id=update["update_id"],
+        draft_key=key,
+        callback_query_id=query["id"],
     )
-    response.raise_for_status()
 
 
 def _escape_html(text: str) -> str:
@@ -8,6 +8,7 @@ from src.config import (
     TWITTER_CONSUMER_KEY,
     TWITTER_CONSUMER_SECRET,
 )
+from src.generation.validator import truncate
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +28,8 @@ TCO_URL_LENGTH = 23
 
 def build_tweet_text(tweet_body: str, url: str) -> str:
     max_body = 280 - TCO_URL_LENGTH - 1  # 1 for the space before URL
-    if len(tweet_body) > max_body:
-        tweet_body = tweet_body[: max_body - 1] + "…"
+    # Weighted like Twitter counts it: emoji and CJK characters take 2
+    tweet_body = truncate(tweet_body, max_body)
     return f"{tweet_body} {url}"
 
 
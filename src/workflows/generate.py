@@ -3,14 +3,16 @@ import logging
 import sys
 from datetime import datetime, timezone
 
-from src.config import MAX_DRAFTS_PER_RUN
-from src.generation.generator import generate_tweets
-from src.models import RunLog, ScoredCandidate, classify_content
-from src.news.ranker import rank_and_filter
-from src.news.rss_parser import fetch_all_feeds
+from src.config import MAX_DRAFTS_PER_RUN, RECENT_TWEETS_FOR_SIMILARITY, TELEGRAM_DIGEST_MIN_DRAFTS
+from src.generation.gemini_client import set_call_hook, set_response_cache
+from src.generation.generator import GenerationStats, generate_tweets
+from src.models import NewsItem, RunLog, ScoredCandidate, TweetDraft, classify_content
+from src.news.ranker import rank_items
+from src.news.rss_parser import FetchStats, iter_feed_items
+from src.news.seen_urls import SeenUrlIndex, canonicalize_url
 from src.news.sources import SOURCES, NewsSource
-from src.storage.state import load_state, save_run_log, save_state
-from src.telegram.bot import send_draft
+from src.storage.state import load_feed_cache, load_state, save_feed_cache, save_run_log, save_state, state_lock
+from src.telegram.bot import TelegramClient
 
 logging.basicConfig(
     level=logging.INFO,
@@ -37,6 +39,11 @@ def _parse_args() -> argparse.Namespace:
         action="store_true",
         help="Print all available source names and exit.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk Gemini response cache (data/llm_cache/).",
+    )
     return parser.parse_args()
 
 
@@ -63,24 +70,32 @@ def run() -> None:
         return
 
     active_sources = _resolve_sources(args.sources) if args.sources else list(SOURCES)
+    if args.no_cache:
+        set_response_cache(None)
 
     logger.info("Starting tweet generation workflow")
 
     state = load_state()
-
-    # 1. Scrape all RSS feeds
-    all_items = fetch_all_feeds(active_sources)
-    if not all_items:
+    feed_cache = load_feed_cache()
+    fetch_stats = FetchStats()
+
+    # 1-2. Stream feed entries (conditional GET: unchanged feeds are skipped)
+    # through scoring, dedup and selection; only the survivors stay in memory.
+    items = iter_feed_items(active_sources, cache=feed_cache, stats=fetch_stats)
+    seen_urls = SeenUrlIndex(state.seen_urls)
+    ranking = rank_items(
+        items, active_sources, seen_urls, max_items=MAX_DRAFTS_PER_RUN, seen_titles=state.seen_titles
+    )
+    if not ranking.total:
         logger.warning("No news items fetched from any source")
         return
 
-    # 2. Rank, filter, and deduplicate
-    top_items = rank_and_filter(all_items, active_sources, state.seen_urls, max_items=MAX_DRAFTS_PER_RUN)
+    top_items = ranking.selected
     if not top_items:
         logger.info("No new relevant items after filtering")
         return
 
-    # 3. Build run log with all scored candidates
+    # 3. Build run log with the top scored candidates
     selected_urls = {item.url for item in top_items}
     candidates = [
         ScoredCandidate(
@@ -90,20 +105,31 @@ def run() -> None:
             score=item.score,
             selected=item.url in selected_urls,
         )
-        for item in sorted(all_items, key=lambda x: x.score, reverse=True)
-        if item.score > 0.0
-    ][:50]  # Keep top 50 for analysis without bloating the log
+        for item in ranking.candidates
+    ]
 
     now = datetime.now(timezone.utc).isoformat()
     run_log = RunLog(
         timestamp=now,
-        total_fetched=len(all_items),
-        after_dedup=len(candidates),
+        total_fetched=ranking.total,
+        after_dedup=ranking.considered,
         candidates=candidates,
+        feed_cache_hits=fetch_stats.cache_hits,
+        feed_cache_misses=fetch_stats.cache_misses,
     )
 
-    # 4. Generate tweet drafts via Gemini
-    drafts = generate_tweets(top_items)
+    # 4. Generate tweet drafts via Gemini, recording every call in the run log
+    generation_stats = GenerationStats()
+    set_call_hook(run_log.llm_calls.append)
+    try:
+        recent_tweets = [t.tweet_text for t in state.published_tweets[-RECENT_TWEETS_FOR_SIMILARITY:]]
+        drafts = generate_tweets(top_items, stats=generation_stats, recent_tweets=recent_tweets)
+    finally:
+        set_call_hook(None)
+    run_log.parse_attempts = generation_stats.parse_attempts
+    run_log.parse_failures = generation_stats.parse_failures
+    run_log.drafts_repaired = generation_stats.drafts_repaired
+    run_log.drafts_rejected = generation_stats.drafts_rejected
     if not drafts:
         logger.error("Tweet generation failed")
         sys.exit(1)
@@ -118,23 +144,44 @@ def run() -> None:
             draft.source_score = source_item.score
             draft.category = classify_content(source_item.source, source_item.title)
 
-    # 6. Send drafts to Telegram and track them
-    for draft in drafts:
-        try:
-            message_id = send_draft(draft)
+    # 6. Send drafts to Telegram (concurrently, within the chat's rate limit)
+    # and track them. Larger runs are packed into digests, several per message.
+    digest = len(drafts) >= TELEGRAM_DIGEST_MIN_DRAFTS
+    with TelegramClient() as telegram:
+        if digest:
+            messages = telegram.send_digests(drafts)
+        else:
+            messages = {message_id: [draft] for message_id, draft in telegram.send_drafts(drafts).items()}
+    sent_drafts: list[TweetDraft] = []
+    for message_id, message_drafts in messages.items():
+        for handle, draft in enumerate(message_drafts, start=1):
             draft.telegram_message_id = message_id
-            state.pending_drafts.append(draft)
-        except Exception:
-            logger.exception("Failed to send draft to Telegram: %s", draft.news_title)
-
-    # 7. Update seen URLs
-    new_urls = [item.url for item in top_items]
-    state.seen_urls.extend(new_urls)
+            draft.telegram_handle = handle if digest else None
+            sent_drafts.append(draft)
 
-    # 8. Save state and run log
-    save_state(state)
+    # 7-8. Record the sent drafts and seen items, then save state and run log
+    _record_run(sent_drafts, top_items)
+    sent = len(sent_drafts)
+    save_feed_cache(feed_cache)
     save_run_log(run_log)
-    logger.info("Generation workflow complete: %d drafts sent to Telegram", len(drafts))
+    logger.info("Generation workflow complete: %d drafts sent to Telegram", sent)
+
+
+def _record_run(drafts: list[TweetDraft], items: list[NewsItem]) -> None:
+    """Add ``drafts`` as pending and mark ``items`` seen in the state on disk.
+
+    The state is reloaded under ``state_lock`` instead of saving the copy
+    loaded at the start of the run: the publish daemon may have published or
+    rejected drafts while Gemini was busy, and the stale copy would bring
+    them back as pending.
+    """
+    with state_lock():
+        state = load_state()
+        pending = {d.key for d in state.pending_drafts}
+        state.pending_drafts.extend(d for d in drafts if d.key not in pending)
+        state.seen_urls.extend(canonicalize_url(item.url) for item in items)
+        state.seen_titles.extend(item.title for item in items)
+        save_state(state)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,14 @@
+import argparse
 import logging
+import signal
+import threading
+from collections.abc import Callable
 
-from src.models import TweetStatus
-from src.storage.state import load_state, save_state
-from src.telegram.bot import check_approvals, send_notification
+import httpx
+
+from src.models import AppState, TweetDraft, TweetStatus
+from src.storage.state import load_state, save_state, state_lock
+from src.telegram.bot import TelegramClient, TelegramDecision, parse_decisions
 from src.twitter.publisher import publish_thread, publish_tweet
 
 logging.basicConfig(
@@ -13,37 +19,87 @@ logger = logging.getLogger(__name__)
 
 MAX_PUBLISH_FAILURES = 3
 
+# Daemon mode: seconds Telegram holds each getUpdates open when there is
+# nothing new (also the worst-case shutdown delay), and the pause after a
+# failed poll
+LONG_POLL_TIMEOUT = 25
+POLL_ERROR_DELAY = 5.0
 
-def run() -> None:
-    logger.info("Starting publish workflow")
 
-    state = load_state()
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Publish approved tweet drafts.")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running: long-poll Telegram and publish each approval within seconds (stop with Ctrl-C / SIGTERM).",
+    )
+    return parser.parse_args()
 
-    if not state.pending_drafts:
-        logger.info("No pending drafts to process")
-        return
 
-    # 1. Check Telegram for approval/rejection decisions
-    decisions = check_approvals(state.last_telegram_update_id)
+def _offer_alternative(draft: TweetDraft, telegram: TelegramClient) -> bool:
+    """Replace a rejected draft's text with its next pre-generated alternative and send it for review.
 
-    # Update the offset to the highest update_id we've seen
-    if decisions:
-        state.last_telegram_update_id = max(d.update_id for d in decisions)
+    The draft stays pending under the new message; False when there is no
+    alternative left or it could not be sent.
+    """
+    if not draft.next_alternative():
+        return False
+    try:
+        draft.telegram_message_id = telegram.send_draft(draft)
+        draft.telegram_handle = None  # a message of its own, even if the original was in a digest
+    except Exception:
+        logger.exception("Failed to send alternative to Telegram: %s", draft.news_title)
+        return False
+    return True
 
-    # 2. Map decisions to pending drafts by telegram_message_id
-    decision_map = {d.reply_to_message_id: d.approved for d in decisions}
 
-    for draft in state.pending_drafts:
-        if draft.telegram_message_id not in decision_map:
+def _pending_index(drafts: list[TweetDraft]) -> dict[str | tuple[int, int | None], TweetDraft]:
+    """Pending drafts by draft key and by (message id, digest handle); the handle is None outside digests."""
+    index: dict[str | tuple[int, int | None], TweetDraft] = {d.key: d for d in drafts}
+    index.update(((d.telegram_message_id, d.telegram_handle), d) for d in drafts if d.telegram_message_id is not None)
+    return index
+
+
+def _answer(telegram: TelegramClient, decision: TelegramDecision, text: str) -> None:
+    if decision.callback_query_id is None:
+        return
+    try:
+        telegram.answer_callback(decision.callback_query_id, text)
+    except httpx.HTTPError as e:  # e.g. the query expired; the decision itself stands
+        logger.warning("Could not answer callback query: %s", e)
+
+
+def process_decisions(state: AppState, decisions: list[TelegramDecision], telegram: TelegramClient) -> int:
+    """Apply ``decisions`` to the pending drafts and publish the approved ones; return how many were published."""
+    # 1. Resolve each decision to its pending draft: by draft key for button
+    # presses, by message id (+ digest handle) for replies; one lookup each
+    index = _pending_index(state.pending_drafts)
+
+    for decision in decisions:
+        draft = index.get(decision.draft_key or (decision.reply_to_message_id, decision.handle))
+        if draft is None or draft.status != TweetStatus.PENDING:
+            if draft is None and decision.callback_query_id is None:
+                logger.info("Reply to message %d matches no pending draft", decision.reply_to_message_id)
+            _answer(telegram, decision, "Already handled")
+            continue
+        if decision.draft_key and decision.reply_to_message_id != draft.telegram_message_id:
+            # A button on a message this draft has since been re-sent from (an alternative)
+            _answer(telegram, decision, "Outdated, use the newer message")
             continue
 
-        if decision_map[draft.telegram_message_id]:
+        if decision.approved:
             draft.mark_approved()
+            _answer(telegram, decision, "Approved")
+        elif _offer_alternative(draft, telegram):
+            index[(draft.telegram_message_id, None)] = draft
+            logger.info("Draft rejected, sent alternative for review: %s", draft.news_title)
+            _answer(telegram, decision, "Rejected, alternative sent")
         else:
             draft.mark_rejected()
             logger.info("Draft rejected: %s", draft.news_title)
+            _answer(telegram, decision, "Rejected")
 
-    # 3. Publish approved drafts
+    # 2. Publish approved drafts
     published_count = 0
     for draft in state.pending_drafts:
         if draft.status != TweetStatus.APPROVED:
@@ -60,20 +116,140 @@ def run() -> None:
             published_count += 1
             logger.info("Published %s %s: %s", kind.lower(), tweet_id, draft.news_title)
 
-            send_notification(f"✅ {kind} published: {draft.tweet_text[:100]}...")
+            telegram.send_message(f"✅ {kind} published: {draft.tweet_text[:100]}...")
         except Exception:
             logger.exception("Failed to publish tweet: %s", draft.news_title)
 
-    # 4. Move published/rejected drafts out of pending
+    # 3. Move published/rejected drafts out of pending
     still_pending = [d for d in state.pending_drafts if d.status == TweetStatus.PENDING]
     completed = [d for d in state.pending_drafts if d.status in (TweetStatus.PUBLISHED, TweetStatus.REJECTED)]
 
     state.published_tweets.extend([d for d in completed if d.status == TweetStatus.PUBLISHED])
     state.pending_drafts = still_pending
+    return published_count
+
+
+def _save_outcome(state: AppState, handled: set[str], published: list[TweetDraft]) -> None:
+    """Write the outcome of a publish pass onto the state as it is on disk now.
+
+    The pass ran on a copy loaded before its Telegram and X calls, without
+    holding ``state_lock``, so a generate run may have saved new drafts in the
+    meantime. Only the drafts in ``handled`` (keys of the pending drafts the
+    pass started from) are replaced by their outcome, or dropped if they left
+    pending; everything else on disk is kept. ``published`` drafts are added
+    to the history and the update offset only moves forward.
+    """
+    outcome = {d.key: d for d in state.pending_drafts}
+    with state_lock():
+        saved = load_state()
+        saved.last_telegram_update_id = max(saved.last_telegram_update_id, state.last_telegram_update_id)
+        saved.pending_drafts = [
+            outcome[d.key] if d.key in outcome else d
+            for d in saved.pending_drafts
+            if d.key in outcome or d.key not in handled
+        ]
+        known = {d.key for d in saved.published_tweets}
+        saved.published_tweets.extend(d for d in published if d.key not in known)
+        save_state(saved)
+
+
+def _process_and_save(state: AppState, decisions: list[TelegramDecision], telegram: TelegramClient) -> int:
+    """Run ``process_decisions`` on ``state`` outside the lock, then save its outcome; return how many were published."""
+    handled = {d.key for d in state.pending_drafts}
+    history = len(state.published_tweets)
+    published_count = process_decisions(state, decisions, telegram) if decisions else 0
+    _save_outcome(state, handled, state.published_tweets[history:])
+    return published_count
+
+
+def run() -> None:
+    if _parse_args().daemon:
+        run_daemon()
+        return
+
+    logger.info("Starting publish workflow")
+
+    state = load_state()
+
+    with TelegramClient() as telegram:
+        # 1. Drain Telegram updates and pick out approval/rejection decisions.
+        # Advance past every update seen, not just the decisions, so the next
+        # run only downloads new traffic. This happens even with nothing
+        # pending, or stray messages would pile up until the next draft.
+        check = telegram.check_approvals(state.last_telegram_update_id)
+        drained = check.last_update_id != state.last_telegram_update_id
+        state.last_telegram_update_id = check.last_update_id
+
+        if not state.pending_drafts:
+            if drained:
+                _save_outcome(state, handled=set(), published=[])
+            logger.info("No pending drafts to process")
+            return
+
+        # 2-4. Apply decisions, publish, move completed drafts out of pending,
+        # and save the outcome (the state lock is only held for that last step)
+        published_count = _process_and_save(state, check.decisions, telegram)
+    logger.info("Publish workflow complete: %d published, %d still pending", published_count, len(state.pending_drafts))
+
+
+def run_daemon(
+    telegram: TelegramClient | None = None, stop: threading.Event | None = None, poll_timeout: int = LONG_POLL_TIMEOUT
+) -> None:
+    """Long-poll Telegram until ``stop`` is set (or SIGINT/SIGTERM), publishing approvals as they arrive.
+
+    The update offset lives in memory. State is reloaded from disk whenever
+    updates arrive, so drafts added by a generate run in the meantime are
+    picked up, and the outcome is merged into the state on disk straight after
+    they are processed (see ``_save_outcome``). Shutdown waits for
+    the current long poll (at most ``poll_timeout`` seconds) and never
+    interrupts a publish half way. ``telegram`` is closed on exit.
+    """
+    stop = stop or threading.Event()
+    telegram = telegram or TelegramClient()
+    offset = load_state().last_telegram_update_id
+    restore = _install_signal_handlers(stop)
+    logger.info("Publish daemon started (offset %d)", offset)
+
+    try:
+        while not stop.is_set():
+            try:
+                updates = telegram.get_updates(offset + 1, timeout=poll_timeout)
+            except httpx.HTTPError as e:
+                logger.warning("getUpdates failed, retrying in %.0fs: %s", POLL_ERROR_DELAY, e)
+                stop.wait(POLL_ERROR_DELAY)
+                continue
+            if not updates:
+                continue
+
+            offset = max(offset, *(u["update_id"] for u in updates))
+            decisions = parse_decisions(updates, telegram.chat_id)
+            state = load_state()
+            state.last_telegram_update_id = max(state.last_telegram_update_id, offset)
+            published_count = _process_and_save(state, decisions, telegram)
+            if decisions:
+                logger.info("Processed %d decisions: %d published", len(decisions), published_count)
+    finally:
+        restore()
+        telegram.close()
+        logger.info("Publish daemon stopped (offset %d)", offset)
+
+
+def _install_signal_handlers(stop: threading.Event) -> Callable[[], None]:
+    """Set ``stop`` on SIGINT/SIGTERM; returns a function restoring the previous handlers."""
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+
+    def handle(signum: int, frame: object) -> None:
+        logger.info("Received %s, stopping after the current poll", signal.Signals(signum).name)
+        stop.set()
+
+    previous = {sig: signal.signal(sig, handle) for sig in (signal.SIGINT, signal.SIGTERM)}
+
+    def restore() -> None:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
 
-    # 5. Save state
-    save_state(state)
-    logger.info("Publish workflow complete: %d published, %d still pending", published_count, len(still_pending))
+    return restore
 
 
 if __name__ == "__main__":
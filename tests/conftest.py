@@ -8,3 +8,6 @@ os.environ.setdefault("TWITTER_CONSUMER_KEY", "test-ck")
 os.environ.setdefault("TWITTER_CONSUMER_SECRET", "test-cs")
 os.environ.setdefault("TWITTER_ACCESS_TOKEN", "test-at")
 os.environ.setdefault("TWITTER_ACCESS_TOKEN_SECRET", "test-ats")
+
+# Never read or write the on-disk Gemini response cache from tests
+os.environ.setdefault("LLM_CACHE_BYPASS", "1")
@@ -0,0 +1,110 @@
+import sqlite3
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.models import AppState, TweetDraft, TweetStatus
+from src.storage.backends import JsonStateBackend, SqliteStateBackend
+from src.storage.migrate import migrate_json_to_sqlite
+from src.storage.state import get_state_backend, load_state, save_state
+
+
+def _draft(url: str, **kwargs) -> TweetDraft:
+    return TweetDraft(news_url=url, news_title=f"Title {url}", tweet_text="Tweet", **kwargs)
+
+
+def _state() -> AppState:
+    return AppState(
+        seen_urls=["https://a.com", "https://b.com"],
+        seen_titles=["First title", "Second title"],
+        pending_drafts=[_draft("https://a.com", telegram_message_id=10)],
+        published_tweets=[_draft("https://c.com", status=TweetStatus.PUBLISHED, tweet_id="99")],
+        last_telegram_update_id=7,
+    )
+
+
+def test_sqlite_roundtrip(tmp_path: Path) -> None:
+    backend = SqliteStateBackend(tmp_path / "state.db")
+    state = _state()
+    backend.save(state)
+    assert backend.load() == state
+
+
+def test_sqlite_load_missing_database(tmp_path: Path) -> None:
+    assert SqliteStateBackend(tmp_path / "missing.db").load() == AppState()
+
+
+def test_sqlite_save_only_touches_changed_rows(tmp_path: Path) -> None:
+    path = tmp_path / "state.db"
+    backend = SqliteStateBackend(path)
+    state = _state()
+    backend.save(state)
+
+    draft = state.pending_drafts.pop()
+    draft.mark_approved()
+    draft.mark_published("123")
+    state.published_tweets.append(draft)
+    state.seen_urls = ["https://b.com", "https://d.com"]
+    state.last_telegram_update_id = 8
+
+    statements: list[str] = []
+    original_connect = backend._connect
+
+    def traced_connect() -> sqlite3.Connection:
+        conn = original_connect()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    with patch.object(backend, "_connect", traced_connect):
+        backend.save(state)
+
+    writes = [s for s in statements if s.split()[0] in ("INSERT", "UPDATE", "DELETE")]
+    assert len(writes) == 4  # moved draft, dropped URL, new URL, update id
+    loaded = backend.load()
+    assert loaded.pending_drafts == []
+    assert [t.news_url for t in loaded.published_tweets] == ["https://c.com", "https://a.com"]
+    assert loaded.published_tweets[1].tweet_id == "123"
+    assert loaded.seen_urls == ["https://b.com", "https://d.com"]
+    assert loaded.last_telegram_update_id == 8
+
+
+def test_sqlite_indexes_message_id(tmp_path: Path) -> None:
+    path = tmp_path / "state.db"
+    SqliteStateBackend(path).save(_state())
+    with sqlite3.connect(path) as conn:
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT payload FROM drafts WHERE telegram_message_id = 10").fetchall()
+        row = conn.execute("SELECT news_url FROM drafts WHERE telegram_message_id = 10").fetchone()
+    assert "drafts_telegram_message_id" in str(plan)
+    assert row == ("https://a.com",)
+
+
+def test_state_functions_use_sqlite_backend(tmp_path: Path) -> None:
+    db_path = tmp_path / "state.db"
+    with (
+        patch("src.storage.state.STATE_BACKEND", "sqlite"),
+        patch("src.storage.state.STATE_DB_FILE", db_path),
+    ):
+        save_state(_state())
+        state = load_state()
+    assert db_path.exists()
+    assert state.last_telegram_update_id == 7
+
+
+def test_unknown_backend() -> None:
+    with pytest.raises(ValueError, match="Unknown state backend"):
+        get_state_backend("redis")
+
+
+def test_migrate_json_to_sqlite(tmp_path: Path) -> None:
+    json_path = tmp_path / "state.json"
+    db_path = tmp_path / "state.db"
+    state = _state()
+    JsonStateBackend(json_path).save(state)
+
+    migrated = migrate_json_to_sqlite(json_path, db_path)
+
+    assert migrated == state
+    assert SqliteStateBackend(db_path).load() == state
+    with pytest.raises(FileExistsError):
+        migrate_json_to_sqlite(json_path, db_path)
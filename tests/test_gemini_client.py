@@ -0,0 +1,187 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.genai import errors
+
+from src.config import LLM_CALL_TIMEOUT
+from src.generation import gemini_client
+from src.generation.gemini_client import (
+    discard_cached,
+    generate_text,
+    get_client,
+    set_call_hook,
+    set_client,
+    set_prefix_cache,
+    set_response_cache,
+)
+from src.generation.prefix_cache import PromptPrefixCache
+from src.generation.response_cache import ResponseCache
+from src.models import GeneratedTweet, LlmCall
+
+
+@pytest.fixture(autouse=True)
+def _reset_client():
+    set_client(None)
+    set_response_cache(None)
+    set_prefix_cache(None)
+    yield
+    set_client(None)
+    set_call_hook(None)
+    set_response_cache(None)
+    set_prefix_cache(None)
+
+
+def _response(text: str) -> MagicMock:
+    response = MagicMock(text=text)
+    response.usage_metadata.prompt_token_count = 12
+    response.usage_metadata.candidates_token_count = 5
+    return response
+
+
+def test_client_created_once() -> None:
+    with patch("src.generation.gemini_client.genai.Client") as client_cls:
+        client_cls.return_value.models.generate_content.return_value = _response("ok")
+        generate_text("one")
+        generate_text("two")
+        assert get_client() is client_cls.return_value
+    client_cls.assert_called_once()
+    http_options = client_cls.call_args.kwargs["http_options"]
+    assert http_options.timeout == int(LLM_CALL_TIMEOUT * 1000)
+    assert http_options.httpx_client is not None
+
+
+def test_call_hook_records_sizes_and_latency() -> None:
+    calls: list[LlmCall] = []
+    set_call_hook(calls.append)
+    with patch("src.generation.gemini_client.genai.Client") as client_cls:
+        client_cls.return_value.models.generate_content.return_value = _response("hello")
+        assert generate_text("prompt") == "hello"
+
+    assert len(calls) == 1
+    assert calls[0].prompt_chars == 6
+    assert calls[0].response_chars == 5
+    assert calls[0].prompt_tokens == 12
+    assert calls[0].response_tokens == 5
+    assert calls[0].latency_ms >= 0
+    assert calls[0].error is None
+
+
+def test_call_hook_records_failures() -> None:
+    calls: list[LlmCall] = []
+    set_call_hook(calls.append)
+    with patch("src.generation.gemini_client.genai.Client") as client_cls:
+        client_cls.return_value.models.generate_content.side_effect = TimeoutError("slow")
+        with pytest.raises(TimeoutError):
+            generate_text("prompt")
+
+    assert calls[0].error == "TimeoutError: slow"
+
+
+def test_cached_response_skips_gemini(tmp_path) -> None:
+    set_response_cache(ResponseCache(tmp_path, ttl_seconds=3600, max_bytes=1 << 20))
+    calls: list[LlmCall] = []
+    set_call_hook(calls.append)
+    with patch("src.generation.gemini_client.genai.Client") as client_cls:
+        client_cls.return_value.models.generate_content.return_value = _response("fresh")
+        assert generate_text("prompt") == "fresh"
+        assert generate_text("prompt") == "fresh"
+        discard_cached("prompt")
+        assert generate_text("prompt") == "fresh"
+
+    assert client_cls.return_value.models.generate_content.call_count == 2
+    assert [c.cached for c in calls] == [False, True, False]
+
+
+def test_response_schema_enables_json_mode() -> None:
+    with patch("src.generation.gemini_client.genai.Client") as client_cls:
+        generate_content = client_cls.return_value.models.generate_content
+        generate_content.return_value = _response("[]")
+        generate_text("prompt", response_schema=list[GeneratedTweet])
+        generate_text("prompt")
+
+    structured, plain = generate_content.call_args_list
+    assert structured.kwargs["config"].response_mime_type == "application/json"
+    assert structured.kwargs["config"].response_schema == list[GeneratedTweet]
+    assert plain.kwargs["config"].response_mime_type is None
+
+
+def test_system_instruction_registered_once_as_cached_content() -> None:
+    set_prefix_cache(PromptPrefixCache(ttl_seconds=3600, min_tokens=0))
+    client = MagicMock()
+    client.caches.create.return_value.name = "cachedContents/abc"
+    client.models.generate_content.return_value = _response("ok")
+    set_client(client)
+
+    generate_text("item 1", system_instruction="SYSTEM")
+    generate_text("item 2", system_instruction="SYSTEM")
+    generate_text("item 3", system_instruction="EDITED SYSTEM")
+
+    assert client.caches.create.call_count == 2  # once per distinct prompt text
+    first = client.models.generate_content.call_args_list[0]
+    assert first.kwargs["contents"] == "item 1"
+    assert first.kwargs["config"].cached_content == "cachedContents/abc"
+    assert first.kwargs["config"].system_instruction is None
+
+
+def test_uncacheable_prefix_falls_back_to_system_instruction() -> None:
+    set_prefix_cache(PromptPrefixCache(ttl_seconds=3600, min_tokens=0))
+    client = MagicMock()
+    client.caches.create.side_effect = RuntimeError("too few tokens")
+    client.models.generate_content.return_value = _response("ok")
+    set_client(client)
+
+    generate_text("item 1", system_instruction="SYSTEM")
+    generate_text("item 2", system_instruction="SYSTEM")
+
+    client.caches.create.assert_called_once()  # the refusal is remembered
+    config = client.models.generate_content.call_args.kwargs["config"]
+    assert config.cached_content is None
+    assert config.system_instruction == "SYSTEM"
+
+
+def test_prefix_below_minimum_is_sent_inline_without_registering() -> None:
+    set_prefix_cache(PromptPrefixCache(ttl_seconds=3600, min_tokens=1024))
+    client = MagicMock()
+    client.models.generate_content.return_value = _response("ok")
+    set_client(client)
+
+    generate_text("item 1", system_instruction="SYSTEM " * 100)
+
+    client.caches.create.assert_not_called()
+    config = client.models.generate_content.call_args.kwargs["config"]
+    assert config.cached_content is None
+    assert config.system_instruction == "SYSTEM " * 100
+
+
+def _client_error(code: int) -> errors.ClientError:
+    return errors.ClientError(code, {"error": {"code": code, "message": "rejected", "status": "X"}})
+
+
+def test_missing_cached_content_falls_back_inline_and_reregisters() -> None:
+    set_prefix_cache(PromptPrefixCache(ttl_seconds=3600, min_tokens=0))
+    client = MagicMock()
+    client.caches.create.return_value.name = "cachedContents/abc"
+    client.models.generate_content.side_effect = [_client_error(404), _response("ok"), _response("ok")]
+    set_client(client)
+
+    assert generate_text("item 1", system_instruction="SYSTEM") == "ok"
+    generate_text("item 2", system_instruction="SYSTEM")
+
+    retry = client.models.generate_content.call_args_list[1]
+    assert retry.kwargs["config"].system_instruction == "SYSTEM"
+    assert retry.kwargs["config"].cached_content is None
+    assert client.caches.create.call_count == 2  # the stale entry was forgotten
+
+
+def test_rate_limit_with_cached_content_is_raised() -> None:
+    set_prefix_cache(PromptPrefixCache(ttl_seconds=3600, min_tokens=0))
+    client = MagicMock()
+    client.caches.create.return_value.name = "cachedContents/abc"
+    client.models.generate_content.side_effect = _client_error(429)
+    set_client(client)
+
+    with pytest.raises(errors.ClientError):
+        generate_text("item 1", system_instruction="SYSTEM")
+
+    client.models.generate_content.assert_called_once()
+    client.caches.create.assert_called_once()
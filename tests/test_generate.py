@@ -0,0 +1,93 @@
+import json
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+from src.config import TELEGRAM_DIGEST_MIN_DRAFTS
+from src.generation.gemini_client import set_backend
+from src.generation.llm_backend import FakeBackend
+from src.models import AppState, NewsItem, TweetDraft, TweetStatus
+from src.storage.state import load_state, save_state
+from src.telegram.bot import TelegramClient
+from src.workflows.generate import _record_run, run
+
+
+def _draft(url: str, text: str) -> TweetDraft:
+    return TweetDraft(news_url=url, news_title=text, tweet_text=text, created_at="2026-02-24T10:00:00")
+
+
+def test_record_run_keeps_changes_made_while_generating(tmp_path: Path) -> None:
+    old = _draft("https://example.com/old", "Old")
+    with patch("src.storage.state.STATE_FILE", tmp_path / "state.json"):
+        save_state(AppState(pending_drafts=[old], seen_urls=["https://example.com/old"]))
+
+        # The publish daemon publishes the old draft while Gemini is busy
+        state = load_state()
+        published = state.pending_drafts.pop()
+        published.status = TweetStatus.PUBLISHED
+        published.published_at = "2099-01-01T00:00:00"
+        state.published_tweets.append(published)
+        state.last_telegram_update_id = 9
+        save_state(state)
+
+        new = _draft("https://example.com/new", "New")
+        item = NewsItem(title="New", url="https://example.com/new", summary="", published="", source="Test")
+        _record_run([new], [item])
+        _record_run([new], [])  # recorded once, even if handed over again
+
+        state = load_state()
+    assert [d.news_url for d in state.pending_drafts] == ["https://example.com/new"]
+    assert [d.news_url for d in state.published_tweets] == ["https://example.com/old"]
+    assert state.last_telegram_update_id == 9
+    assert state.seen_urls == ["https://example.com/old", "https://example.com/new"]
+    assert state.seen_titles == ["New"]
+
+
+def test_large_run_goes_out_as_a_digest(tmp_path: Path) -> None:
+    published = format_datetime(datetime.now(timezone.utc) - timedelta(hours=1))
+    feed = [
+        NewsItem(title=title, url=f"https://example.com/{i}", summary="About models.", published=published, source=source)
+        for i, (title, source) in enumerate(
+            [
+                ("GPT-5 ships to every tier", "TechCrunch AI"),
+                ("Gemini pricing drops again", "The Verge AI"),
+                ("Notes on sparse attention", "Hugging Face Blog"),
+                ("How we evaluate agents", "Google AI Blog"),
+                ("A scaling law for retrieval", "ArXiv CS.AI+CS.LG"),
+            ]
+        )
+    ]
+    sent: list[dict] = []
+
+    def telegram_api(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content))
+        return httpx.Response(200, json={"ok": True, "result": {"message_id": 100 + len(sent)}})
+
+    def telegram_client() -> TelegramClient:
+        return TelegramClient(token="test", chat_id="123", http=httpx.Client(transport=httpx.MockTransport(telegram_api)))
+
+    set_backend(FakeBackend())
+    try:
+        with (
+            patch("sys.argv", ["generate", "--no-cache"]),
+            patch("src.storage.state.STATE_FILE", tmp_path / "state.json"),
+            patch("src.storage.state.FEED_CACHE_FILE", tmp_path / "feed_cache.json"),
+            patch("src.storage.state.RUNS_DIR", tmp_path / "runs"),
+            patch("src.workflows.generate.MAX_DRAFTS_PER_RUN", 5),
+            patch("src.workflows.generate.iter_feed_items", return_value=iter(feed)),
+            patch("src.workflows.generate.TelegramClient", telegram_client),
+        ):
+            run()
+            state = load_state()
+    finally:
+        set_backend(None)
+
+    assert len(feed) >= TELEGRAM_DIGEST_MIN_DRAFTS
+    (digest,) = sent  # every draft in one message
+    assert len(digest["reply_markup"]["inline_keyboard"]) == len(feed)
+    assert len(state.pending_drafts) == len(feed)
+    assert {d.telegram_message_id for d in state.pending_drafts} == {101}
+    assert sorted(d.telegram_handle for d in state.pending_drafts) == [1, 2, 3, 4, 5]
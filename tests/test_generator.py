@@ -1,27 +1,56 @@
 import json
+import threading
+import time
 from pathlib import Path
 from unittest.mock import patch
 
-from src.generation.generator import _parse_single_response, generate_tweets
+import pytest
+from pydantic import ValidationError
+
+from src.generation.generator import (
+    SINGLE_SCHEMA,
+    THREAD_SCHEMA,
+    GenerationStats,
+    _parse_single_response,
+    generate_tweets,
+    run_concurrently,
+)
+from src.generation.prompt_builder import MAX_ITEMS_PER_PROMPT, SYSTEM_PROMPT, THREAD_SYSTEM_PROMPT
 from src.models import NewsItem, TweetStatus
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 SAMPLE_RESPONSE = (FIXTURES_DIR / "sample_gemini_response.json").read_text()
 
 
-def _make_item(title: str = "Test Article") -> NewsItem:
+def _make_item(title: str = "Test Article", source: str = "Test Source", url: str = "https://example.com/test") -> NewsItem:
     return NewsItem(
         title=title,
-        url="https://example.com/test",
+        url=url,
         summary="Test summary",
         published="Mon, 24 Feb 2026 10:00:00 GMT",
-        source="Test Source",
+        source=source,
     )
 
 
+def _sample_items() -> list[NewsItem]:
+    """Input items matching the drafts in SAMPLE_RESPONSE."""
+    return [
+        _make_item("New GPT-5 Model Released by OpenAI", url="https://example.com/gpt5-release"),
+        _make_item("Meta Open-Sources Llama 4", url="https://example.com/llama4"),
+    ]
+
+
+def _paper(title: str) -> NewsItem:
+    return _make_item(title, source="ArXiv CS.AI+CS.LG", url=f"https://arxiv.org/abs/{title.replace(' ', '-')}")
+
+
+def _thread_response(item: NewsItem) -> str:
+    return json.dumps({"news_url": item.url, "news_title": item.title, "thread_tweets": ["First", "Second"]})
+
+
 class TestParseResponse:
     def test_parses_clean_json(self) -> None:
-        drafts = _parse_single_response(SAMPLE_RESPONSE)
+        drafts = _parse_single_response(SAMPLE_RESPONSE, _sample_items())
         assert len(drafts) == 2
         assert drafts[0].news_url == "https://example.com/gpt5-release"
         assert drafts[0].status == TweetStatus.PENDING
@@ -29,23 +58,28 @@ class TestParseResponse:
 
     def test_strips_markdown_fences(self) -> None:
         wrapped = f"```json\n{SAMPLE_RESPONSE}\n```"
-        drafts = _parse_single_response(wrapped)
+        drafts = _parse_single_response(wrapped, _sample_items())
         assert len(drafts) == 2
 
     def test_raises_on_invalid_json(self) -> None:
-        try:
-            _parse_single_response("not json at all")
-            assert False, "Should have raised"
-        except json.JSONDecodeError:
-            pass
+        with pytest.raises(ValidationError, match="Invalid JSON"):
+            _parse_single_response("not json at all", _sample_items())
+
+    def test_skips_element_with_missing_keys(self) -> None:
+        response = json.loads(SAMPLE_RESPONSE)
+        del response[0]["tweet_text"]
+        drafts = _parse_single_response(json.dumps(response), _sample_items())
+        assert [d.news_url for d in drafts] == ["https://example.com/llama4"]
 
-    def test_raises_on_missing_keys(self) -> None:
-        incomplete = json.dumps([{"news_url": "https://a.com"}])
-        try:
-            _parse_single_response(incomplete)
-            assert False, "Should have raised"
-        except KeyError:
-            pass
+    def test_skips_unknown_news_url(self) -> None:
+        drafts = _parse_single_response(SAMPLE_RESPONSE, _sample_items()[1:])
+        assert [d.news_url for d in drafts] == ["https://example.com/llama4"]
+
+    def test_matches_canonical_url_and_keeps_input_url(self) -> None:
+        item = _make_item(url="https://example.com/post/?utm_source=rss")
+        response = json.dumps([{"news_url": "https://example.com/post", "news_title": "T", "tweet_text": "x"}])
+        drafts = _parse_single_response(response, [item])
+        assert [d.news_url for d in drafts] == [item.url]
 
 
 class TestGenerateTweets:
@@ -55,13 +89,13 @@ class TestGenerateTweets:
 
     def test_successful_generation(self) -> None:
         with patch("src.generation.generator.generate_text", return_value=SAMPLE_RESPONSE):
-            drafts = generate_tweets([_make_item()])
+            drafts = generate_tweets(_sample_items())
         assert len(drafts) == 2
 
     def test_retries_on_parse_failure(self) -> None:
         call_count = 0
 
-        def mock_generate(prompt: str) -> str:
+        def mock_generate(prompt: str, **kwargs) -> str:
             nonlocal call_count
             call_count += 1
             if call_count == 1:
@@ -69,11 +103,192 @@ class TestGenerateTweets:
             return SAMPLE_RESPONSE
 
         with patch("src.generation.generator.generate_text", side_effect=mock_generate):
-            drafts = generate_tweets([_make_item()])
+            drafts = generate_tweets(_sample_items())
         assert len(drafts) == 2
         assert call_count == 2
 
     def test_returns_empty_after_max_retries(self) -> None:
         with patch("src.generation.generator.generate_text", return_value="broken"):
-            drafts = generate_tweets([_make_item()])
+            drafts = generate_tweets(_sample_items())
         assert drafts == []
+
+    def test_retries_only_missing_items(self) -> None:
+        items = [*_sample_items(), _make_item("Third story", url="https://example.com/third")]
+        retry = json.dumps([{"news_url": items[2].url, "news_title": items[2].title, "tweet_text": "Third"}])
+        prompts: list[str] = []
+
+        def mock_generate(prompt: str, **kwargs) -> str:
+            prompts.append(prompt)
+            return SAMPLE_RESPONSE if len(prompts) == 1 else retry
+
+        stats = GenerationStats()
+        with patch("src.generation.generator.generate_text", side_effect=mock_generate):
+            drafts = generate_tweets(items, stats=stats)
+
+        assert [d.news_url for d in drafts] == [item.url for item in items]
+        assert "Third story" in prompts[1]
+        assert "GPT-5" not in prompts[1] and "Llama 4" not in prompts[1]
+        assert len(prompts[1]) < len(prompts[0])
+        assert (stats.parse_attempts, stats.parse_failures) == (2, 1)
+
+    def test_keeps_valid_drafts_when_retries_run_out(self) -> None:
+        items = [*_sample_items(), _make_item("Third story", url="https://example.com/third")]
+        with patch("src.generation.generator.generate_text", return_value=SAMPLE_RESPONSE) as mock:
+            drafts = generate_tweets(items)
+        assert len(drafts) == 2
+        assert mock.call_count == 2
+
+    def test_repairs_drafts_locally_without_retry(self) -> None:
+        stats = GenerationStats()
+        with patch("src.generation.generator.generate_text", return_value=SAMPLE_RESPONSE) as mock:
+            drafts = generate_tweets(_sample_items(), stats=stats)
+        assert mock.call_count == 1
+        # The fixture drafts carry their URL and three trailing hashtags
+        assert drafts[0].tweet_text.endswith("coding abilities this time. #AI")
+        assert (stats.drafts_repaired, stats.drafts_rejected) == (2, 0)
+
+    def test_re_requests_only_drafts_failing_validation(self) -> None:
+        items = _sample_items()
+        first = json.loads(SAMPLE_RESPONSE)
+        first[1]["tweet_text"] = "Llama 4 is a game-changer. Revolutionary stuff."
+        retry = json.dumps([{**first[1], "tweet_text": "Llama 4 is out, open weights."}])
+        prompts: list[str] = []
+
+        def mock_generate(prompt: str, **kwargs) -> str:
+            prompts.append(prompt)
+            return json.dumps(first) if len(prompts) == 1 else retry
+
+        stats = GenerationStats()
+        with patch("src.generation.generator.generate_text", side_effect=mock_generate):
+            drafts = generate_tweets(items, stats=stats)
+
+        assert len(prompts) == 2
+        assert "Llama 4" in prompts[1] and "GPT-5" not in prompts[1]
+        assert drafts[1].tweet_text == "Llama 4 is out, open weights."
+        assert stats.drafts_rejected == 1
+        assert stats.parse_failures == 0
+
+    def test_keeps_rejected_draft_when_retries_run_out(self) -> None:
+        broken = json.dumps([{"news_url": "https://example.com/test", "news_title": "T", "tweet_text": "So exciting!!"}])
+        with patch("src.generation.generator.generate_text", return_value=broken) as mock:
+            drafts = generate_tweets([_make_item()])
+        assert mock.call_count == 2
+        assert [d.tweet_text for d in drafts] == ["So exciting!!"]
+
+    def test_re_requests_thread_failing_validation(self) -> None:
+        paper = _paper("Paper")
+        broken = json.dumps({"news_url": paper.url, "news_title": "Paper", "thread_tweets": ["🧵 Thread incoming", "Second"]})
+        with patch("src.generation.generator.generate_text", side_effect=[broken, _thread_response(paper)]) as mock:
+            drafts = generate_tweets([paper])
+        assert mock.call_count == 2
+        assert drafts[0].thread_tweets == ["First", "Second"]
+
+    def test_picks_best_variant_and_keeps_alternatives(self) -> None:
+        item = _make_item()
+        good = "Another lab ships another model. The interesting part is the license, not the benchmark table."
+        response = json.dumps(
+            [{"news_url": item.url, "news_title": item.title, "tweet_text": "Exciting news!!", "alternatives": [good, "Short one."]}]
+        )
+        with patch("src.generation.generator.generate_text", return_value=response) as mock:
+            (draft,) = generate_tweets([item], recent_tweets=["Short one. Short one."])
+        assert mock.call_count == 1
+        assert draft.tweet_text == good
+        assert draft.alternatives == ["Short one."]
+
+    def test_requests_structured_output(self) -> None:
+        paper = _paper("Paper")
+        thread = _thread_response(paper)
+        items = [*_sample_items(), paper]
+
+        def mock_generate(prompt: str, **kwargs) -> str:
+            return thread if kwargs["response_schema"] is THREAD_SCHEMA else SAMPLE_RESPONSE
+
+        with patch("src.generation.generator.generate_text", side_effect=mock_generate) as mock:
+            drafts = generate_tweets(items)
+        assert len(drafts) == 3
+        assert {c.kwargs["response_schema"] for c in mock.call_args_list} == {SINGLE_SCHEMA, THREAD_SCHEMA}
+
+    def test_sends_system_prompt_separately(self) -> None:
+        paper = _paper("Paper")
+
+        def mock_generate(prompt: str, **kwargs) -> str:
+            return _thread_response(paper) if paper.title in prompt else SAMPLE_RESPONSE
+
+        with patch("src.generation.generator.generate_text", side_effect=mock_generate) as mock:
+            generate_tweets([*_sample_items(), paper])
+
+        by_instruction = {c.kwargs["system_instruction"]: c.args[0] for c in mock.call_args_list}
+        assert by_instruction.keys() == {SYSTEM_PROMPT, THREAD_SYSTEM_PROMPT}
+        assert by_instruction[SYSTEM_PROMPT].startswith("NEWS ITEMS:")
+        assert by_instruction[THREAD_SYSTEM_PROMPT].startswith("NEWS ITEM:")
+
+    def test_records_parse_failures(self) -> None:
+        stats = GenerationStats()
+        with patch("src.generation.generator.generate_text", side_effect=["invalid json", SAMPLE_RESPONSE]):
+            generate_tweets(_sample_items(), stats=stats)
+        assert (stats.parse_attempts, stats.parse_failures) == (2, 1)
+
+    def test_single_batch_and_threads_run_concurrently(self) -> None:
+        barrier = threading.Barrier(3, timeout=5)
+
+        def mock_generate(prompt: str, **kwargs) -> str:
+            barrier.wait()  # only passes if all three calls are in flight at once
+            for paper in papers:
+                if paper.title in prompt:
+                    return _thread_response(paper)
+            return SAMPLE_RESPONSE
+
+        papers = [_paper("Paper A"), _paper("Paper B")]
+        items = [papers[0], *_sample_items(), papers[1]]
+        with patch("src.generation.generator.generate_text", side_effect=mock_generate):
+            drafts = generate_tweets(items)
+
+        assert [d.news_url for d in drafts] == [
+            "https://example.com/gpt5-release",
+            "https://example.com/llama4",
+            papers[0].url,
+            papers[1].url,
+        ]
+
+    def test_large_run_is_split_into_prompts(self) -> None:
+        items = [_make_item(f"Story {i}", url=f"https://example.com/{i}") for i in range(25)]
+
+        def mock_generate(prompt: str, **kwargs) -> str:
+            return json.dumps([
+                {"news_url": item.url, "news_title": item.title, "tweet_text": "Tweet"}
+                for item in items if f"URL: {item.url}\n" in prompt + "\n"
+            ])
+
+        with patch("src.generation.generator.generate_text", side_effect=mock_generate) as mock:
+            drafts = generate_tweets(items)
+
+        assert mock.call_count == -(-len(items) // MAX_ITEMS_PER_PROMPT)
+        assert [d.news_url for d in drafts] == [item.url for item in items]
+
+    def test_rejects_thread_for_other_url(self) -> None:
+        paper = _paper("Paper A")
+        with patch("src.generation.generator.generate_text", return_value=_thread_response(_paper("Other"))):
+            assert generate_tweets([paper]) == []
+
+    def test_failed_call_does_not_cancel_others(self) -> None:
+        def mock_generate(prompt: str, **kwargs) -> str:
+            if "Paper" in prompt:
+                raise TimeoutError("Gemini timed out")
+            return SAMPLE_RESPONSE
+
+        items = [*_sample_items(), _paper("Paper A")]
+        with patch("src.generation.generator.generate_text", side_effect=mock_generate):
+            drafts = generate_tweets(items)
+        assert len(drafts) == 2
+
+
+def test_run_concurrently_keeps_job_order() -> None:
+    def slow(value: int) -> int:
+        time.sleep(0.01 * (3 - value))
+        return value
+
+    def broken() -> int:
+        raise RuntimeError("boom")
+
+    jobs = [lambda v=v: slow(v) for v in range(3)]
+    assert run_concurrently([*jobs, broken], max_workers=2) == [0, 1, 2, None]
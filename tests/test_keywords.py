@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from src.keywords import KeywordMatcher, is_release, keyword_boost, match_keywords
+from src.models import ContentCategory, classify_content
+
+
+class TestKeywordMatcher:
+    def test_returns_every_match(self) -> None:
+        matcher = KeywordMatcher(["gpt", "benchmark", "agent"])
+        assert matcher.match("GPT-5 tops agent benchmarks") == {"gpt", "benchmark", "agent"}
+
+    def test_matches_at_word_start_only(self) -> None:
+        matcher = KeywordMatcher(["rag", "agent"])
+        assert matcher.match("Cheaper storage for multi-agent systems") == {"agent"}
+
+    def test_reports_shorter_prefix_keywords(self) -> None:
+        matcher = KeywordMatcher(["claude", "claude code", "announce", "announcement"])
+        assert matcher.match("Claude Code announcement") == {"claude", "claude code", "announce", "announcement"}
+
+    def test_no_match(self) -> None:
+        assert KeywordMatcher(["gpt"]).match("Weather update") == frozenset()
+
+
+class TestKeywordBoost:
+    def test_highest_boost_wins(self) -> None:
+        with patch.dict("src.keywords._BOOSTS", {"gpt": 1.5, "agent": 1.2}):
+            assert keyword_boost(frozenset({"gpt", "agent"})) == 1.5
+            assert keyword_boost(frozenset({"agent"})) == 1.2
+
+    def test_ignores_non_boost_keywords(self) -> None:
+        assert keyword_boost(frozenset({"introduces"})) == 1.0
+
+    def test_chatgpt_is_boosted(self) -> None:
+        assert keyword_boost(match_keywords("ChatGPT gets memory")) == 1.5
+
+
+class TestClassification:
+    def test_release_keyword(self) -> None:
+        assert is_release(match_keywords("Mistral unveiled a new model"))
+        assert classify_content("TechCrunch AI", "Meta announces Llama 4") == ContentCategory.RELEASE
+
+    def test_falls_back_to_source_category(self) -> None:
+        assert classify_content("ArXiv CS.AI+CS.LG", "Sparse attention at scale") == ContentCategory.RESEARCH
+        assert classify_content("Unknown", "Sparse attention at scale") == ContentCategory.NEWS
@@ -0,0 +1,70 @@
+import json
+import time
+
+import pytest
+
+from src.generation import gemini_client
+from src.generation.generator import GenerationStats, generate_tweets
+from src.generation.llm_backend import FakeBackend
+from src.generation.prompt_builder import build_items_block, build_thread_item_block
+from src.models import LlmCall, NewsItem
+
+
+@pytest.fixture(autouse=True)
+def _reset_backend():
+    gemini_client.set_response_cache(None)
+    yield
+    gemini_client.set_backend(None)
+    gemini_client.set_call_hook(None)
+
+
+def _item(i: int, source: str = "TechCrunch AI") -> NewsItem:
+    return NewsItem(title=f"Story {i}", url=f"https://example.com/{i}", summary="Summary", published="", source=source)
+
+
+def test_fake_answers_batch_and_thread_prompts() -> None:
+    backend = FakeBackend()
+    batch = json.loads(backend.generate(build_items_block([_item(1), _item(2)])).text)
+    thread = json.loads(backend.generate(build_thread_item_block(_item(3))).text)
+
+    assert [d["news_url"] for d in batch] == ["https://example.com/1", "https://example.com/2"]
+    assert thread["news_url"] == "https://example.com/3"
+    assert len(thread["thread_tweets"]) >= 2
+
+
+def test_fake_is_deterministic_per_seed() -> None:
+    prompts = [build_items_block([_item(i)]) for i in range(50)]
+
+    def outcomes(seed: int) -> list[str]:
+        backend = FakeBackend(malformed_rate=0.5, seed=seed)
+        return [backend.generate(p).text for p in prompts]
+
+    assert outcomes(1) == outcomes(1)
+    assert outcomes(1) != outcomes(2)
+
+
+def test_fake_injects_timeouts() -> None:
+    backend = FakeBackend(timeout_rate=1.0, timeout=0.01)
+    with pytest.raises(TimeoutError):
+        backend.generate(build_items_block([_item(1)]))
+
+
+def test_fake_latency() -> None:
+    backend = FakeBackend(latency=0.05)
+    start = time.perf_counter()
+    backend.generate(build_items_block([_item(1)]))
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_generate_tweets_through_fake_backend() -> None:
+    calls: list[LlmCall] = []
+    gemini_client.set_backend(FakeBackend(malformed_rate=0.3, seed=3))
+    gemini_client.set_call_hook(calls.append)
+    items = [_item(i) for i in range(12)] + [_item(100, source="ArXiv CS.AI+CS.LG")]
+    stats = GenerationStats()
+
+    drafts = generate_tweets(items, stats=stats)
+
+    assert {c.model for c in calls} == {"fake"}
+    assert len(calls) == stats.parse_attempts
+    assert drafts and all(d.news_url in {i.url for i in items} for d in drafts)
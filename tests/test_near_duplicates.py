@@ -0,0 +1,36 @@
+from difflib import SequenceMatcher
+
+from src.news.near_duplicates import TitleIndex
+
+
+class TestTitleIndex:
+    def test_detects_near_duplicate(self) -> None:
+        index = TitleIndex(["OpenAI releases GPT-5 model"])
+        assert index.is_duplicate("OpenAI releases GPT-5 model today")
+
+    def test_case_insensitive(self) -> None:
+        index = TitleIndex(["Meta launches Llama 4"])
+        assert index.is_duplicate("META LAUNCHES LLAMA 4")
+
+    def test_keeps_different_titles(self) -> None:
+        index = TitleIndex(["GPT-5 Released by OpenAI"])
+        assert not index.is_duplicate("Meta launches Llama 4")
+
+    def test_respects_threshold(self) -> None:
+        a = "Sparse mixture of experts scales reasoning"
+        b = "Sparse mixture of experts scales retrieval"
+        ratio = SequenceMatcher(None, b.lower(), a.lower()).ratio()
+        assert TitleIndex([a], threshold=ratio - 0.01).is_duplicate(b)
+        assert not TitleIndex([a], threshold=ratio).is_duplicate(b)
+
+    def test_add_if_new(self) -> None:
+        index = TitleIndex()
+        assert index.add_if_new("Google DeepMind achieves SOTA on math benchmarks")
+        assert not index.add_if_new("Google DeepMind achieves SOTA on math benchmark")
+        assert index.add_if_new("Anthropic ships a new Claude model")
+        assert len(index) == 2
+
+    def test_short_titles(self) -> None:
+        index = TitleIndex(["AI"])
+        assert index.is_duplicate("ai")
+        assert not index.is_duplicate("ML")
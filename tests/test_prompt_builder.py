@@ -1,4 +1,17 @@
-from src.generation.prompt_builder import build_prompt
+from src.config import MAX_TWEETS_PER_RESPONSE, TWEET_VARIANTS
+from src.generation.prompt_builder import (
+    MIN_SUMMARY_CHARS,
+    SINGLE_BANNED_PHRASES,
+    SUMMARY_CHARS,
+    SYSTEM_PROMPT,
+    THREAD_BANNED_PHRASES,
+    THREAD_SUMMARY_CHARS,
+    THREAD_SYSTEM_PROMPT,
+    build_prompt,
+    estimate_tokens,
+    plan_batches,
+    plan_thread_summary,
+)
 from src.models import NewsItem
 
 
@@ -19,6 +32,12 @@ class TestBuildPrompt:
         assert "JSON" in prompt
         assert "hashtags" in prompt
 
+    def test_never_use_lists_match_the_validator(self) -> None:
+        for phrase in SINGLE_BANNED_PHRASES:
+            assert f'"{phrase}"' in SYSTEM_PROMPT
+        for phrase in THREAD_BANNED_PHRASES:
+            assert f'"{phrase}"' in THREAD_SYSTEM_PROMPT
+
     def test_contains_news_items(self) -> None:
         items = [_make_item("GPT-5 Release", "TechCrunch"), _make_item("Llama 4", "VentureBeat")]
         prompt = build_prompt(items)
@@ -38,3 +57,60 @@ class TestBuildPrompt:
         # Summary should be truncated to 200 chars in the prompt
         assert "X" * 200 in prompt
         assert "X" * 201 not in prompt
+
+
+def _scored_item(i: int, score: float) -> NewsItem:
+    return NewsItem(
+        title=f"Story number {i}",
+        url=f"https://example.com/{i}",
+        summary="S" * 500,
+        published="",
+        source="Test Source",
+        score=score,
+    )
+
+
+class TestPlanBatches:
+    def test_estimate_tokens(self) -> None:
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("abcde") == 2
+
+    def test_small_run_is_one_batch_with_full_summaries(self) -> None:
+        items = [_scored_item(i, 5.0) for i in range(3)]
+        (batch,) = plan_batches(items, token_budget=5000)
+        assert len(batch.items) == 3
+        assert set(batch.summary_chars.values()) == {SUMMARY_CHARS}
+
+    def test_splits_by_item_count(self) -> None:
+        items = [_scored_item(i, 5.0) for i in range(25)]
+        batches = plan_batches(items, token_budget=100_000, max_items=10)
+        assert [len(b.items) for b in batches] == [10, 10, 5]
+
+    def test_default_item_cap_counts_every_variant(self) -> None:
+        items = [_scored_item(i, 5.0) for i in range(12)]
+        batches = plan_batches(items, token_budget=100_000)
+        assert max(len(b.items) for b in batches) * TWEET_VARIANTS <= MAX_TWEETS_PER_RESPONSE
+
+    def test_every_batch_fits_budget(self) -> None:
+        items = [_scored_item(i, float(i)) for i in range(40)]
+        budget = 1200
+        batches = plan_batches(items, token_budget=budget, max_items=50)
+        assert len(batches) > 1
+        assert all(b.tokens <= budget for b in batches)
+        assert sorted(i.url for b in batches for i in b.items) == sorted(i.url for i in items)
+
+    def test_trims_lowest_priority_summaries_first(self) -> None:
+        items = [_scored_item(i, score) for i, score in enumerate([1.0, 9.0, 5.0])]
+        # Room for roughly two full summaries and one trimmed one
+        (batch,) = plan_batches(items, token_budget=estimate_tokens(SYSTEM_PROMPT) + 175)
+        limits = [batch.summary_chars[f"https://example.com/{i}"] for i in (1, 2, 0)]
+        assert limits == sorted(limits, reverse=True)
+        assert limits[0] == SUMMARY_CHARS
+        assert limits[-1] < SUMMARY_CHARS
+        assert min(limits) >= MIN_SUMMARY_CHARS
+
+    def test_thread_summary_fits_budget(self) -> None:
+        item = _scored_item(0, 1.0)
+        assert plan_thread_summary(item, token_budget=10_000) == THREAD_SUMMARY_CHARS
+        assert MIN_SUMMARY_CHARS <= plan_thread_summary(item, token_budget=450) < THREAD_SUMMARY_CHARS
@@ -0,0 +1,288 @@
+import argparse
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.models import AppState, TweetDraft, TweetStatus
+from src.storage.state import load_state, save_state, state_lock
+from src.telegram.bot import ApprovalCheck, TelegramClient
+from src.workflows.publish import run, run_daemon
+
+CHAT_ID = "123"
+
+
+class FakeTelegram(ThreadingHTTPServer):
+    """Local stand-in for the Bot API: long-polled getUpdates plus a sendMessage log."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.updates: list[dict] = []
+        self.sent: list[dict] = []
+        self.offsets: list[int] = []
+        self.answered: list[dict] = []
+        self.changed = threading.Condition()
+
+    @property
+    def api_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/bot{{token}}"
+
+    def reply(self, update_id: int, message_id: int, text: str) -> None:
+        with self.changed:
+            self.updates.append(
+                {
+                    "update_id": update_id,
+                    "message": {"chat": {"id": int(CHAT_ID)}, "text": text, "reply_to_message": {"message_id": message_id}},
+                }
+            )
+            self.changed.notify_all()
+
+    def press(self, update_id: int, message_id: int, data: str) -> None:
+        with self.changed:
+            message = {"message_id": message_id, "chat": {"id": int(CHAT_ID)}}
+            self.updates.append({"update_id": update_id, "callback_query": {"id": f"cb-{update_id}", "data": data, "message": message}})
+            self.changed.notify_all()
+
+    def get_updates(self, offset: int, timeout: float) -> list[dict]:
+        with self.changed:
+            self.offsets.append(offset)
+            self.changed.wait_for(lambda: any(u["update_id"] >= offset for u in self.updates), timeout=timeout)
+            return [u for u in self.updates if u["update_id"] >= offset]
+
+    def send_message(self, params: dict) -> dict:
+        with self.changed:
+            self.sent.append(params)
+            self.changed.notify_all()
+            return {"message_id": 1000 + len(self.sent)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeTelegram
+
+    def do_POST(self) -> None:
+        params = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        method = self.path.rsplit("/", 1)[-1]
+        if method == "getUpdates":
+            result = self.server.get_updates(params["offset"], params["timeout"])
+        elif method == "sendMessage":
+            result = self.server.send_message(params)
+        elif method == "answerCallbackQuery":
+            self.server.answered.append(params)
+            result = True
+        else:
+            self.send_error(404)
+            return
+        body = json.dumps({"ok": True, "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def telegram() -> Iterator[FakeTelegram]:
+    server = FakeTelegram()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def state_file(tmp_path: Path) -> Iterator[Path]:
+    path = tmp_path / "state.json"
+    with patch("src.storage.state.STATE_FILE", path):
+        save_state(
+            AppState(
+                pending_drafts=[
+                    TweetDraft(news_url="https://example.com/a", news_title="A", tweet_text="First", telegram_message_id=10),
+                    TweetDraft(
+                        news_url="https://example.com/b",
+                        news_title="B",
+                        tweet_text="Second",
+                        alternatives=["Second, take two"],
+                        telegram_message_id=11,
+                    ),
+                ],
+                last_telegram_update_id=5,
+            )
+        )
+        yield path
+
+
+def _start_daemon(telegram: FakeTelegram) -> tuple[threading.Thread, threading.Event]:
+    stop = threading.Event()
+    client = TelegramClient(token="test", chat_id=CHAT_ID, api_url=telegram.api_url)
+    thread = threading.Thread(target=run_daemon, kwargs={"telegram": client, "stop": stop, "poll_timeout": 1})
+    thread.start()
+    return thread, stop
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def _stop(thread: threading.Thread, stop: threading.Event) -> None:
+    stop.set()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_publishes_approval_within_seconds(telegram: FakeTelegram, state_file: Path) -> None:
+    with patch("src.workflows.publish.publish_tweet", return_value="tw-1") as publish:
+        thread, stop = _start_daemon(telegram)
+        try:
+            telegram.reply(6, message_id=10, text="✅")
+            start = time.monotonic()
+            _wait_for(lambda: telegram.sent)
+            latency = time.monotonic() - start
+        finally:
+            _stop(thread, stop)
+
+    assert latency < 2
+    publish.assert_called_once_with("First", "https://example.com/a")
+    assert telegram.sent[0]["text"].startswith("✅ Tweet published")
+
+    state = load_state()
+    assert [d.news_url for d in state.published_tweets] == ["https://example.com/a"]
+    assert [d.news_url for d in state.pending_drafts] == ["https://example.com/b"]
+    assert state.last_telegram_update_id == 6
+
+
+def test_keeps_offset_in_memory_and_flushes_each_batch(telegram: FakeTelegram, state_file: Path) -> None:
+    thread, stop = _start_daemon(telegram)
+    try:
+        telegram.reply(6, message_id=11, text="❌")
+        _wait_for(lambda: load_state().pending_drafts[1].telegram_message_id != 11)
+        telegram.reply(7, message_id=99, text="hello")  # not a decision, still advances the offset
+        _wait_for(lambda: load_state().last_telegram_update_id == 7)
+        _wait_for(lambda: telegram.offsets[-1] == 8)
+    finally:
+        _stop(thread, stop)
+
+    state = load_state()
+    rejected = state.pending_drafts[1]
+    assert (rejected.tweet_text, rejected.status) == ("Second, take two", TweetStatus.PENDING)
+    assert rejected.telegram_message_id == 1001
+    assert "Second, take two" in telegram.sent[0]["text"]
+    # Every poll after the first asks only for updates past the ones already seen
+    assert telegram.offsets[0] == 6
+    assert set(telegram.offsets) == {6, 7, 8}
+
+
+def test_picks_up_drafts_added_while_running(telegram: FakeTelegram, state_file: Path) -> None:
+    with patch("src.workflows.publish.publish_tweet", return_value="tw-2") as publish:
+        thread, stop = _start_daemon(telegram)
+        try:
+            state = load_state()
+            state.pending_drafts.append(
+                TweetDraft(news_url="https://example.com/c", news_title="C", tweet_text="Third", telegram_message_id=12)
+            )
+            save_state(state)
+            telegram.reply(6, message_id=12, text="approve")
+            _wait_for(lambda: publish.called)
+        finally:
+            _stop(thread, stop)
+
+    publish.assert_called_once_with("Third", "https://example.com/c")
+    assert len(load_state().pending_drafts) == 2
+
+
+def test_button_presses_resolve_by_draft_key(telegram: FakeTelegram, state_file: Path) -> None:
+    first, second = load_state().pending_drafts
+    with patch("src.workflows.publish.publish_tweet", return_value="tw-3") as publish:
+        thread, stop = _start_daemon(telegram)
+        try:
+            telegram.press(6, message_id=11, data=f"r:{second.key}")
+            _wait_for(lambda: telegram.answered)
+            telegram.press(7, message_id=11, data=f"a:{second.key}")  # stale: the alternative went out as a new message
+            telegram.press(8, message_id=10, data=f"a:{first.key}")
+            _wait_for(lambda: len(telegram.answered) == 3)
+        finally:
+            _stop(thread, stop)
+
+    publish.assert_called_once_with("First", "https://example.com/a")
+    assert [a["text"] for a in telegram.answered] == ["Rejected, alternative sent", "Outdated, use the newer message", "Approved"]
+    assert [a["callback_query_id"] for a in telegram.answered] == ["cb-6", "cb-7", "cb-8"]
+    (pending,) = load_state().pending_drafts
+    assert pending.tweet_text == "Second, take two"
+    assert "inline_keyboard" in telegram.sent[0]["reply_markup"]
+
+
+def test_digest_replies_resolve_to_individual_drafts(telegram: FakeTelegram, state_file: Path) -> None:
+    state = load_state()
+    for handle, draft in enumerate(state.pending_drafts, start=1):
+        draft.telegram_message_id, draft.telegram_handle = 20, handle
+    save_state(state)
+
+    with patch("src.workflows.publish.publish_tweet", return_value="tw-4") as publish:
+        thread, stop = _start_daemon(telegram)
+        try:
+            telegram.reply(6, message_id=20, text="❌ 2")
+            telegram.reply(7, message_id=20, text="✅ 1")
+            _wait_for(lambda: publish.called)
+        finally:
+            _stop(thread, stop)
+
+    publish.assert_called_once_with("First", "https://example.com/a")
+    (pending,) = load_state().pending_drafts
+    # The rejected entry's alternative goes out as a message of its own
+    assert (pending.tweet_text, pending.telegram_message_id, pending.telegram_handle) == ("Second, take two", 1001, None)
+
+
+def test_cron_run_advances_offset_with_nothing_pending(state_file: Path) -> None:
+    state = load_state()
+    state.pending_drafts = []
+    save_state(state)
+
+    with (
+        patch("src.workflows.publish._parse_args", return_value=argparse.Namespace(daemon=False)),
+        patch.object(TelegramClient, "check_approvals", return_value=ApprovalCheck(decisions=[], last_update_id=12)) as check,
+    ):
+        run()
+
+    check.assert_called_once_with(5)
+    assert load_state().last_telegram_update_id == 12
+
+
+def test_generate_can_save_while_a_tweet_is_being_published(telegram: FakeTelegram, state_file: Path) -> None:
+    def add_draft_from_generate_run() -> None:
+        with state_lock():
+            state = load_state()
+            state.pending_drafts.append(TweetDraft(news_url="https://example.com/c", news_title="C", tweet_text="Third"))
+            save_state(state)
+
+    def publish(text: str, url: str) -> str:
+        writer = threading.Thread(target=add_draft_from_generate_run)
+        writer.start()
+        writer.join(timeout=2)
+        assert not writer.is_alive(), "state lock held during the publish call"
+        return "tw-5"
+
+    with patch("src.workflows.publish.publish_tweet", side_effect=publish) as publish_mock:
+        thread, stop = _start_daemon(telegram)
+        try:
+            telegram.reply(6, message_id=10, text="✅")
+            _wait_for(lambda: telegram.sent)
+        finally:
+            _stop(thread, stop)
+
+    publish_mock.assert_called_once()
+    state = load_state()
+    assert [d.news_url for d in state.pending_drafts] == ["https://example.com/b", "https://example.com/c"]
+    assert [d.news_url for d in state.published_tweets] == ["https://example.com/a"]
@@ -1,9 +1,22 @@
+import gc
+import random
+import weakref
+from collections.abc import Iterator
 from datetime import datetime, timedelta, timezone
-from email.utils import format_datetime
+from email.utils import format_datetime, parsedate_to_datetime
 from unittest.mock import patch
 
 from src.models import NewsItem
-from src.news.ranker import _keyword_boost, _recency_score, deduplicate, rank_and_filter, score_item
+from src.news.ranker import (
+    TopKSelector,
+    _keyword_boost,
+    _recency_score,
+    deduplicate,
+    rank_and_filter,
+    rank_items,
+    score_item,
+    score_items,
+)
 from src.news.sources import NewsSource
 
 
@@ -60,6 +73,12 @@ class TestKeywordBoost:
     def test_partial_match(self) -> None:
         assert _keyword_boost("Open source model") == 1.5
 
+    def test_matches_word_prefix(self) -> None:
+        assert _keyword_boost("Building reliable agents") == 1.5
+
+    def test_ignores_keyword_inside_word(self) -> None:
+        assert _keyword_boost("Cheaper object storage") == 1.0
+
 
 class TestScoreItem:
     def test_high_score(self) -> None:
@@ -78,6 +97,44 @@ class TestScoreItem:
         assert score == 0.0
 
 
+class TestScoreItems:
+    def test_scores_aligned_with_input(self) -> None:
+        items = [
+            _make_item(title="GPT-5 Release", hours_ago=2.0, source="A"),
+            _make_item(title="Random tech news", hours_ago=100.0, source="A"),
+            _make_item(title="Random tech news", hours_ago=18.0, source="B"),
+        ]
+        scores = score_items(items, {"A": 0.9, "B": 0.9})
+        assert scores == [score_item(item, 0.9) for item in items]
+        assert scores[0] == 10.0
+        assert scores[1] == 0.0
+
+    def test_uses_single_reference_time(self) -> None:
+        now = datetime(2026, 2, 25, 12, 0, tzinfo=timezone.utc)
+        item = NewsItem(
+            title="Random tech news", url="https://a.com", summary="", published=format_datetime(now - timedelta(hours=30)), source="A"
+        )
+        assert score_items([item], {"A": 0.9}, now=now) == [round(0.9 * 0.5 / 1.35 * 10, 2)]
+        assert score_items([item], {"A": 0.9}, now=now + timedelta(days=1)) == [0.0]
+
+    def test_unknown_source_uses_default_weight(self) -> None:
+        item = _make_item(title="Random tech news", hours_ago=2.0, source="Unknown")
+        assert score_items([item], {}) == [score_item(item, 0.5)]
+
+    def test_parses_each_distinct_date_once(self) -> None:
+        pub = format_datetime(datetime.now(timezone.utc) - timedelta(hours=2))
+        items = [
+            NewsItem(title=f"Paper {i}", url=f"https://a.com/{i}", summary="", published=pub, source="A") for i in range(50)
+        ]
+        with patch("src.news.ranker.parsedate_to_datetime", wraps=parsedate_to_datetime) as mock_parse:
+            scores = score_items(items, {"A": 0.8})
+        assert mock_parse.call_count == 1
+        assert len(set(scores)) == 1
+
+    def test_empty_batch(self) -> None:
+        assert score_items([], {}) == []
+
+
 class TestDeduplicate:
     def test_removes_seen_urls(self) -> None:
         items = [_make_item(url="https://a.com"), _make_item(url="https://b.com")]
@@ -85,6 +142,14 @@ class TestDeduplicate:
         assert len(result) == 1
         assert result[0].url == "https://b.com"
 
+    def test_matches_canonical_urls(self) -> None:
+        items = [
+            _make_item(title="Paper one", url="https://arxiv.org/abs/2602.18473v2"),
+            _make_item(title="Something else entirely", url="https://b.com/post/?utm_source=rss"),
+        ]
+        result = deduplicate(items, seen_urls=["https://arxiv.org/abs/2602.18473", "https://b.com/post"])
+        assert result == []
+
     def test_removes_similar_titles(self) -> None:
         items = [
             _make_item(title="OpenAI releases GPT-5 model", url="https://a.com"),
@@ -93,6 +158,14 @@ class TestDeduplicate:
         result = deduplicate(items, seen_urls=[])
         assert len(result) == 1
 
+    def test_removes_titles_seen_in_previous_runs(self) -> None:
+        items = [
+            _make_item(title="OpenAI releases GPT-5 model today", url="https://a.com"),
+            _make_item(title="Meta launches Llama 4", url="https://b.com"),
+        ]
+        result = deduplicate(items, seen_urls=[], seen_titles=["OpenAI releases GPT-5 model"])
+        assert [item.url for item in result] == ["https://b.com"]
+
     def test_keeps_different_titles(self) -> None:
         items = [
             _make_item(title="GPT-5 Released by OpenAI", url="https://a.com"),
@@ -103,18 +176,18 @@ class TestDeduplicate:
 
 
 class TestRankAndFilter:
-    def test_returns_one_item_per_category(self) -> None:
+    def test_spreads_items_across_categories(self) -> None:
         sources = [
             NewsSource("News Source", "url1", "news", 0.9),
             NewsSource("Blog Source", "url2", "blog", 0.9),
         ]
         items = [
             _make_item(title="GPT news", hours_ago=2, source="News Source", url="https://a.com"),
-            _make_item(title="Old news", hours_ago=30, source="News Source", url="https://b.com"),
+            _make_item(title="Claude news", hours_ago=3, source="News Source", url="https://b.com"),
             _make_item(title="Llama blog", hours_ago=6, source="Blog Source", url="https://c.com"),
         ]
-        result = rank_and_filter(items, sources, seen_urls=[], max_items=3)
-        assert len(result) == 2  # 1 per category (news + blog)
+        result = rank_and_filter(items, sources, seen_urls=[], max_items=2)
+        assert len(result) == 2  # 2 items over 2 categories: 1 each, though both news items outscore the blog
         result_sources = {item.source for item in result}
         assert "News Source" in result_sources
         assert "Blog Source" in result_sources
@@ -125,10 +198,22 @@ class TestRankAndFilter:
             _make_item(title="Recent news", hours_ago=2, source="S1", url="https://a.com"),
             _make_item(title="Older news", hours_ago=30, source="S1", url="https://b.com"),
         ]
-        result = rank_and_filter(items, sources, seen_urls=[], max_items=3)
-        assert len(result) == 1  # only 1 category → max 1 item
+        result = rank_items(items, sources, seen_urls=[], max_items=3, per_category=1).selected
+        assert len(result) == 1  # explicit cap of 1 per category
         assert result[0].url == "https://a.com"
 
+    def test_fills_more_items_than_categories(self) -> None:
+        sources = [NewsSource("News", "url1", "news", 0.9), NewsSource("Blog", "url2", "blog", 0.9)]
+        news = ["GPT-5 ships", "Gemini pricing cut", "Mistral raises again"]
+        blogs = ["Scaling sparse attention", "Evals we trust", "Notes on tokenizers"]
+        items = [
+            *(_make_item(title=t, hours_ago=2 + i, source="News", url=f"https://n.com/{i}") for i, t in enumerate(news)),
+            *(_make_item(title=t, hours_ago=20 + i, source="Blog", url=f"https://b.com/{i}") for i, t in enumerate(blogs)),
+        ]
+        result = rank_and_filter(items, sources, seen_urls=[], max_items=4)
+        # 4 items over 2 categories: at most 2 each
+        assert sorted(item.url for item in result) == ["https://b.com/0", "https://b.com/1", "https://n.com/0", "https://n.com/1"]
+
     def test_max_items_cap(self) -> None:
         sources = [
             NewsSource("News", "url1", "news", 0.9),
@@ -154,3 +239,83 @@ class TestRankAndFilter:
         items = [_make_item(title="GPT news", hours_ago=2, source="S1", url="https://seen.com")]
         result = rank_and_filter(items, sources, seen_urls=["https://seen.com"], max_items=5)
         assert len(result) == 0
+
+
+def _scored(title: str, score: float) -> NewsItem:
+    return NewsItem(title=title, url=f"https://example.com/{title}", summary="", published="", source="S", score=score)
+
+
+class TestTopKSelector:
+    def test_matches_full_sort_selection(self) -> None:
+        rng = random.Random(3)
+        pushed = [(_scored(f"item-{i}", rng.choice([1.0, 2.5, 5.0, 7.5, 9.0])), rng.choice("abcd")) for i in range(500)]
+        selector = TopKSelector(max_items=3, log_size=20)
+        for item, category in pushed:
+            selector.push(item, category)
+        ranking = selector.result()
+
+        ranked = sorted(pushed, key=lambda p: p[0].score, reverse=True)
+        expected: list[NewsItem] = []
+        seen: set[str] = set()
+        for item, category in ranked:
+            if category not in seen:
+                expected.append(item)
+                seen.add(category)
+        assert ranking.selected == expected[:3]
+        assert ranking.candidates == [item for item, _ in ranked[:20]]
+        assert ranking.considered == 500
+
+    def test_ties_prefer_first_pushed(self) -> None:
+        selector = TopKSelector(max_items=1, log_size=2)
+        first, second, third = _scored("first", 5.0), _scored("second", 5.0), _scored("third", 5.0)
+        for item in (first, second, third):
+            selector.push(item, "news")
+        ranking = selector.result()
+        assert ranking.selected == [first]
+        assert ranking.candidates == [first, second]
+
+    def test_per_category_limit(self) -> None:
+        selector = TopKSelector(max_items=5, per_category=2)
+        for i, score in enumerate([9.0, 8.0, 7.0]):
+            selector.push(_scored(f"news-{i}", score), "news")
+        selector.push(_scored("blog", 1.0), "blog")
+        assert [item.title for item in selector.result().selected] == ["news-0", "news-1", "blog"]
+
+
+class TestRankItems:
+    def test_reports_candidates_after_dedup(self) -> None:
+        sources = [NewsSource("S1", "url", "news", 0.9)]
+        items = [
+            _make_item(title="GPT news", hours_ago=2, source="S1", url="https://a.com"),
+            _make_item(title="Seen news", hours_ago=2, source="S1", url="https://seen.com"),
+            _make_item(title="Old news", hours_ago=30, source="S1", url="https://b.com"),
+            _make_item(title="Ancient news", hours_ago=100, source="S1", url="https://c.com"),
+        ]
+        ranking = rank_items(items, sources, seen_urls=["https://seen.com"], max_items=3, per_category=1)
+        assert [item.url for item in ranking.selected] == ["https://a.com"]
+        assert [item.url for item in ranking.candidates] == ["https://a.com", "https://b.com"]
+        assert ranking.considered == 2
+
+    def test_consumes_generator_keeping_only_survivors(self) -> None:
+        sources = [NewsSource("News", "url1", "news", 0.9), NewsSource("Blog", "url2", "blog", 0.9)]
+        refs: list[weakref.ref[NewsItem]] = []
+        rng = random.Random(7)
+
+        def stream() -> Iterator[NewsItem]:
+            for i in range(1000):
+                item = _make_item(
+                    title=f"{rng.getrandbits(128):032x}",
+                    url=f"https://example.com/{i}",
+                    hours_ago=2 + (i % 40),
+                    source="News" if i % 2 else "Blog",
+                )
+                refs.append(weakref.ref(item))
+                yield item
+
+        ranking = rank_items(stream(), sources, seen_urls=[], max_items=2, log_size=10)
+        gc.collect()
+        assert ranking.total == 1000
+        assert len(ranking.selected) == 2
+        assert len(ranking.candidates) == 10
+        alive = sum(ref() is not None for ref in refs)
+        assert alive <= len(ranking.candidates) + len(ranking.selected)
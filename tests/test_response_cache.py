@@ -0,0 +1,65 @@
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from src.generation.response_cache import ResponseCache, cache_key
+
+
+def test_key_depends_on_model_and_prompt() -> None:
+    assert cache_key("gemini-a", "prompt") != cache_key("gemini-b", "prompt")
+    assert cache_key("gemini-a", "prompt") != cache_key("gemini-a", "prompt!")
+    assert cache_key("gemini-a", "prompt") == cache_key("gemini-a", "prompt")
+
+
+def test_put_and_get(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path, ttl_seconds=60, max_bytes=1 << 20)
+    assert cache.get("m", "p") is None
+    cache.put("m", "p", "response")
+    assert cache.get("m", "p") == "response"
+    assert cache.get("other-model", "p") is None
+
+
+def test_expired_entry_is_a_miss(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path, ttl_seconds=0.01, max_bytes=1 << 20)
+    cache.put("m", "p", "response")
+    time.sleep(0.02)
+    assert cache.get("m", "p") is None
+    assert list(tmp_path.glob("*.json")) == []
+
+
+def test_evicts_least_recently_used_beyond_size(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path, ttl_seconds=3600, max_bytes=350)  # room for three entries
+    now = time.time()
+    for i in range(3):
+        cache.put("m", f"p{i}", "x" * 50)
+        path = tmp_path / f"{cache_key('m', f'p{i}')}.json"
+        os.utime(path, (now - 100 + i, now - 100 + i))
+
+    cache.get("m", "p0")  # refresh p0: p1 is now the least recently used
+    cache.put("m", "p3", "x" * 50)
+
+    assert cache.get("m", "p1") is None
+    assert cache.get("m", "p0") == "x" * 50
+    assert cache.get("m", "p3") == "x" * 50
+
+
+def test_discard(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path, ttl_seconds=60, max_bytes=1 << 20)
+    cache.put("m", "p", "response")
+    cache.discard("m", "p")
+    assert cache.get("m", "p") is None
+
+
+def test_entry_removed_while_reading_is_a_miss(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path, ttl_seconds=60, max_bytes=1 << 20)
+    cache.put("m", "p", "response")
+    read_text = Path.read_text
+
+    def read_then_evict(path: Path) -> str:
+        text = read_text(path)
+        path.unlink()  # a concurrent evict() wins the race
+        return text
+
+    with patch.object(Path, "read_text", read_then_evict):
+        assert cache.get("m", "p") is None
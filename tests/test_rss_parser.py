@@ -1,9 +1,14 @@
+import asyncio
+import re
+from collections.abc import Awaitable, Callable
 from pathlib import Path
 from unittest.mock import patch
 
+import feedparser
 import httpx
 
-from src.news.rss_parser import fetch_all_feeds, fetch_feed
+from src.models import FeedCache, FeedCacheEntry
+from src.news.rss_parser import FetchStats, fetch_all_feeds, fetch_feed, iter_feed_items
 from src.news.sources import NewsSource
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
@@ -67,11 +72,140 @@ class TestFetchFeed:
         assert len(items[0].summary) == 500
 
 
+class TestConditionalGet:
+    def test_sends_stored_validators(self) -> None:
+        source = _make_source()
+        cache = FeedCache(sources={source.name: FeedCacheEntry(etag='"abc"', last_modified="Mon, 24 Feb 2026 10:00:00 GMT")})
+        with patch("src.news.rss_parser.httpx.get", return_value=_mock_response(SAMPLE_RSS)) as mock_get:
+            fetch_feed(source, cache=cache)
+        headers = mock_get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"abc"'
+        assert headers["If-Modified-Since"] == "Mon, 24 Feb 2026 10:00:00 GMT"
+        assert "User-Agent" in headers
+
+    def test_not_modified_skips_parsing(self) -> None:
+        source = _make_source()
+        cache = FeedCache(sources={source.name: FeedCacheEntry(etag='"abc"')})
+        stats = FetchStats()
+        with (
+            patch("src.news.rss_parser.httpx.get", return_value=_mock_response("", status_code=304)),
+            patch("src.news.rss_parser.feedparser.parse") as mock_parse,
+        ):
+            items = fetch_feed(source, cache=cache, stats=stats)
+        assert items == []
+        mock_parse.assert_not_called()
+        assert stats.cache_hits == {source.name: 1}
+        assert cache.sources[source.name].etag == '"abc"'
+
+    def test_stores_validators_from_response(self) -> None:
+        source = _make_source()
+        cache = FeedCache()
+        stats = FetchStats()
+        response = httpx.Response(
+            200,
+            text=SAMPLE_RSS,
+            headers={"ETag": '"v2"', "Last-Modified": "Tue, 25 Feb 2026 10:00:00 GMT"},
+            request=httpx.Request("GET", "https://example.com"),
+        )
+        with patch("src.news.rss_parser.httpx.get", return_value=response):
+            items = fetch_feed(source, cache=cache, stats=stats)
+        assert len(items) == 3
+        assert cache.sources[source.name].etag == '"v2"'
+        assert cache.sources[source.name].last_modified == "Tue, 25 Feb 2026 10:00:00 GMT"
+        assert stats.cache_misses == {source.name: 1}
+
+
+class TestWatermark:
+    def test_records_newest_entry(self) -> None:
+        source = _make_source()
+        cache = FeedCache()
+        with patch("src.news.rss_parser.httpx.get", return_value=_mock_response(SAMPLE_RSS)):
+            items = fetch_feed(source, cache=cache)
+        assert len(items) == 3
+        entry = cache.sources[source.name]
+        assert entry.last_published == "2026-02-24T10:00:00+00:00"
+        assert entry.last_guid == "https://example.com/gpt5-release"
+
+    def test_unchanged_feed_yields_nothing(self) -> None:
+        source = _make_source()
+        cache = FeedCache()
+        with patch("src.news.rss_parser.httpx.get", return_value=_mock_response(SAMPLE_RSS)):
+            fetch_feed(source, cache=cache)
+            items = fetch_feed(source, cache=cache)
+        assert items == []
+        assert cache.sources[source.name].last_guid == "https://example.com/gpt5-release"
+
+    def test_yields_only_entries_past_previous_run(self) -> None:
+        source = _make_source()
+        cache = FeedCache()
+        with patch("src.news.rss_parser.httpx.get", return_value=_mock_response(SAMPLE_RSS)):
+            fetch_feed(source, cache=cache)
+
+        new_entry = """<item>
+      <title>Brand New Model</title>
+      <link>https://example.com/brand-new</link>
+      <guid>https://example.com/brand-new</guid>
+      <pubDate>Tue, 25 Feb 2026 09:00:00 GMT</pubDate>
+    </item>
+    <item>"""
+        updated_rss = SAMPLE_RSS.replace("<item>", new_entry, 1)
+        with patch("src.news.rss_parser.httpx.get", return_value=_mock_response(updated_rss)):
+            items = fetch_feed(source, cache=cache)
+        assert [item.url for item in items] == ["https://example.com/brand-new"]
+        assert cache.sources[source.name].last_published == "2026-02-25T09:00:00+00:00"
+        assert cache.sources[source.name].last_guid == "https://example.com/brand-new"
+
+    def test_skips_entries_older_than_watermark(self) -> None:
+        source = _make_source()
+        cache = FeedCache(sources={source.name: FeedCacheEntry(last_published="2026-02-24T09:00:00+00:00", last_guid="gone")})
+        with patch("src.news.rss_parser.httpx.get", return_value=_mock_response(SAMPLE_RSS)):
+            items = fetch_feed(source, cache=cache)
+        assert [item.url for item in items] == ["https://example.com/gpt5-release"]
+
+    def test_oldest_first_feed_keeps_entries_listed_after_the_watermark(self) -> None:
+        source = _make_source()
+        cache = FeedCache(
+            sources={source.name: FeedCacheEntry(last_published="2026-02-24T08:00:00+00:00", last_guid="https://example.com/deepmind-math")}
+        )
+        entries = re.findall(r"<item>.*?</item>", SAMPLE_RSS, re.DOTALL)
+        start, end = SAMPLE_RSS.index(entries[0]), SAMPLE_RSS.index(entries[-1]) + len(entries[-1])
+        oldest_first = SAMPLE_RSS[:start] + "\n".join(reversed(entries)) + SAMPLE_RSS[end:]
+        with patch("src.news.rss_parser.httpx.get", return_value=_mock_response(oldest_first)):
+            items = fetch_feed(source, cache=cache)
+        assert [item.url for item in items] == ["https://example.com/gpt5-release"]
+        assert cache.sources[source.name].last_guid == "https://example.com/gpt5-release"
+
+    def test_guid_breaks_ties_at_watermark_timestamp(self) -> None:
+        source = _make_source()
+        cache = FeedCache()
+        with patch("src.news.rss_parser.httpx.get", return_value=_mock_response(SAMPLE_RSS)):
+            fetch_feed(source, cache=cache)
+
+        same_time = """<item>
+      <title>Same Minute Story</title>
+      <link>https://example.com/same-minute</link>
+      <guid>https://example.com/same-minute</guid>
+      <pubDate>Mon, 24 Feb 2026 10:00:00 GMT</pubDate>
+    </item>
+    <item>"""
+        with patch("src.news.rss_parser.httpx.get", return_value=_mock_response(SAMPLE_RSS.replace("<item>", same_time, 1))):
+            items = fetch_feed(source, cache=cache)
+        assert [item.url for item in items] == ["https://example.com/same-minute"]
+
+
+def _mock_async_client(handler: Callable[[httpx.Request], Awaitable[httpx.Response]]) -> Callable[[], httpx.AsyncClient]:
+    return lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
 class TestFetchAllFeeds:
     def test_aggregates_from_multiple_sources(self) -> None:
         source_a = _make_source("Source A")
         source_b = _make_source("Source B")
-        with patch("src.news.rss_parser.httpx.get", return_value=_mock_response(SAMPLE_RSS)):
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=SAMPLE_RSS)
+
+        with patch("src.news.rss_parser._build_async_client", _mock_async_client(handler)):
             items = fetch_all_feeds([source_a, source_b])
         assert len(items) == 6
         sources = {item.source for item in items}
@@ -81,12 +215,107 @@ class TestFetchAllFeeds:
         source_ok = NewsSource(name="OK", url="https://ok.com/feed", category="news", weight=0.8)
         source_fail = NewsSource(name="Fail", url="https://fail.com/feed", category="news", weight=0.8)
 
-        def side_effect(url: str, **kwargs: object) -> httpx.Response:
-            if url == source_fail.url:
-                raise httpx.ConnectError("fail")
-            return _mock_response(SAMPLE_RSS)
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if str(request.url) == source_fail.url:
+                raise httpx.ConnectError("fail", request=request)
+            return httpx.Response(200, text=SAMPLE_RSS)
 
-        with patch("src.news.rss_parser.httpx.get", side_effect=side_effect):
+        with patch("src.news.rss_parser._build_async_client", _mock_async_client(handler)):
             items = fetch_all_feeds([source_ok, source_fail])
         assert len(items) == 3
         assert all(item.source == "OK" for item in items)
+
+    def test_preserves_source_order(self) -> None:
+        slow = NewsSource(name="Slow", url="https://slow.com/feed", category="news", weight=0.8)
+        fast = NewsSource(name="Fast", url="https://fast.com/feed", category="news", weight=0.8)
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if str(request.url) == slow.url:
+                await asyncio.sleep(0.05)
+            return httpx.Response(200, text=SAMPLE_RSS)
+
+        with patch("src.news.rss_parser._build_async_client", _mock_async_client(handler)):
+            items = fetch_all_feeds([slow, fast])
+        assert [item.source for item in items] == ["Slow"] * 3 + ["Fast"] * 3
+
+    def test_skips_feeds_past_deadline(self) -> None:
+        hanging = NewsSource(name="Hanging", url="https://hang.com/feed", category="news", weight=0.8)
+        ok = NewsSource(name="OK", url="https://ok.com/feed", category="news", weight=0.8)
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if str(request.url) == hanging.url:
+                await asyncio.sleep(5)
+            return httpx.Response(200, text=SAMPLE_RSS)
+
+        with patch("src.news.rss_parser._build_async_client", _mock_async_client(handler)):
+            items = fetch_all_feeds([hanging, ok], deadline=0.2)
+        assert len(items) == 3
+        assert all(item.source == "OK" for item in items)
+
+    def test_bounds_concurrency(self) -> None:
+        sources = [_make_source(f"S{i}") for i in range(6)]
+        in_flight = 0
+        peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, text=SAMPLE_RSS)
+
+        with patch("src.news.rss_parser._build_async_client", _mock_async_client(handler)):
+            items = fetch_all_feeds(sources, max_concurrency=2)
+        assert len(items) == 18
+        assert peak == 2
+
+    def test_conditional_get_counts_hits_and_misses(self) -> None:
+        cached = _make_source("Cached")
+        changed = _make_source("Changed")
+        cache = FeedCache(sources={"Cached": FeedCacheEntry(etag='"same"'), "Changed": FeedCacheEntry(etag='"old"')})
+        stats = FetchStats()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.headers.get("If-None-Match") == '"same"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=SAMPLE_RSS, headers={"ETag": '"new"'})
+
+        with patch("src.news.rss_parser._build_async_client", _mock_async_client(handler)):
+            items = fetch_all_feeds([cached, changed], cache=cache, stats=stats)
+        assert {item.source for item in items} == {"Changed"}
+        assert stats.cache_hits == {"Cached": 1}
+        assert stats.cache_misses == {"Changed": 1}
+        assert cache.sources["Changed"].etag == '"new"'
+
+
+class TestIterFeedItems:
+    def test_parses_feeds_lazily_in_source_order(self) -> None:
+        sources = [_make_source("Source A"), _make_source("Source B")]
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=SAMPLE_RSS)
+
+        with (
+            patch("src.news.rss_parser._build_async_client", _mock_async_client(handler)),
+            patch("src.news.rss_parser.feedparser.parse", wraps=feedparser.parse) as mock_parse,
+        ):
+            stream = iter_feed_items(sources)
+            first = next(stream)
+            assert first.source == "Source A"
+            assert mock_parse.call_count == 1
+            rest = list(stream)
+        assert mock_parse.call_count == 2
+        assert [item.source for item in rest] == ["Source A"] * 2 + ["Source B"] * 3
+
+    def test_advances_watermark_once_consumed(self) -> None:
+        source = _make_source()
+        cache = FeedCache()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=SAMPLE_RSS)
+
+        with patch("src.news.rss_parser._build_async_client", _mock_async_client(handler)):
+            assert len(list(iter_feed_items([source], cache=cache))) == 3
+            assert list(iter_feed_items([source], cache=cache)) == []
+        assert cache.sources[source.name].last_guid == "https://example.com/gpt5-release"
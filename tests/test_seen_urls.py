@@ -0,0 +1,42 @@
+from src.news.seen_urls import SeenUrlIndex, canonicalize_url
+
+
+class TestCanonicalizeUrl:
+    def test_strips_utm_params(self) -> None:
+        url = "https://example.com/article?utm_source=rss&utm_medium=feed&id=7"
+        assert canonicalize_url(url) == "https://example.com/article?id=7"
+
+    def test_strips_trailing_slash(self) -> None:
+        assert canonicalize_url("https://example.com/article/") == "https://example.com/article"
+
+    def test_strips_arxiv_version(self) -> None:
+        assert canonicalize_url("https://arxiv.org/abs/2602.18473v2") == "https://arxiv.org/abs/2602.18473"
+
+    def test_keeps_version_like_paths_elsewhere(self) -> None:
+        assert canonicalize_url("https://example.com/abs/2602.18473v2") == "https://example.com/abs/2602.18473v2"
+
+    def test_lowercases_scheme_and_host(self) -> None:
+        assert canonicalize_url("HTTPS://Example.COM/Article") == "https://example.com/Article"
+
+
+class TestSeenUrlIndex:
+    def test_membership_uses_canonical_form(self) -> None:
+        index = SeenUrlIndex(["https://arxiv.org/abs/2602.18473v1"])
+        assert "https://arxiv.org/abs/2602.18473v3" in index
+        assert "https://arxiv.org/abs/2602.18473/?utm_source=x" in index
+        assert "https://arxiv.org/abs/2602.99999" not in index
+
+    def test_collapses_duplicates(self) -> None:
+        index = SeenUrlIndex(["https://a.com/", "https://a.com", "https://b.com"])
+        assert len(index) == 2
+
+    def test_preserves_insertion_order(self) -> None:
+        index = SeenUrlIndex(["https://c.com", "https://a.com"])
+        index.add("https://b.com")
+        index.add("https://c.com")  # re-adding keeps the original position
+        assert list(index) == ["https://c.com", "https://a.com", "https://b.com"]
+
+    def test_newest_evicts_oldest_first(self) -> None:
+        index = SeenUrlIndex(f"https://example.com/{i}" for i in range(10))
+        assert index.newest(3) == ["https://example.com/7", "https://example.com/8", "https://example.com/9"]
+        assert index.newest(0) == []
@@ -1,9 +1,10 @@
 import json
+import threading
 from pathlib import Path
 from unittest.mock import patch
 
-from src.models import AppState, TweetDraft, TweetStatus
-from src.storage.state import load_state, save_state
+from src.models import AppState, FeedCache, FeedCacheEntry, TweetDraft, TweetStatus
+from src.storage.state import load_feed_cache, load_state, save_feed_cache, save_state, state_lock
 
 
 def test_load_state_missing_file(tmp_path: Path) -> None:
@@ -46,6 +47,15 @@ def test_save_state_prunes_seen_urls(tmp_path: Path) -> None:
     assert loaded["seen_urls"][0] == "https://example.com/1400"
 
 
+def test_save_state_collapses_duplicate_seen_urls(tmp_path: Path) -> None:
+    fake_path = tmp_path / "state.json"
+    state = AppState(seen_urls=["https://a.com/", "https://b.com", "https://a.com?utm_source=rss"])
+    with patch("src.storage.state.STATE_FILE", fake_path):
+        save_state(state)
+    loaded = json.loads(fake_path.read_text())
+    assert loaded["seen_urls"] == ["https://a.com", "https://b.com"]
+
+
 def test_save_state_prunes_old_published(tmp_path: Path) -> None:
     fake_path = tmp_path / "state.json"
     old_tweet = TweetDraft(
@@ -90,3 +100,29 @@ def test_roundtrip(tmp_path: Path) -> None:
     assert loaded.seen_urls == original.seen_urls
     assert loaded.pending_drafts[0].tweet_text == "Check this out!"
     assert loaded.last_telegram_update_id == 99
+
+
+def test_feed_cache_roundtrip(tmp_path: Path) -> None:
+    fake_path = tmp_path / "data" / "feed_cache.json"
+    cache = FeedCache(sources={"Source": FeedCacheEntry(etag='"abc"', last_modified="Mon, 24 Feb 2026 10:00:00 GMT")})
+    with patch("src.storage.state.FEED_CACHE_FILE", fake_path):
+        assert load_feed_cache() == FeedCache()
+        save_feed_cache(cache)
+        loaded = load_feed_cache()
+    assert loaded == cache
+
+
+def test_state_lock_is_exclusive(tmp_path: Path) -> None:
+    entered = threading.Event()
+
+    def other_process() -> None:
+        with state_lock():
+            entered.set()
+
+    with patch("src.storage.state.STATE_FILE", tmp_path / "state.json"):
+        with state_lock():
+            thread = threading.Thread(target=other_process)
+            thread.start()
+            assert not entered.wait(0.2)
+        thread.join(timeout=5)
+    assert entered.is_set()
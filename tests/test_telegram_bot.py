@@ -1,19 +1,19 @@
+import json
+import threading
+import time
 from unittest.mock import patch
 
 import httpx
 
 from src.models import ContentCategory, TweetDraft
-from src.telegram.bot import check_approvals, send_draft
-
-
-def _mock_response(json_data: dict, status_code: int = 200) -> httpx.Response:
-    import json
-
-    return httpx.Response(
-        status_code=status_code,
-        json=json_data,
-        request=httpx.Request("POST", "https://api.telegram.org"),
-    )
+from src.telegram.bot import (
+    MESSAGE_LIMIT,
+    ApprovalCheck,
+    TelegramClient,
+    format_digest,
+    pack_digests,
+    parse_decisions,
+)
 
 
 def _make_draft(
@@ -31,24 +31,30 @@ def _make_draft(
 
 class TestSendDraft:
     def test_sends_message_and_returns_id(self) -> None:
-        response = _mock_response({"ok": True, "result": {"message_id": 42}})
-        with patch("src.telegram.bot.httpx.post", return_value=response) as mock_post:
-            msg_id = send_draft(_make_draft(), token="test-token", chat_id="123")
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json={"ok": True, "result": {"message_id": 42}})
+
+        with _client(handler) as client:
+            msg_id = client.send_draft(_make_draft())
 
         assert msg_id == 42
-        call_args = mock_post.call_args
-        assert "test-token" in call_args.args[0]
-        body = call_args.kwargs["json"]
+        (request,) = requests
+        assert request.url.path == "/bottest/sendMessage"
+        body = json.loads(request.content)
         assert body["chat_id"] == "123"
         assert "RESEARCH" in body["text"]
         assert "1.20" in body["text"]
         assert body["parse_mode"] == "HTML"
+        buttons = body["reply_markup"]["inline_keyboard"][0]
+        assert [b["callback_data"] for b in buttons] == [f"a:{_make_draft().key}", f"r:{_make_draft().key}"]
 
     def test_raises_on_http_error(self) -> None:
-        response = _mock_response({"ok": False}, status_code=400)
-        with patch("src.telegram.bot.httpx.post", return_value=response):
+        with _client(lambda request: httpx.Response(400, json={"ok": False})) as client:
             try:
-                send_draft(_make_draft(), token="test", chat_id="123")
+                client.send_draft(_make_draft())
                 assert False, "Should have raised"
             except httpx.HTTPStatusError:
                 pass
@@ -70,25 +76,31 @@ class TestCheckApprovals:
             ],
         }
 
+    def _check(self, *pages: dict, last_update_id: int = 0, params: list[dict] | None = None) -> ApprovalCheck:
+        """Run TelegramClient.check_approvals against ``pages`` served in order, recording each request's params."""
+        responses = list(pages)
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if params is not None:
+                params.append(json.loads(request.content))
+            return httpx.Response(200, json=responses.pop(0))
+
+        with _client(handler) as client:
+            return client.check_approvals(last_update_id)
+
     def test_detects_approval(self) -> None:
-        response = _mock_response(self._make_updates("✅"))
-        with patch("src.telegram.bot.httpx.get", return_value=response):
-            decisions = check_approvals(0, token="test", chat_id="123")
+        decisions = self._check(self._make_updates("✅")).decisions
         assert len(decisions) == 1
         assert decisions[0].approved is True
         assert decisions[0].reply_to_message_id == 10
 
     def test_detects_text_approval(self) -> None:
-        response = _mock_response(self._make_updates("approve"))
-        with patch("src.telegram.bot.httpx.get", return_value=response):
-            decisions = check_approvals(0, token="test", chat_id="123")
+        decisions = self._check(self._make_updates("approve")).decisions
         assert len(decisions) == 1
         assert decisions[0].approved is True
 
     def test_detects_rejection(self) -> None:
-        response = _mock_response(self._make_updates("❌"))
-        with patch("src.telegram.bot.httpx.get", return_value=response):
-            decisions = check_approvals(0, token="test", chat_id="123")
+        decisions = self._check(self._make_updates("❌")).decisions
         assert len(decisions) == 1
         assert decisions[0].approved is False
 
@@ -99,25 +111,155 @@ class TestCheckApprovals:
                 {"update_id": 999, "message": {"chat": {"id": 123}, "text": "✅"}},
             ],
         }
-        response = _mock_response(data)
-        with patch("src.telegram.bot.httpx.get", return_value=response):
-            decisions = check_approvals(0, token="test", chat_id="123")
+        decisions = self._check(data).decisions
         assert len(decisions) == 0
 
     def test_ignores_wrong_chat(self) -> None:
-        response = _mock_response(self._make_updates("✅", chat_id=999))
-        with patch("src.telegram.bot.httpx.get", return_value=response):
-            decisions = check_approvals(0, token="test", chat_id="123")
+        decisions = self._check(self._make_updates("✅", chat_id=999)).decisions
         assert len(decisions) == 0
 
     def test_ignores_unrecognized_text(self) -> None:
-        response = _mock_response(self._make_updates("hello"))
-        with patch("src.telegram.bot.httpx.get", return_value=response):
-            decisions = check_approvals(0, token="test", chat_id="123")
+        decisions = self._check(self._make_updates("hello")).decisions
         assert len(decisions) == 0
 
+    def test_drains_all_pages_and_reports_last_update(self) -> None:
+        def page(first: int, count: int) -> dict:
+            updates = [{"update_id": i, "message": {"chat": {"id": 555}, "text": "chatter"}} for i in range(first, first + count)]
+            return {"ok": True, "result": updates}
+
+        approval = self._make_updates("✅")["result"][0]
+        last = {"ok": True, "result": [{**approval, "update_id": 201}]}
+        params: list[dict] = []
+        check = self._check(page(1, 100), page(101, 100), last, params=params)
+
+        assert [p["offset"] for p in params] == [1, 101, 201]
+        assert [p["timeout"] for p in params] == [5, 0, 0]
+        assert {p["limit"] for p in params} == {100}
+        assert len(check.decisions) == 1
+        assert check.last_update_id == 201
+
+    def test_last_update_counts_non_decisions(self) -> None:
+        check = self._check(self._make_updates("hello"), last_update_id=500)
+        assert check.decisions == []
+        assert check.last_update_id == 999
+
+    def _callback_update(self, data: str, chat_id: int = 123) -> dict:
+        return {
+            "update_id": 1000,
+            "callback_query": {"id": "cb-1", "data": data, "message": {"message_id": 10, "chat": {"id": chat_id}}},
+        }
+
+    def test_detects_button_press(self) -> None:
+        updates = [self._callback_update("r:abc123"), self._callback_update("a:def456")]
+        decisions = parse_decisions(updates, "123")
+        assert [(d.draft_key, d.approved) for d in decisions] == [("abc123", False), ("def456", True)]
+        assert decisions[0].callback_query_id == "cb-1"
+        assert decisions[0].reply_to_message_id == 10
+
+    def test_ignores_foreign_or_malformed_button_press(self) -> None:
+        updates = [self._callback_update("a:abc", chat_id=999), self._callback_update("x:abc"), self._callback_update("a:")]
+        assert parse_decisions(updates, "123") == []
+
+    def test_digest_reply_picks_entries_by_handle(self) -> None:
+        decisions = parse_decisions(self._make_updates("✅ 1 3")["result"], "123")
+        assert [(d.handle, d.approved, d.reply_to_message_id) for d in decisions] == [(1, True, 10), (3, True, 10)]
+        assert parse_decisions(self._make_updates("no 2,4")["result"], "123")[1].handle == 4
+        assert parse_decisions(self._make_updates("✅")["result"], "123")[0].handle is None
+
     def test_empty_updates(self) -> None:
-        response = _mock_response({"ok": True, "result": []})
-        with patch("src.telegram.bot.httpx.get", return_value=response):
-            decisions = check_approvals(0, token="test", chat_id="123")
+        decisions = self._check({"ok": True, "result": []}).decisions
         assert len(decisions) == 0
+
+
+def _client(handler, **kwargs) -> TelegramClient:
+    return TelegramClient(token="test", chat_id="123", http=httpx.Client(transport=httpx.MockTransport(handler)), **kwargs)
+
+
+def test_draft_key_is_short_and_stable() -> None:
+    draft = _make_draft()
+    assert draft.key == _make_draft().key
+    assert len(draft.key) == 10
+    draft.created_at = "2026-02-25T10:00:00"
+    assert draft.key != _make_draft().key
+
+
+def _digest_draft(i: int) -> TweetDraft:
+    draft = _make_draft(score=float(i))
+    draft.news_url = f"https://example.com/{i}"
+    draft.tweet_text = f"Draft {i}: " + "words " * 40
+    return draft
+
+
+class TestDigest:
+    def test_packs_drafts_under_message_limit(self) -> None:
+        drafts = [_digest_draft(i) for i in range(20)]
+        digests = pack_digests(drafts)
+        assert 1 < len(digests) <= 4
+        assert [d for digest in digests for d in digest] == drafts
+        assert all(len(format_digest(digest).encode("utf-16-le")) // 2 <= MESSAGE_LIMIT for digest in digests)
+
+    def test_digest_numbers_entries_and_buttons(self) -> None:
+        drafts = [_digest_draft(i) for i in range(3)]
+        with _client(lambda request: httpx.Response(200, json={"ok": True, "result": {"message_id": 5}})) as client:
+            with patch.object(client, "call", wraps=client.call) as call:
+                sent = client.send_digests(drafts)
+        assert sent == {5: drafts}
+        params = call.call_args.args[1]
+        assert "<b>#3</b>" in params["text"]
+        rows = params["reply_markup"]["inline_keyboard"]
+        assert [row[0]["text"] for row in rows] == ["✅ 1", "✅ 2", "✅ 3"]
+        assert rows[1][1]["callback_data"] == f"r:{drafts[1].key}"
+
+
+class TestTelegramClient:
+    def test_send_drafts_maps_message_ids_in_draft_order(self) -> None:
+        drafts = [_make_draft(score=float(i)) for i in range(5)]
+        lock = threading.Lock()
+        in_flight = peak = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            score = json.loads(request.content)["text"].split("Score: ")[1][:4]
+            with lock:
+                in_flight -= 1
+            return httpx.Response(200, json={"ok": True, "result": {"message_id": 100 + int(float(score))}})
+
+        with _client(handler, messages_per_second=1000, burst=5) as client:
+            sent = client.send_drafts(drafts)
+
+        assert list(sent) == [100, 101, 102, 103, 104]
+        assert [d.source_score for d in sent.values()] == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert peak > 1
+
+    def test_retries_after_rate_limit(self) -> None:
+        responses = [
+            httpx.Response(429, json={"ok": False, "parameters": {"retry_after": 2}}),
+            httpx.Response(200, json={"ok": True, "result": {"message_id": 7}}),
+        ]
+        with patch("src.telegram.bot.time.sleep") as sleep, _client(lambda request: responses.pop(0)) as client:
+            assert client.send_draft(_make_draft()) == 7
+        sleep.assert_called_once_with(2)
+
+    def test_failed_send_is_left_out(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if "Broken" in json.loads(request.content)["text"]:
+                return httpx.Response(400, json={"ok": False})
+            return httpx.Response(200, json={"ok": True, "result": {"message_id": 1}})
+
+        broken = _make_draft()
+        broken.news_title = "Broken"
+        with _client(handler) as client:
+            sent = client.send_drafts([broken, _make_draft()])
+        assert [d.news_title for d in sent.values()] == ["Test Article Title"]
+
+    def test_paces_sends_beyond_burst(self) -> None:
+        ok = httpx.Response(200, json={"ok": True, "result": {"message_id": 1}})
+        with patch("src.telegram.bot.time.sleep") as sleep, _client(lambda request: ok, messages_per_second=1, burst=2) as client:
+            for _ in range(3):
+                client.send_message("hi")
+        (wait,) = [c.args[0] for c in sleep.call_args_list]
+        assert 0.9 < wait <= 1.0
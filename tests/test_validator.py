@@ -0,0 +1,100 @@
+from src.generation.validator import check_text, truncate, validate_draft, weighted_length
+from src.models import TweetDraft
+
+
+class TestWeightedLength:
+    def test_latin_counts_one_per_char(self) -> None:
+        assert weighted_length("Hello, world") == 12
+
+    def test_url_counts_as_tco_link(self) -> None:
+        assert weighted_length("see https://example.com/a/very/long/path/indeed") == 4 + 23
+
+    def test_emoji_sequences_count_two(self) -> None:
+        assert weighted_length("👍") == 2
+        assert weighted_length("👍🏽") == 2
+        assert weighted_length("👨‍👩‍👧") == 2
+        assert weighted_length("🇪🇸") == 2
+
+    def test_cjk_counts_two(self) -> None:
+        assert weighted_length("日本語") == 6
+
+
+class TestCheckText:
+    def test_clean_text_is_untouched(self) -> None:
+        check = check_text("Mistral shipped a new model. Apache 2.0, runs on a laptop.")
+        assert check.ok
+        assert check.repairs == []
+
+    def test_repairs_formatting_locally(self) -> None:
+        check = check_text("🚀  GPT-5 is out.   Big deal. https://x.com/a #AI #LLM #GPT Thoughts?")
+        assert check.ok
+        assert check.text == "GPT-5 is out. Big deal. #AI"
+        assert check.repairs == ["whitespace", "url", "leading emoji", "thoughts", "hashtags"]
+
+    def test_drops_trailing_hashtags_when_body_has_one(self) -> None:
+        assert check_text("Scaling #AI is hard. #ML #LLM").text == "Scaling #AI is hard."
+
+    def test_trims_long_text_at_sentence_boundary(self) -> None:
+        text = "First sentence stays. " * 10 + "This one goes over the limit."
+        check = check_text(text, max_length=230)
+        assert check.ok
+        assert check.repairs == ["length"]
+        assert check.text.endswith("stays.")
+        assert weighted_length(check.text) <= 230
+
+    def test_rejects_text_that_cannot_be_trimmed(self) -> None:
+        check = check_text("word " * 80)
+        assert not check.ok
+        assert check.problems[0].startswith("too long")
+
+    def test_rejects_banned_phrases(self) -> None:
+        check = check_text("Hot take: this is a Game-Changer")
+        assert check.problems == ["banned phrases: game-changer, hot take:"]
+
+    def test_banned_phrases_match_whole_words_only(self) -> None:
+        assert check_text("Unexcitingly solid results, a game changer for nobody").problems == [
+            "banned phrases: game changer"
+        ]
+
+    def test_rejects_inline_hashtag_spam(self) -> None:
+        assert check_text("#AI meets #ML and #LLM today").problems == ["3+ hashtags"]
+
+
+def test_validate_draft_repairs_each_thread_tweet() -> None:
+    draft = TweetDraft(
+        news_url="https://example.com",
+        news_title="Paper",
+        tweet_text="🧠 First",
+        thread_tweets=["🧠 First", "Second  tweet", "Groundbreaking results"],
+    )
+    check = validate_draft(draft)
+    assert draft.thread_tweets == ["First", "Second tweet", "Groundbreaking results"]
+    assert draft.tweet_text == "First"
+    assert check.repairs == ["leading emoji", "whitespace"]
+    assert check.problems == ["tweet 3: banned phrases: groundbreaking"]
+
+
+def test_validate_draft_uses_thread_banned_phrases() -> None:
+    draft = TweetDraft(
+        news_url="https://example.com",
+        news_title="Paper",
+        tweet_text="First",
+        thread_tweets=["First", "A second nuance worth noting", "Did you know it scales? 🧵"],
+    )
+    assert validate_draft(draft).problems == ["tweet 3: banned phrases: 🧵"]
+
+
+def test_validate_draft_reserves_link_room_in_last_thread_tweet_only() -> None:
+    long_tweet = "x" * 270
+    draft = TweetDraft(
+        news_url="https://example.com", news_title="Paper", tweet_text=long_tweet, thread_tweets=[long_tweet, long_tweet]
+    )
+    assert validate_draft(draft).problems == ["tweet 2: too long (270 > 256)"]
+
+
+def test_truncate_uses_weighted_length() -> None:
+    text = "日本語" * 100
+    result = truncate(text, 256)
+    assert result.endswith("…")
+    assert weighted_length(result) <= 256
+    assert truncate("short", 256) == "short"
@@ -0,0 +1,44 @@
+from src.generation.variants import VariantRanker
+from src.models import TweetDraft
+
+CLEAN = "Mistral shipped a new open model. Apache 2.0, runs on a laptop, and the evals hold up better than expected for its size."
+
+
+def _draft(text: str, *alternatives: str) -> TweetDraft:
+    return TweetDraft(news_url="https://example.com", news_title="Mistral", tweet_text=text, alternatives=list(alternatives))
+
+
+class TestVariantRanker:
+    def test_prefers_variant_without_problems(self) -> None:
+        ranked = VariantRanker().rank(["A revolutionary model from Mistral.", CLEAN])
+        assert ranked[0].text == CLEAN
+        assert not ranked[1].ok
+
+    def test_prefers_length_near_target(self) -> None:
+        ranked = VariantRanker().rank(["Mistral, again.", CLEAN])
+        assert ranked[0].text == CLEAN
+
+    def test_penalises_similarity_to_recent_tweets(self) -> None:
+        other = "Another open model from Mistral. Apache 2.0 again, small enough for a laptop, and the evals look solid for the size."
+        ranker = VariantRanker(recent_tweets=[CLEAN])
+        assert ranker.similarity(CLEAN) == 1.0
+        assert ranker.rank([CLEAN, other])[0].text == other
+
+    def test_drops_duplicates_after_repair(self) -> None:
+        assert len(VariantRanker().rank([CLEAN, f"  {CLEAN} ", ""])) == 1
+
+
+def test_choose_keeps_clean_runners_up_as_alternatives() -> None:
+    draft = _draft("Mistral, again.", CLEAN, "Groundbreaking stuff from Mistral.")
+    check = VariantRanker().choose(draft)
+    assert check.ok
+    assert draft.tweet_text == CLEAN
+    assert draft.alternatives == ["Mistral, again."]
+
+
+def test_next_alternative_swaps_in_runner_up() -> None:
+    draft = _draft(CLEAN, "Second", "Third")
+    assert draft.next_alternative()
+    assert (draft.tweet_text, draft.alternatives) == ("Second", ["Third"])
+    draft.alternatives = []
+    assert not draft.next_alternative()